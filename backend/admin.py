@@ -1,5 +1,50 @@
-from django.contrib import admin
-from .models import Pendaftaran
+from django.contrib import admin, messages
+from django.db.models import Q
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.html import format_html_join
+from .audit import AKSI_LOG
+from .kartu_pdf import cetak_ke_file_sementara, melebihi_batas_sinkron
+from .models import Pendaftaran, LogAktivitas, ArsipLogAktivitas, Notifikasi, Tugas
+from .paginasi import PerkiraanPaginator
+
+
+def tampil_perubahan(obj):
+    return format_html_join(
+        '', '<div><b>{}</b>: {} &rarr; {}</div>',
+        ((field, lama, baru) for field, lama, baru in obj.get_perubahan())
+    ) or '-'
+tampil_perubahan.short_description = "Perubahan"
+
+
+class AksiFilter(admin.SimpleListFilter):
+    # pilihan tetap, bukan SELECT DISTINCT aksi di jutaan baris
+    title = "aksi"
+    parameter_name = 'aksi'
+
+    def lookups(self, request, model_admin):
+        return [(aksi, aksi) for aksi in AKSI_LOG]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(aksi=self.value())
+        return queryset
+
+
+class LogAktivitasInline(admin.TabularInline):
+    # riwayat satu pendaftar, pakai index (pendaftaran, -timestamp)
+    model = LogAktivitas
+    fields = ('timestamp', 'user', 'aksi', tampil_perubahan)
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 @admin.register(Pendaftaran)
 class PendaftaranAdmin(admin.ModelAdmin):
@@ -7,6 +52,8 @@ class PendaftaranAdmin(admin.ModelAdmin):
     readonly_fields = ('nomor_pendaftaran', 'tanggal_pendaftaran', 'jalur')  # Tambahin jalur ke readonly biar aman
     list_filter = ('jurusan', 'jalur', 'status')
     search_fields = ('nama_lengkap', 'nik', 'nomor_pendaftaran', 'no_wa')
+    inlines = [LogAktivitasInline]
+    actions = ['cetak_kartu']
     fieldsets = (
         (None, {
             'fields': ('nik', 'nama_lengkap', 'jurusan', 'no_wa')
@@ -26,12 +73,74 @@ class PendaftaranAdmin(admin.ModelAdmin):
         }),
     )
 
-from .models import LogAktivitas
+    def cetak_kartu(self, request, queryset):
+        pesan = melebihi_batas_sinkron(queryset)
+        if pesan:
+            self.message_user(request, pesan, level=messages.ERROR)
+            return None
+
+        file = cetak_ke_file_sementara(queryset, request.build_absolute_uri('/'))
+        return FileResponse(
+            file, as_attachment=True, filename='kartu.pdf', content_type='application/pdf'
+        )
+    cetak_kartu.short_description = "Cetak kartu pendaftaran (PDF)"
 
 @admin.register(LogAktivitas)
 class LogAktivitasAdmin(admin.ModelAdmin):
     list_display = ('timestamp', 'user', 'pendaftaran', 'aksi')
-    list_filter = ('aksi', 'user')
+    # date_hierarchy & filter aksi bawaan dibuang: dua-duanya SELECT DISTINCT
+    # di seluruh tabel tiap halaman dibuka
+    list_filter = (AksiFilter, ('timestamp', admin.DateFieldListFilter), 'user')
+    list_select_related = ('user', 'pendaftaran')
     search_fields = ('pendaftaran__nama_lengkap', 'pendaftaran__nomor_pendaftaran')
-    readonly_fields = ('timestamp', 'user', 'pendaftaran', 'aksi', 'detail')
-    date_hierarchy = 'timestamp'
\ No newline at end of file
+    readonly_fields = ('timestamp', 'user', 'pendaftaran', 'aksi', 'detail', tampil_perubahan)
+    exclude = ('perubahan',)
+    # tanpa COUNT(*) penuh tiap buka halaman log
+    paginator = PerkiraanPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArsipLogAktivitas)
+class ArsipLogAktivitasAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'tahun', 'username', 'nomor_pendaftaran', 'aksi')
+    list_filter = ('tahun', AksiFilter)
+    search_fields = ('nomor_pendaftaran',)
+    readonly_fields = [f.name for f in ArsipLogAktivitas._meta.fields if f.name != 'perubahan'] + [tampil_perubahan]
+    exclude = ('perubahan',)
+    paginator = PerkiraanPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(Tugas)
+class TugasAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nama', 'status', 'percobaan', 'dibuat', 'selesai', 'dikunci_oleh')
+    list_filter = ('status', 'nama')
+    readonly_fields = [f.name for f in Tugas._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Notifikasi)
+class NotifikasiAdmin(admin.ModelAdmin):
+    list_display = ('pendaftaran', 'no_wa', 'status_pendaftaran', 'status', 'percobaan', 'dibuat', 'dikirim')
+    list_filter = ('status', 'status_pendaftaran')
+    list_select_related = ('pendaftaran',)
+    search_fields = ('no_wa', 'pendaftaran__nomor_pendaftaran')
+    readonly_fields = [f.name for f in Notifikasi._meta.fields]
+    actions = ['kirim_ulang']
+
+    def has_add_permission(self, request):
+        return False
+
+    def kirim_ulang(self, request, queryset):
+        # 'kirim' yang lease-nya masih jalan sedang dipegang pengirim, jangan diganggu
+        jumlah = queryset.filter(
+            Q(status='gagal') | Q(status='kirim', dikunci_sampai__lt=timezone.now())
+        ).update(
+            status='antre', percobaan=0, kirim_setelah=timezone.now(), dikunci_sampai=None
+        )
+        self.message_user(request, f"{jumlah} notifikasi diantrekan ulang")
+    kirim_ulang.short_description = "Kirim ulang notifikasi gagal"
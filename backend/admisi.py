@@ -0,0 +1,247 @@
+import json
+import os
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+try:
+    import fcntl
+except ImportError:  # Windows (Procfile.windows / build PyInstaller)
+    fcntl = None
+
+
+# =====================================================
+# ADMISI FORM PENDAFTARAN PUBLIK
+# =====================================================
+# Saat jalur dibuka ribuan POST pendaftaran datang bersamaan, semuanya antre
+# di tulis SQLite dan memakan semua worker gunicorn. Di sini:
+# - paling banyak ADMISI_MAKS POST pendaftaran diproses bersamaan (semua
+#   worker di server ini), sisanya dapat halaman ruang tunggu yang
+#   mengirim ulang form sendiri sesuai nomor antrean
+# - tiap IP dibatasi token bucket (ADMISI_IP_PER_MENIT, ADMISI_IP_BURST)
+# - URL lain (panel admin, halaman biasa) tidak lewat sini sama sekali,
+#   jadi dengan ADMISI_MAKS < jumlah worker selalu ada worker kosong
+#
+# Slot = file di ADMISI_FOLDER yang dikunci flock. Kunci dilepas OS kalau
+# worker mati, jadi slot tidak pernah bocor.
+
+# (nama url, method) yang dibatasi per IP / yang lewat antrean; cek_nik
+# selalu dibatasi di view-nya sendiri (lihat views.cek_nik)
+DIBATASI = {('home', 'POST')}
+DIANTRE = {('home', 'POST')}
+
+_SALT = 'backend.admisi'
+_slot_lokal = {}
+
+# ruang tunggu kirim ulang tiap ADMISI_JEDA detik; nomor yang tiketnya tidak
+# diperbarui selama JEDA_PERGI kali jeda dianggap sudah pergi dan dilewati
+JEDA_PERGI = 3
+
+
+# =====================================================
+# KUNCI FILE (FALLBACK: KUNCI THREAD KALAU TANPA fcntl)
+# =====================================================
+def _buka(nama):
+    os.makedirs(settings.ADMISI_FOLDER, exist_ok=True)
+    return open(os.path.join(settings.ADMISI_FOLDER, nama), 'a+')
+
+
+def _kunci(file, blocking=True):
+    if fcntl is None:
+        kunci = _slot_lokal.setdefault(file.name, threading.Lock())
+        return kunci.acquire(blocking=blocking)
+
+    flag = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+    try:
+        fcntl.flock(file, flag)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _lepas(file):
+    if fcntl is None:
+        _slot_lokal[file.name].release()
+    else:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class Slot:
+
+    def __init__(self, file):
+        self.file = file
+
+    def lepas(self):
+        _lepas(self.file)
+        self.file.close()
+
+
+def ambil_slot():
+    for i in range(settings.ADMISI_MAKS):
+        file = _buka(f"slot-{i}")
+        if _kunci(file, blocking=False):
+            return Slot(file)
+        file.close()
+    return None
+
+
+# =====================================================
+# ANTREAN (NOMOR AMBIL / NOMOR DIPANGGIL)
+# =====================================================
+class _Antrean:
+    # isi file: {"ambil": n, "panggil": n, "tiket": {nomor: [nonce, waktu]}},
+    # dibaca-ubah-tulis di bawah kunci
+
+    def __enter__(self):
+        self.file = _buka('antrean.json')
+        _kunci(self.file)
+        self.file.seek(0)
+        try:
+            self.data = json.loads(self.file.read() or '{}')
+        except ValueError:
+            self.data = {}
+        self.data.setdefault('ambil', 0)
+        self.data.setdefault('panggil', 0)
+        self.data.setdefault('tiket', {})
+        return self.data
+
+    def __exit__(self, *exc):
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(json.dumps(self.data))
+        self.file.flush()
+        _lepas(self.file)
+        self.file.close()
+
+
+# Tiket ruang tunggu sekali pakai: tiap tiket membawa nonce yang dicatat di
+# antrean.json (dibagi semua worker), dan dihapus begitu tiketnya dipakai.
+# Ruang tunggu selalu dapat tiket baru, jadi tiket lama tidak bisa diputar
+# ulang untuk melewati token bucket.
+def _buat_tiket(antrean, nomor):
+    nonce = secrets.token_hex(8)
+    antrean['tiket'][str(nomor)] = [nonce, time.time()]
+    return signing.dumps([nomor, nonce], salt=_SALT)
+
+
+def baca_tiket(tiket):
+    if not tiket:
+        return None
+    try:
+        isi = signing.loads(tiket, salt=_SALT, max_age=settings.ADMISI_TIKET_TTL)
+    except signing.BadSignature:
+        return None
+    if not (isinstance(isi, list) and len(isi) == 2 and isinstance(isi[0], int)):
+        return None
+    return isi
+
+
+def pakai_tiket(tiket):
+    """Nomor antrean dari tiket (hasil baca_tiket) yang belum pernah dipakai,
+    None kalau tiket kosong, sudah dipakai, atau kedaluwarsa."""
+    if not tiket:
+        return None
+    nomor, nonce = tiket
+
+    with _Antrean() as antrean:
+        batas = time.time() - settings.ADMISI_TIKET_TTL
+        for key, (_, waktu) in list(antrean['tiket'].items()):
+            if waktu < batas:
+                del antrean['tiket'][key]
+
+        terdaftar = antrean['tiket'].get(str(nomor))
+        if not terdaftar or terdaftar[0] != nonce:
+            return None
+        # nonce dikosongkan (tiket tidak bisa dipakai lagi), nomornya tetap
+        # tercatat hidup sampai masuk() memutuskan diproses atau menunggu
+        antrean['tiket'][str(nomor)] = [None, time.time()]
+        return nomor
+
+
+def _lewati_yang_pergi(antrean):
+    # nomor setelah 'panggil' yang tiketnya sudah dipakai-buang/kedaluwarsa
+    # atau lama tidak diperbarui tidak menahan antrean
+    batas = time.time() - settings.ADMISI_JEDA * JEDA_PERGI
+    while antrean['panggil'] < antrean['ambil']:
+        tiket = antrean['tiket'].get(str(antrean['panggil'] + 1))
+        if tiket and tiket[1] >= batas:
+            break
+        antrean['panggil'] += 1
+
+
+def _giliran(antrean, nomor):
+    if nomor is None or nomor > antrean['ambil']:
+        # tanpa tiket (atau tiket dari sebelum antrean direset)
+        return antrean['ambil'] <= antrean['panggil']
+    return nomor <= antrean['panggil']
+
+
+def masuk(nomor=None):
+    """(slot, None) kalau boleh diproses sekarang, (None, (tiket, posisi))
+    kalau harus menunggu. `nomor` = nomor antrean dari tiket sebelumnya."""
+    slot = ambil_slot()
+
+    with _Antrean() as antrean:
+        if slot and not _giliran(antrean, nomor):
+            # ada slot kosong: panggil nomor hidup berikutnya (bisa jadi
+            # pengirim ini sendiri)
+            _lewati_yang_pergi(antrean)
+            antrean['panggil'] = min(antrean['panggil'] + 1, antrean['ambil'])
+
+        if slot and _giliran(antrean, nomor):
+            if nomor is not None:
+                antrean['tiket'].pop(str(nomor), None)
+            return slot, None
+
+        if slot:
+            slot.lepas()
+
+        if nomor is None or nomor > antrean['ambil']:
+            antrean['ambil'] += 1
+            nomor = antrean['ambil']
+
+        return None, (_buat_tiket(antrean, nomor), max(1, nomor - antrean['panggil']))
+
+
+def selesai(slot):
+    slot.lepas()
+    with _Antrean() as antrean:
+        _lewati_yang_pergi(antrean)
+        if antrean['panggil'] < antrean['ambil']:
+            antrean['panggil'] += 1
+
+
+# =====================================================
+# TOKEN BUCKET PER IP
+# =====================================================
+def ip_klien(request):
+    if settings.ADMISI_PERCAYA_PROXY:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def ambil_token(ip, jenis='ip', per_menit=None, burst=None):
+    """Detik sampai token berikutnya ada, 0 kalau request boleh lewat.
+    Disimpan di cache: dengan LocMem batasnya per worker, bukan per server.
+    `jenis` memisahkan bucket (mis. 'cek_nik' tidak memakan token form)."""
+    key = f"admisi:{jenis}:{ip}"
+    per_menit = per_menit or settings.ADMISI_IP_PER_MENIT
+    burst = burst or settings.ADMISI_IP_BURST
+    laju = per_menit / 60
+    sekarang = time.time()
+
+    token, waktu = cache.get(key, (burst, sekarang))
+    token = min(burst, token + (sekarang - waktu) * laju)
+
+    if token < 1:
+        cache.set(key, (token, sekarang), 120)
+        return (1 - token) / laju
+
+    cache.set(key, (token - 1, sekarang), 120)
+    return 0
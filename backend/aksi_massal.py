@@ -0,0 +1,87 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import audit, notifikasi
+from .models import Pendaftaran
+from .statistik import reset_statistik
+
+
+STATUS_MASSAL = ['diterima', 'ditolak']
+
+
+# =====================================================
+# BACA DAFTAR NOMOR/NIK DARI FILE UPLOAD (CSV / TXT)
+# =====================================================
+def baca_file_identitas(file):
+    nomors, niks = set(), set()
+
+    for line in file.read().decode('utf-8-sig', errors='ignore').splitlines():
+        # ambil kolom pertama saja (pemisah koma / titik koma / tab)
+        token = line.replace(';', ',').replace('\t', ',').split(',')[0]
+        token = token.strip().strip('"').upper()
+
+        if token.startswith('PPDB-'):
+            nomors.add(token)
+        elif token.isdigit() and len(token) == 16:
+            niks.add(token)
+
+    return nomors, niks
+
+
+def _potong(items, ukuran):
+    items = list(items)
+    for i in range(0, len(items), ukuran):
+        yield items[i:i + ukuran]
+
+
+# =====================================================
+# UBAH STATUS BANYAK PENDAFTAR SEKALIGUS
+# =====================================================
+def ubah_status_massal(user, status, ids=(), nomors=(), niks=()):
+    if status not in STATUS_MASSAL:
+        raise ValueError(f"Status tidak valid: {status}")
+
+    label = dict(Pendaftaran.STATUS_CHOICES)[status]
+    kriteria = (
+        [('pk__in', chunk) for chunk in _potong(ids, settings.STATUS_MASSAL_CHUNK)]
+        + [('nomor_pendaftaran__in', chunk) for chunk in _potong(nomors, settings.STATUS_MASSAL_CHUNK)]
+        + [('nik__in', chunk) for chunk in _potong(niks, settings.STATUS_MASSAL_CHUNK)]
+    )
+
+    jumlah = 0
+    with transaction.atomic():
+        for lookup, chunk in kriteria:
+            lama = dict(
+                Pendaftaran.objects
+                .filter(Q(**{lookup: chunk}))
+                .exclude(status=status)
+                .values_list('pk', 'status')
+            )
+            if not lama:
+                continue
+            pks = list(lama)
+
+            # update() langsung, tanpa save() + signal per baris
+            Pendaftaran.objects.filter(pk__in=pks).update(status=status)
+
+            audit.catat_banyak(
+                [
+                    (
+                        pk,
+                        "Ubah Status",
+                        f"Status diubah ke {label}",
+                        json.dumps([['status', lama[pk], status]], separators=(',', ':')),
+                    )
+                    for pk in pks
+                ],
+                user,
+            )
+            notifikasi.antrekan(pks, status)
+            jumlah += len(pks)
+
+    if jumlah:
+        reset_statistik()
+    return jumlah
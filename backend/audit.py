@@ -0,0 +1,324 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction, DatabaseError
+
+from .middleware import get_current_user
+
+logger = logging.getLogger(__name__)
+
+
+# nilai kolom `aksi` yang dipakai aplikasi (filter admin tanpa SELECT DISTINCT)
+AKSI_LOG = [
+    "Pendaftaran Online",
+    "Tambah Pendaftaran",
+    "Ubah Status",
+    "Ubah Data",
+]
+
+
+# =====================================================
+# FIELD YANG DIPANTAU
+# =====================================================
+# dihitung sekali per proses: snapshot() jalan di post_init tiap baris
+# Pendaftaran (list admin, ekspor, keyset), jangan susun ulang per objek
+@lru_cache(maxsize=None)
+def _field_audit():
+    from .models import Pendaftaran
+    return tuple(
+        f for f in Pendaftaran._meta.concrete_fields
+        if f.name not in ('id', 'nomor_pendaftaran', 'tanggal_pendaftaran')
+    )
+
+
+@lru_cache(maxsize=None)
+def _attname_audit():
+    return tuple(f.attname for f in _field_audit())
+
+
+def snapshot(instance):
+    # dipanggil di post_init, cukup baca __dict__ (tanpa query);
+    # field yang di-defer (.only()) tidak ikut dibandingkan
+    nilai = instance.__dict__
+    instance._nilai_awal = {
+        attname: nilai[attname]
+        for attname in _attname_audit() if attname in nilai
+    }
+
+
+def _tampil(instance, field, nilai):
+    if field.choices:
+        return dict(field.flatchoices).get(nilai, nilai)
+    return '-' if nilai in (None, '') else nilai
+
+
+def perubahan(instance):
+    awal = getattr(instance, '_nilai_awal', {})
+    hasil = []
+    for f in _field_audit():
+        if f.attname not in awal:
+            continue
+        lama, baru = awal[f.attname], getattr(instance, f.attname)
+        if lama != baru:
+            hasil.append((f, lama, baru))
+    return hasil
+
+
+def json_perubahan(diff):
+    # [[field, lama, baru], ...] tanpa spasi biar kolomnya ringkas
+    return json.dumps(
+        [[f.name, lama, baru] for f, lama, baru in diff],
+        cls=DjangoJSONEncoder,
+        separators=(',', ':'),
+    )
+
+
+# =====================================================
+# CATAT PERUBAHAN PENDAFTARAN (DARI SIGNAL post_save)
+# =====================================================
+def catat_pendaftaran(instance, created):
+    user = get_current_user()
+
+    diff = []
+    if created:
+        if user:
+            aksi, detail = "Tambah Pendaftaran", "Ditambahkan oleh admin"
+        elif not settings.AUDIT_PENDAFTARAN_ONLINE:
+            # pendaftaran publik sudah punya tanggal_pendaftaran sendiri,
+            # tidak perlu satu baris log lagi per pendaftar di jalur panas
+            snapshot(instance)
+            return
+        else:
+            aksi, detail = "Pendaftaran Online", "Mendaftar lewat form publik"
+    else:
+        diff = perubahan(instance)
+        if not diff:
+            return
+
+        if [f.name for f, _, _ in diff] == ['status']:
+            aksi = "Ubah Status"
+            detail = f"Status diubah ke {instance.get_status_display()}"
+        else:
+            aksi = "Ubah Data"
+            detail = "; ".join(
+                f"{f.verbose_name}: {_tampil(instance, f, lama)} -> {_tampil(instance, f, baru)}"
+                for f, lama, baru in diff
+            )
+
+    catat(instance.pk, aksi, detail, user, json_perubahan(diff) if diff else '')
+    snapshot(instance)
+
+
+def catat(pendaftaran_id, aksi, detail, user=None, perubahan=''):
+    catat_banyak([(pendaftaran_id, aksi, detail, perubahan)], user)
+
+
+def catat_banyak(entri, user=None):
+    """
+    Catat banyak log sekaligus (aksi massal, impor): `entri` berisi
+    (pendaftaran_id, aksi, detail, perubahan). Semua log audit lewat buffer,
+    tidak ada yang ditulis langsung di request.
+    """
+    from .models import LogAktivitas
+
+    logs = [
+        LogAktivitas(
+            user=user,
+            pendaftaran_id=pendaftaran_id,
+            aksi=aksi,
+            detail=detail,
+            perubahan=perubahan,
+        )
+        for pendaftaran_id, aksi, detail, perubahan in entri
+    ]
+    if logs:
+        # baru masuk buffer kalau transaksinya jadi commit
+        transaction.on_commit(lambda: buffer.tambah(*logs))
+
+
+# =====================================================
+# BUFFER + FLUSH (bulk_create di luar request)
+# =====================================================
+class BufferAudit:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bangun = threading.Event()
+        self._items = []
+        self._pid = None
+
+    def tambah(self, *logs):
+        mode = settings.AUDIT_FLUSH
+
+        with self._lock:
+            self._items.extend(logs)
+            penuh = len(self._items) >= settings.AUDIT_BUFFER_MAX
+
+        if mode == 'langsung':
+            self.flush()
+        elif mode == 'thread':
+            self._pastikan_thread()
+            if penuh:
+                self._bangun.set()
+        # mode 'request': di-flush oleh signal request_finished
+
+    def flush(self):
+        from .models import LogAktivitas
+
+        with self._lock:
+            items, self._items = self._items, []
+        if not items:
+            return 0
+
+        try:
+            LogAktivitas.objects.bulk_create(items)
+        except DatabaseError:
+            # satu baris rusak (mis. pendaftaran keburu dihapus) jangan
+            # sampai bikin satu batch hilang, simpan satu-satu
+            for log in items:
+                try:
+                    log.save()
+                except DatabaseError:
+                    logger.exception("Gagal menyimpan log audit: %s", log.aksi)
+        return len(items)
+
+    def _pastikan_thread(self):
+        # cek pid: setelah fork (gunicorn --preload) thread lama tidak ikut
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+
+        threading.Thread(target=self._loop, name='audit-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _loop(self):
+        while True:
+            self._bangun.wait(settings.AUDIT_FLUSH_DETIK)
+            self._bangun.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flush log audit gagal")
+            finally:
+                connection.close()
+
+
+buffer = BufferAudit()
+
+
+def flush():
+    return buffer.flush()
+
+
+# =====================================================
+# RIWAYAT PER PENDAFTAR
+# =====================================================
+def riwayat_pendaftaran(pendaftaran_id, arsip=False):
+    """Log satu pendaftar, terbaru dulu (index pendaftaran + timestamp)."""
+    from .models import LogAktivitas, ArsipLogAktivitas
+
+    if arsip:
+        return ArsipLogAktivitas.objects.filter(pendaftaran_id=pendaftaran_id)
+    return (
+        LogAktivitas.objects
+        .filter(pendaftaran_id=pendaftaran_id)
+        .select_related('user')
+    )
+
+
+# =====================================================
+# ARSIP LOG MUSIM LAMA
+# =====================================================
+KOLOM_ARSIP = [
+    'log_id', 'timestamp', 'user_id', 'username',
+    'pendaftaran_id', 'nomor_pendaftaran', 'aksi', 'detail', 'perubahan',
+]
+
+
+def _baris_arsip(qs):
+    return qs.values_list(
+        'id', 'timestamp', 'user_id', 'user__username',
+        'pendaftaran_id', 'pendaftaran__nomor_pendaftaran',
+        'aksi', 'detail', 'perubahan',
+    ).order_by('id')
+
+
+def arsipkan_log(sebelum, file=None, chunk=5000):
+    """
+    Pindahkan log dengan timestamp < `sebelum` ke tabel ArsipLogAktivitas,
+    atau ke file JSONL gzip kalau `file` diisi. Dikerjakan per potongan id
+    (satu transaksi per potongan) supaya tabel tidak terkunci lama.
+    """
+    from .models import LogAktivitas, ArsipLogAktivitas
+
+    qs = LogAktivitas.objects.filter(timestamp__lt=sebelum)
+    output = gzip.open(file, 'at', encoding='utf-8') if file else None
+    jumlah = 0
+    terakhir = 0
+
+    try:
+        while True:
+            rows = list(_baris_arsip(qs.filter(id__gt=terakhir))[:chunk])
+            if not rows:
+                break
+
+            with transaction.atomic():
+                if output:
+                    for row in rows:
+                        output.write(json.dumps(
+                            dict(zip(KOLOM_ARSIP, row)),
+                            cls=DjangoJSONEncoder,
+                            separators=(',', ':'),
+                        ) + "\n")
+                    output.flush()
+                else:
+                    ArsipLogAktivitas.objects.bulk_create([
+                        ArsipLogAktivitas(
+                            log_id=row[0],
+                            tahun=row[1].year,
+                            timestamp=row[1],
+                            user_id=row[2],
+                            username=row[3] or '',
+                            pendaftaran_id=row[4],
+                            nomor_pendaftaran=row[5] or '',
+                            aksi=row[6],
+                            detail=row[7],
+                            perubahan=row[8],
+                        )
+                        for row in rows
+                    ])
+
+                # hapus pakai rentang id, bukan IN (...) (batas variabel sqlite)
+                qs.filter(id__gt=terakhir, id__lte=rows[-1][0]).delete()
+                terakhir = rows[-1][0]
+
+            jumlah += len(rows)
+    finally:
+        if output:
+            output.close()
+
+    if jumlah:
+        _perbarui_statistik(qs.db, LogAktivitas, ArsipLogAktivitas)
+    return jumlah
+
+
+def _perbarui_statistik(db, *models):
+    # jumlah baris perkiraan admin log (PerkiraanPaginator, pg_class.reltuples)
+    # baru turun setelah ANALYZE; tanpa ini halaman belakang kosong sampai
+    # autovacuum sempat jalan
+    conn = connections[db]
+    if conn.vendor != 'postgresql':
+        return
+    with conn.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"ANALYZE {conn.ops.quote_name(model._meta.db_table)}")
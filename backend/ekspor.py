@@ -0,0 +1,229 @@
+import csv
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Pendaftaran
+
+
+# =====================================================
+# KOLOM EKSPOR
+# =====================================================
+KOLOM_PENDAFTARAN = [
+    ('nomor_pendaftaran', 'Nomor Pendaftaran'),
+    ('nik', 'NIK'),
+    ('nama_lengkap', 'Nama Lengkap'),
+    ('tempat_lahir', 'Tempat Lahir'),
+    ('tanggal_lahir', 'Tanggal Lahir'),
+    ('jenis_kelamin', 'Jenis Kelamin'),
+    ('agama', 'Agama'),
+    ('asal_sekolah', 'Asal Sekolah'),
+    ('dusun', 'Dusun'),
+    ('rt', 'RT'),
+    ('rw', 'RW'),
+    ('desa_kelurahan', 'Desa/Kelurahan'),
+    ('kecamatan', 'Kecamatan'),
+    ('kabupaten_kota', 'Kabupaten/Kota'),
+    ('nama_ayah', 'Nama Ayah'),
+    ('nama_ibu', 'Nama Ibu'),
+    ('no_wa', 'No WA'),
+    ('jurusan', 'Jurusan'),
+    ('jalur', 'Jalur'),
+    ('status', 'Status'),
+    ('nominal_pembayaran', 'Nominal Pembayaran'),
+    ('tanggal_pembayaran', 'Tanggal Pembayaran'),
+    ('tanggal_pendaftaran', 'Tanggal Pendaftaran'),
+]
+
+KOLOM_REKAP = [
+    ('nomor_pendaftaran', 'Nomor Pendaftaran'),
+    ('nama_lengkap', 'Nama Lengkap'),
+    ('jurusan', 'Jurusan'),
+    ('nominal_pembayaran', 'Nominal Pembayaran'),
+    ('tanggal_pembayaran', 'Tanggal Pembayaran'),
+    ('no_wa', 'No WA'),
+]
+
+_LABEL = {
+    'jenis_kelamin': dict(Pendaftaran._meta.get_field('jenis_kelamin').choices),
+    'jurusan': dict(Pendaftaran.JURUSAN_CHOICES),
+    'jalur': dict(Pendaftaran.JALUR_CHOICES),
+    'status': dict(Pendaftaran.STATUS_CHOICES),
+}
+
+
+def filter_ekspor(qs, params):
+    for field in ('status', 'jurusan', 'jalur'):
+        if params.get(field):
+            qs = qs.filter(**{field: params[field]})
+    return qs
+
+
+def _baris(qs, kolom):
+    fields = [field for field, _ in kolom]
+    labels = [_LABEL.get(field) for field in fields]
+    tz = timezone.get_current_timezone()
+
+    # values_list + iterator: tidak bikin objek model, memori tetap datar
+    rows = (
+        qs.order_by('id')
+        .values_list(*fields)
+        .iterator(chunk_size=settings.EKSPOR_CHUNK_SIZE)
+    )
+    for row in rows:
+        hasil = []
+        for value, label in zip(row, labels):
+            if label is not None:
+                value = label.get(value, value)
+            elif hasattr(value, 'tzinfo') and value.tzinfo is not None:
+                value = timezone.localtime(value, tz).strftime('%Y-%m-%d %H:%M')
+            hasil.append(value)
+        yield hasil
+
+
+# teks yang diawali karakter ini dibaca Excel/LibreOffice sebagai rumus
+# (formula injection lewat isian form publik), jadi diberi awalan '
+_AWALAN_RUMUS = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _aman(value):
+    if isinstance(value, str) and value.startswith(_AWALAN_RUMUS):
+        return "'" + value
+    return value
+
+
+# =====================================================
+# CSV
+# =====================================================
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(qs, kolom):
+    writer = csv.writer(_Echo())
+    yield '﻿'  # BOM biar Excel baca UTF-8 dengan benar
+    yield writer.writerow([header for _, header in kolom])
+    for row in _baris(qs, kolom):
+        yield writer.writerow(['' if v is None else _aman(v) for v in row])
+
+
+# =====================================================
+# XLSX (WRITE-ONLY, LANGSUNG DI-STREAM)
+# =====================================================
+_XLSX_STATIS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# karakter kontrol tidak boleh ada di XML
+_KARAKTER_ILEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _Pipa:
+    # tujuan tulis ZipFile yang tidak bisa di-seek, isinya diambil per potong
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def ambil(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _sel(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    teks = escape(_KARAKTER_ILEGAL.sub('', _aman(str(value))))
+    return f'<c t="inlineStr"><is><t>{teks}</t></is></c>'
+
+
+def _baris_xml(values):
+    return ('<row>' + ''.join(_sel(v) for v in values) + '</row>').encode()
+
+
+def stream_xlsx(qs, kolom, ukuran_potong=64 * 1024):
+    pipa = _Pipa()
+
+    with zipfile.ZipFile(pipa, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for nama, isi in _XLSX_STATIS.items():
+            zf.writestr(nama, isi)
+        yield pipa.ambil()
+
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_baris_xml([header for _, header in kolom]))
+
+            for row in _baris(qs, kolom):
+                sheet.write(_baris_xml(row))
+                if len(pipa.buffer) >= ukuran_potong:
+                    yield pipa.ambil()
+
+            sheet.write(b'</sheetData></worksheet>')
+
+    yield pipa.ambil()
+
+
+# =====================================================
+# RESPONSE
+# =====================================================
+def response_ekspor(qs, kolom, nama_file, format='csv'):
+    if format == 'xlsx':
+        response = StreamingHttpResponse(
+            stream_xlsx(qs, kolom),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    else:
+        format = 'csv'
+        response = StreamingHttpResponse(
+            stream_csv(qs, kolom),
+            content_type='text/csv; charset=utf-8'
+        )
+
+    response['Content-Disposition'] = f'attachment; filename="{nama_file}.{format}"'
+    return response
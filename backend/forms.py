@@ -1,7 +1,26 @@
+import re
+
 from django import forms
 from .models import Pendaftaran
+from .nik import NIK_RE, nik_terdaftar
 from django.core.exceptions import ValidationError
-import re
+from django.db import IntegrityError, transaction
+
+
+NIK_SUDAH_TERDAFTAR = "NIK ini sudah terdaftar."
+FORM_SUDAH_DIKIRIM = "Formulir ini sudah dikirim sebelumnya."
+
+
+def kolom_bentrok(exc):
+    """Kolom unik yang dilanggar IntegrityError, None kalau bukan unik.
+    PostgreSQL: nama constraint dari psycopg2; sqlite: teks pesannya
+    ("UNIQUE constraint failed: backend_pendaftaran.nik")."""
+    diag = getattr(exc.__cause__, 'diag', None)
+    teks = ' '.join(filter(None, [getattr(diag, 'constraint_name', None), str(exc)])).lower()
+    for kolom in ('kunci_idempotensi', 'nomor_pendaftaran', 'nik'):
+        if re.search(rf'(?<![a-z]){kolom}(?![a-z])', teks):
+            return kolom
+    return None
 
 
 class PendaftaranForm(forms.ModelForm):
@@ -57,11 +76,12 @@ class PendaftaranForm(forms.ModelForm):
     def clean_nik(self):
         nik = self.cleaned_data.get('nik')
 
-        if not re.match(r'^\d{16}$', nik):
+        if not NIK_RE.match(nik):
             raise ValidationError("NIK harus terdiri dari 16 digit angka.")
 
-        if Pendaftaran.objects.filter(nik=nik).exists():
-            raise ValidationError("NIK ini sudah terdaftar.")
+        # NIK baru tidak perlu query (lihat backend/nik.py)
+        if nik_terdaftar(nik):
+            raise ValidationError(NIK_SUDAH_TERDAFTAR, code='terdaftar')
 
         return nik
 
@@ -76,6 +96,11 @@ class PendaftaranForm(forms.ModelForm):
 
         return no_wa
 
+    def validate_unique(self):
+        # cek unik NIK sudah di clean_nik, yang bentrok karena submit barengan
+        # ditangkap unique constraint waktu save (lihat simpan())
+        pass
+
     def clean(self):
         cleaned_data = super().clean()
 
@@ -85,3 +110,22 @@ class PendaftaranForm(forms.ModelForm):
         self.instance.nomor_pendaftaran = None
 
         return cleaned_data
+
+    def simpan(self, kunci=None, sidik=''):
+        # satu transaksi: kalau NIK bentrok, nomor urut yang sudah diambil ikut batal
+        self.instance.kunci_idempotensi = kunci
+        self.instance.sidik_data = sidik
+        try:
+            with transaction.atomic():
+                return self.save()
+        except IntegrityError as exc:
+            # cuma bentrok NIK / kunci submit yang jadi error form,
+            # pelanggaran constraint lain tetap error server
+            kolom = kolom_bentrok(exc)
+            if kolom == 'nik':
+                self.add_error('nik', ValidationError(NIK_SUDAH_TERDAFTAR, code='terdaftar'))
+            elif kolom == 'kunci_idempotensi':
+                self.add_error(None, ValidationError(FORM_SUDAH_DIKIRIM, code='dikirim'))
+            else:
+                raise
+            return None
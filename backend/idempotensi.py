@@ -0,0 +1,71 @@
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Pendaftaran
+
+
+# =====================================================
+# KUNCI IDEMPOTENSI FORM PENDAFTARAN PUBLIK
+# =====================================================
+# Kunci dibuat waktu form ditampilkan dan ikut tersimpan di baris pendaftaran
+# (kolom unik, jadi tidak ada tulis tambahan) bersama sidik (hash) isi form.
+# Submit ulang dengan kunci yang sama dijawab redirect ke halaman sukses yang
+# pertama, asal isi form-nya sama (sidik cocok):
+# - dari cache (TTL pendek) kalau sampai ke worker yang sama
+# - dari DB (SELECT by kunci) kalau form-nya gagal karena NIK/kunci sudah ada
+# Kunci sama dengan isi berbeda ditolak ("formulir sudah dikirim").
+KUNCI_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# field POST yang bukan isi form
+_BUKAN_DATA = {'csrfmiddlewaretoken', 'kunci', '_tiket'}
+
+
+def kunci_baru():
+    return uuid.uuid4().hex
+
+
+def kunci_dari(request):
+    kunci = request.POST.get('kunci', '')
+    return kunci if KUNCI_RE.match(kunci) else None
+
+
+def sidik_data(post):
+    """sha256 isi form yang dinormalisasi (urut per field, spasi tepi dibuang)."""
+    isi = sorted(
+        (key, [value.strip() for value in values])
+        for key, values in post.lists() if key not in _BUKAN_DATA
+    )
+    return hashlib.sha256(repr(isi).encode()).hexdigest()
+
+
+def _cache_key(kunci):
+    return f"idempotensi:{kunci}"
+
+
+def simpan_hasil(kunci, pk, sidik):
+    if kunci:
+        cache.set(_cache_key(kunci), (pk, sidik), settings.IDEMPOTENSI_TTL)
+
+
+def hasil_cache(kunci):
+    """(pk, sidik) submit pertama dengan kunci ini, None kalau tidak ada."""
+    return cache.get(_cache_key(kunci)) if kunci else None
+
+
+def hasil_db(kunci):
+    if not kunci:
+        return None
+
+    hasil = (
+        Pendaftaran.objects
+        .filter(kunci_idempotensi=kunci)
+        .values_list('pk', 'sidik_data')
+        .first()
+    )
+    if hasil:
+        simpan_hasil(kunci, *hasil)
+    return hasil
@@ -0,0 +1,304 @@
+import csv
+import io
+import re
+import zipfile
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+
+from . import audit
+from .forms import PendaftaranForm
+from .models import Pendaftaran, NomorUrutPendaftaran
+from .signals import jalur_otomatis, format_nomor
+from .statistik import reset_statistik
+
+
+# =====================================================
+# BACA FILE (CSV / XLSX) BARIS PER BARIS
+# =====================================================
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+class FileTidakValid(Exception):
+    # file rusak / bukan CSV-XLSX: impor berhenti, dilaporkan lewat HasilImpor
+    pass
+
+
+def _kolom_ke_index(ref):
+    huruf = re.match(r'[A-Z]+', ref or '')
+    if not huruf:
+        return None
+    index = 0
+    for h in huruf.group():
+        index = index * 26 + (ord(h) - ord('A') + 1)
+    return index - 1
+
+
+def _shared_string(shared, c):
+    # sel 's' tanpa <v> atau index di luar sharedStrings dianggap kosong
+    try:
+        return shared[int(c.findtext(_NS + 'v'))]
+    except (TypeError, ValueError, IndexError):
+        return ''
+
+
+def _baca_xlsx(file):
+    try:
+        yield from _baca_xlsx_zip(file)
+    except (zipfile.BadZipFile, zlib.error, ElementTree.ParseError, EOFError) as exc:
+        raise FileTidakValid(f"File XLSX rusak atau bukan format Excel (.xlsx): {exc}") from exc
+
+
+def _baca_xlsx_zip(file):
+    with zipfile.ZipFile(file) as zf:
+        names = zf.namelist()
+
+        shared = []
+        if 'xl/sharedStrings.xml' in names:
+            for _, el in ElementTree.iterparse(zf.open('xl/sharedStrings.xml')):
+                if el.tag == _NS + 'si':
+                    shared.append(''.join(t.text or '' for t in el.iter(_NS + 't')))
+                    el.clear()
+
+        sheets = sorted(
+            n for n in names
+            if n.startswith('xl/worksheets/') and n.endswith('.xml')
+        )
+        if not sheets:
+            return
+
+        for _, el in ElementTree.iterparse(zf.open(sheets[0])):
+            if el.tag != _NS + 'row':
+                continue
+
+            values = []
+            for c in el.findall(_NS + 'c'):
+                index = _kolom_ke_index(c.get('r'))
+                if index is not None:
+                    values.extend([''] * (index - len(values)))
+
+                tipe = c.get('t')
+                if tipe == 's':
+                    value = _shared_string(shared, c)
+                elif tipe == 'inlineStr':
+                    value = ''.join(t.text or '' for t in c.iter(_NS + 't'))
+                else:
+                    value = c.findtext(_NS + 'v') or ''
+                    if value.endswith('.0'):
+                        value = value[:-2]
+                values.append(value)
+
+            el.clear()
+            yield values
+
+
+def _baca_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', errors='replace', newline='')
+    contoh = text.read(4096)
+    text.seek(0)
+    delimiter = ';' if contoh.count(';') > contoh.count(',') else ','
+    try:
+        yield from csv.reader(text, delimiter=delimiter)
+    except csv.Error as exc:
+        raise FileTidakValid(f"File CSV tidak bisa dibaca: {exc}") from exc
+
+
+def _normalisasi_header(header):
+    return re.sub(r'[^a-z0-9]+', '_', header.strip().lower()).strip('_')
+
+
+def baca_baris(file, nama_file):
+    if nama_file.lower().endswith('.xlsx'):
+        rows = _baca_xlsx(file)
+    else:
+        rows = _baca_csv(file)
+
+    header = None
+    for nomor_baris, values in enumerate(rows, start=1):
+        if header is None:
+            header = [_normalisasi_header(h) for h in values]
+            continue
+        if not any(str(v).strip() for v in values):
+            continue
+        yield nomor_baris, dict(zip(header, values))
+
+
+# =====================================================
+# VALIDASI (ATURAN SAMA DENGAN PendaftaranForm)
+# =====================================================
+class PendaftaranImportForm(PendaftaranForm):
+    # cek NIK ke DB dilakukan sekali per batch (IN query), bukan per baris
+
+    def clean_nik(self):
+        nik = self.cleaned_data.get('nik')
+        if not re.match(r'^\d{16}$', nik):
+            raise ValidationError("NIK harus terdiri dari 16 digit angka.")
+        return nik
+
+    def validate_unique(self):
+        pass
+
+
+# label pilihan juga diterima (hasil ekspor bisa diimpor ulang)
+_PILIHAN = {
+    'jurusan': Pendaftaran.JURUSAN_CHOICES,
+    'jenis_kelamin': Pendaftaran._meta.get_field('jenis_kelamin').choices,
+}
+_PILIHAN = {
+    field: {
+        **{label.upper(): key for key, label in choices},
+        **{key.upper(): key for key, _ in choices},
+    }
+    for field, choices in _PILIHAN.items()
+}
+
+_TANGGAL_INDONESIA = re.compile(r'^(\d{1,2})[/-](\d{1,2})[/-](\d{4})$')
+
+
+def _siapkan_data(row):
+    data = {key: str(value).strip() for key, value in row.items() if key}
+
+    for field, pilihan in _PILIHAN.items():
+        if data.get(field):
+            data[field] = pilihan.get(data[field].upper(), data[field])
+
+    # no WA dari Excel sering kehilangan angka 0 di depan
+    no_wa = data.get('no_wa', '')
+    if no_wa.startswith('8'):
+        data['no_wa'] = '0' + no_wa
+
+    tanggal = data.get('tanggal_lahir', '')
+    cocok = _TANGGAL_INDONESIA.match(tanggal)
+    if cocok:
+        # format Indonesia: hari/bulan/tahun
+        hari, bulan, tahun = cocok.groups()
+        data['tanggal_lahir'] = f"{tahun}-{int(bulan):02d}-{int(hari):02d}"
+    elif tanggal.isdigit():
+        # serial tanggal Excel
+        data['tanggal_lahir'] = (date(1899, 12, 30) + timedelta(days=int(tanggal))).isoformat()
+
+    return data
+
+
+# =====================================================
+# IMPOR
+# =====================================================
+class HasilImpor:
+
+    def __init__(self):
+        self.berhasil = 0
+        self.errors = []  # (nomor_baris, pesan)
+        self.error_file = ''  # file rusak, pembacaan berhenti di tengah
+
+    def tambah_error(self, nomor_baris, pesan):
+        self.errors.append((nomor_baris, pesan))
+
+
+def _pesan_form(form):
+    return "; ".join(
+        f"{field}: {' '.join(errors)}"
+        for field, errors in form.errors.items()
+    )
+
+
+def _simpan_batch(batch, hasil, nik_terlihat, user):
+    valid = []
+    for nomor_baris, row in batch:
+        form = PendaftaranImportForm(_siapkan_data(row))
+        if not form.is_valid():
+            hasil.tambah_error(nomor_baris, _pesan_form(form))
+            continue
+
+        nik = form.cleaned_data['nik']
+        if nik in nik_terlihat:
+            hasil.tambah_error(nomor_baris, "nik: NIK dobel di dalam file.")
+            continue
+        nik_terlihat.add(nik)
+        valid.append((nomor_baris, form.instance))
+
+    if not valid:
+        return
+
+    # satu query IN untuk cek NIK yang sudah terdaftar
+    sudah_ada = set(
+        Pendaftaran.objects
+        .filter(nik__in=[obj.nik for _, obj in valid])
+        .values_list('nik', flat=True)
+    )
+    for nomor_baris, obj in valid:
+        if obj.nik in sudah_ada:
+            hasil.tambah_error(nomor_baris, "nik: NIK ini sudah terdaftar.")
+    valid = [(n, obj) for n, obj in valid if obj.nik not in sudah_ada]
+    if not valid:
+        return
+
+    tahun = timezone.now().year
+    per_jurusan = defaultdict(list)
+    for _, obj in valid:
+        obj.normalisasi()
+        if not obj.jalur:
+            obj.jalur = jalur_otomatis()
+        per_jurusan[obj.jurusan].append(obj)
+
+    try:
+        with transaction.atomic():
+            # nomor dialokasikan per blok, satu UPDATE per jurusan
+            for jurusan, objs in per_jurusan.items():
+                awal = NomorUrutPendaftaran.ambil_blok(tahun, jurusan, len(objs))
+                for i, obj in enumerate(objs):
+                    obj.nomor_pendaftaran = format_nomor(tahun, jurusan, awal + i)
+
+            objs = [obj for _, obj in valid]
+            Pendaftaran.objects.bulk_create(objs)
+
+            # bulk_create tanpa signal: log ditambahkan ke buffer audit di sini
+            # (sqlite tidak mengembalikan pk hasil bulk_create)
+            pks = dict(
+                Pendaftaran.objects
+                .filter(nik__in=[obj.nik for obj in objs])
+                .values_list('nik', 'pk')
+            )
+            audit.catat_banyak(
+                [(pks[obj.nik], "Tambah Pendaftaran", "Diimpor dari file", '') for obj in objs],
+                user,
+            )
+    except IntegrityError as exc:
+        # biasanya NIK yang sama baru saja didaftarkan dari form publik
+        for nomor_baris, _ in valid:
+            hasil.tambah_error(nomor_baris, f"Gagal disimpan: {exc}")
+        return
+
+    hasil.berhasil += len(objs)
+
+
+def impor_pendaftaran(rows, batch_size=None, user=None):
+    batch_size = batch_size or settings.IMPOR_BATCH_SIZE
+    hasil = HasilImpor()
+    nik_terlihat = set()
+
+    batch = []
+    terakhir = 0
+    try:
+        for item in rows:
+            terakhir = item[0]
+            batch.append(item)
+            if len(batch) >= batch_size:
+                _simpan_batch(batch, hasil, nik_terlihat, user)
+                batch = []
+    except FileTidakValid as exc:
+        # baris yang sudah terbaca tetap diimpor, sisanya dilaporkan
+        hasil.error_file = (
+            f"{exc} (berhenti setelah baris {terakhir})" if terakhir else str(exc)
+        )
+    if batch:
+        _simpan_batch(batch, hasil, nik_terlihat, user)
+
+    if hasil.berhasil:
+        reset_statistik()
+    return hasil
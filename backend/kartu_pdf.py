@@ -0,0 +1,308 @@
+import multiprocessing
+import struct
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import dateformat, timezone
+
+from .qr import _baca_disk, _disk_path, qr_key, render_qr_worker
+
+
+# =====================================================
+# CETAK KARTU MASSAL (SATU PDF, BANYAK HALAMAN)
+# =====================================================
+# PDF ditulis langsung ke file objek demi objek, yang disimpan di memori
+# cuma offset tiap objek. QR yang belum ada di cache dibuat paralel di
+# ProcessPoolExecutor per potongan KARTU_PDF_CHUNK pendaftar.
+A4 = (595.28, 841.89)
+MARGIN = 42
+KARTU_PER_HALAMAN = 2
+
+KOLOM_KARTU = [
+    ('Nomor Pendaftaran', 'nomor_pendaftaran'),
+    ('Nama Lengkap', 'nama_lengkap'),
+    ('NIK', 'nik'),
+    ('Jurusan', 'get_jurusan_display'),
+    ('Jalur', 'get_jalur_display'),
+    ('Status', 'get_status_display'),
+    ('Asal Sekolah', 'asal_sekolah'),
+    ('No WhatsApp', 'no_wa'),
+    ('Tanggal Daftar', 'tanggal_pendaftaran'),
+]
+
+FIELD_KARTU = [
+    'nomor_pendaftaran', 'nama_lengkap', 'nik', 'jurusan', 'jalur',
+    'status', 'asal_sekolah', 'no_wa', 'tanggal_pendaftaran',
+]
+
+
+# =====================================================
+# QR
+# =====================================================
+def qr_data(base_url, nomor_pendaftaran):
+    # sama dengan isi QR di qr_kartu, jadi cache-nya terpakai bersama
+    return base_url.rstrip('/') + reverse('print_kartu', args=[nomor_pendaftaran])
+
+
+def _qr_cache(nomor_pendaftaran, data):
+    key = qr_key(nomor_pendaftaran, data)
+    png = cache.get(f"qr:{key}")
+    if png is None and settings.QR_DISK_CACHE:
+        png = _baca_disk(key)
+    return png
+
+
+def _ambil_qr(potongan, base_url, pool):
+    hasil = {}
+    kurang = []
+    for p in potongan:
+        data = qr_data(base_url, p.nomor_pendaftaran)
+        png = _qr_cache(p.nomor_pendaftaran, data)
+        if png is None:
+            path = None
+            if settings.QR_DISK_CACHE:
+                path = _disk_path(qr_key(p.nomor_pendaftaran, data))
+            kurang.append((p.nomor_pendaftaran, (data, path)))
+        else:
+            hasil[p.nomor_pendaftaran] = png
+
+    if kurang:
+        tugas = [t for _, t in kurang]
+        pngs = pool.map(render_qr_worker, tugas) if pool else map(render_qr_worker, tugas)
+        for (nomor, _), png in zip(kurang, pngs):
+            hasil[nomor] = png
+    return hasil
+
+
+# =====================================================
+# PNG -> IMAGE XOBJECT
+# =====================================================
+def _png_chunks(png):
+    pos = 8
+    while pos < len(png):
+        panjang, jenis = struct.unpack('>I4s', png[pos:pos + 8])
+        yield jenis, png[pos + 8:pos + 8 + panjang]
+        pos += 12 + panjang
+
+
+def _normalisasi_png(png):
+    # alpha/interlace tidak bisa langsung dipakai PDF, ubah ke grayscale
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.open(BytesIO(png)).convert('L').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def gambar_png(png):
+    """Kamus objek image + isi stream. Data IDAT PNG dipakai apa adanya
+    (Flate + predictor PNG), tanpa decode piksel."""
+    chunks = list(_png_chunks(png))
+    lebar, tinggi, bit, warna, _, _, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    if warna not in (0, 2, 3) or interlace:
+        return gambar_png(_normalisasi_png(png))
+
+    idat = b''.join(isi for jenis, isi in chunks if jenis == b'IDAT')
+    komponen = 3 if warna == 2 else 1
+    if warna == 3:
+        plte = next(isi for jenis, isi in chunks if jenis == b'PLTE')
+        ruang_warna = b'[/Indexed /DeviceRGB %d <%s>]' % (len(plte) // 3 - 1, plte.hex().encode())
+    else:
+        ruang_warna = b'/DeviceRGB' if warna == 2 else b'/DeviceGray'
+
+    kamus = (
+        b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+        b'/BitsPerComponent %d /Filter /FlateDecode '
+        b'/DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >>'
+        % (lebar, tinggi, ruang_warna, bit, komponen, bit, lebar)
+    )
+    return kamus, idat
+
+
+# =====================================================
+# PENULIS PDF
+# =====================================================
+def _teks(value):
+    isi = str(value).encode('cp1252', errors='replace')
+    isi = isi.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return b'(' + isi + b')'
+
+
+class PenulisPDF:
+    # objek 1 = catalog, 2 = pages, 3-4 = font; sisanya diberi nomor urut
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = {}
+        self.halaman = []
+        self.nomor = 4
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self.objek(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        self.objek(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+
+    def nomor_baru(self):
+        self.nomor += 1
+        return self.nomor
+
+    def objek(self, nomor, isi):
+        self.offset[nomor] = self.file.tell()
+        self.file.write(b'%d 0 obj\n' % nomor + isi + b'\nendobj\n')
+
+    def stream(self, kamus, data):
+        nomor = self.nomor_baru()
+        self.objek(
+            nomor,
+            b'<< ' + kamus + b' /Length %d >>\nstream\n' % len(data) + data + b'\nendstream'
+        )
+        return nomor
+
+    def tambah_halaman(self, konten, gambar):
+        isi = self.stream(b'/Filter /FlateDecode', zlib.compress(konten))
+        xobject = b' '.join(b'/%s %d 0 R' % (nama, nomor) for nama, nomor in gambar.items())
+        nomor = self.nomor_baru()
+        self.objek(nomor, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> /XObject << %s >> >> '
+            b'/Contents %d 0 R >>' % (A4[0], A4[1], xobject, isi)
+        ))
+        self.halaman.append(nomor)
+
+    def selesai(self):
+        kids = b' '.join(b'%d 0 R' % n for n in self.halaman)
+        self.objek(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.halaman)))
+        self.objek(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+        xref = self.file.tell()
+        jumlah = self.nomor + 1
+        self.file.write(b'xref\n0 %d\n0000000000 65535 f \n' % jumlah)
+        for n in range(1, jumlah):
+            self.file.write(b'%010d 00000 n \n' % self.offset[n])
+        self.file.write(
+            b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (jumlah, xref)
+        )
+
+
+# =====================================================
+# TATA LETAK KARTU
+# =====================================================
+def _nilai(pendaftaran, atribut):
+    if atribut == 'tanggal_pendaftaran':
+        return dateformat.format(timezone.localtime(pendaftaran.tanggal_pendaftaran), 'd F Y - H:i')
+    value = getattr(pendaftaran, atribut)
+    return (value() if callable(value) else value) or '-'
+
+
+def konten_kartu(pendaftaran, gambar, atas):
+    """Operator PDF untuk satu kartu, `atas` = koordinat y tepi atas kartu."""
+    lebar = A4[0] - 2 * MARGIN
+    tinggi = (A4[1] - 2 * MARGIN) / KARTU_PER_HALAMAN - 18
+    kiri = MARGIN
+    bawah = atas - tinggi
+
+    ops = [
+        b'q 0.05 0.43 0.99 RG 1.5 w %.2f %.2f %.2f %.2f re S Q' % (kiri, bawah, lebar, tinggi),
+        b'BT /F2 14 Tf %.2f %.2f Td %s Tj ET' % (kiri + 18, atas - 30, _teks('KARTU PENDAFTARAN SISWA BARU')),
+        b'BT /F2 12 Tf %.2f %.2f Td %s Tj ET' % (kiri + 18, atas - 47, _teks("SMK Ma'arif 9 Kebumen")),
+        b'BT /F1 9 Tf %.2f %.2f Td %s Tj ET' % (kiri + 18, atas - 60, _teks('Tahun Ajaran 2026/2027')),
+        b'q 0.05 0.43 0.99 RG 1.5 w %.2f %.2f m %.2f %.2f l S Q' % (kiri, atas - 70, kiri + lebar, atas - 70),
+    ]
+
+    y = atas - 92
+    for label, atribut in KOLOM_KARTU:
+        ops.append(b'BT /F2 10 Tf %.2f %.2f Td %s Tj ET' % (kiri + 18, y, _teks(label)))
+        ops.append(b'BT /F1 10 Tf %.2f %.2f Td %s Tj ET' % (kiri + 130, y, _teks(_nilai(pendaftaran, atribut))))
+        y -= 20
+
+    ukuran_qr = 150
+    qr_x = kiri + lebar - ukuran_qr - 18
+    qr_y = atas - 92 - ukuran_qr + 10
+    ops += [
+        b'BT /F2 10 Tf %.2f %.2f Td %s Tj ET' % (qr_x + 38, atas - 88, _teks('QR Verifikasi')),
+        b'q %d 0 0 %d %.2f %.2f cm /%s Do Q' % (ukuran_qr, ukuran_qr, qr_x, qr_y - 8, gambar),
+        b'BT /F1 8 Tf %.2f %.2f Td %s Tj ET' % (qr_x + 5, qr_y - 20, _teks('Scan untuk verifikasi data pendaftaran')),
+        b'BT /F1 8 Tf %.2f %.2f Td %s Tj ET' % (
+            kiri + 18, bawah + 14,
+            _teks('Kartu ini digunakan sebagai bukti resmi pendaftaran. '
+                  'Harap dibawa saat verifikasi dan daftar ulang.'),
+        ),
+    ]
+    return b'\n'.join(ops)
+
+
+# =====================================================
+# CETAK
+# =====================================================
+def _potongan(qs, ukuran):
+    potongan = []
+    for p in qs.only(*FIELD_KARTU).order_by('nomor_pendaftaran').iterator(chunk_size=ukuran):
+        potongan.append(p)
+        if len(potongan) == ukuran:
+            yield potongan
+            potongan = []
+    if potongan:
+        yield potongan
+
+
+def cetak_kartu_pdf(qs, file, base_url, workers=None):
+    """Tulis kartu semua pendaftar di `qs` ke `file` (biner, bisa di-seek).
+    Mengembalikan jumlah kartu."""
+    if workers is None:
+        workers = settings.KARTU_PDF_WORKERS
+    pool = None
+    if workers > 1:
+        # spawn, bukan fork: cetak bisa jalan di proses yang punya thread lain
+        # (flush audit, pool worker) dan koneksi DB yang tidak boleh diwarisi
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+
+    pdf = PenulisPDF(file)
+    jumlah = 0
+    try:
+        for potongan in _potongan(qs, settings.KARTU_PDF_CHUNK):
+            qr = _ambil_qr(potongan, base_url, pool)
+            for i in range(0, len(potongan), KARTU_PER_HALAMAN):
+                konten, gambar = [], {}
+                for posisi, p in enumerate(potongan[i:i + KARTU_PER_HALAMAN]):
+                    kamus, data = gambar_png(qr[p.nomor_pendaftaran])
+                    nama = b'QR%d' % posisi
+                    gambar[nama] = pdf.stream(kamus, data)
+                    atas = A4[1] - MARGIN - posisi * (A4[1] - 2 * MARGIN) / KARTU_PER_HALAMAN
+                    konten.append(konten_kartu(p, nama, atas))
+                    jumlah += 1
+                pdf.tambah_halaman(b'\n'.join(konten), gambar)
+        pdf.selesai()
+    finally:
+        if pool:
+            pool.shutdown()
+    return jumlah
+
+
+def nama_file_kartu(params):
+    bagian = ['kartu'] + [params[f] for f in ('jurusan', 'status', 'jalur') if params.get(f)]
+    return '_'.join(bagian) + '.pdf'
+
+
+def melebihi_batas_sinkron(qs):
+    """Pesan error kalau `qs` terlalu banyak untuk dicetak langsung di
+    request web (tanpa antrean tugas), None kalau masih boleh."""
+    jumlah = qs.count()
+    if jumlah <= settings.KARTU_PDF_MAKS_SINKRON:
+        return None
+    return (
+        f"{jumlah} kartu terlalu banyak untuk dibuat langsung "
+        f"(maks. {settings.KARTU_PDF_MAKS_SINKRON}). Persempit filter, aktifkan "
+        f"TUGAS_AKTIF + `manage.py runworker`, atau pakai `manage.py cetak_kartu`."
+    )
+
+
+def cetak_ke_file_sementara(qs, base_url):
+    # dipakai view/admin: hasilnya dikirim FileResponse, file hilang saat ditutup.
+    # Tanpa pool proses: jangan fork/spawn proses dari dalam worker web
+    file = tempfile.TemporaryFile()
+    cetak_kartu_pdf(qs, file, base_url, workers=1)
+    file.seek(0)
+    return file
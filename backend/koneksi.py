@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import connections
+
+from .replika import REPLIKA
+
+
+# =====================================================
+# SQLITE: PRAGMA TIAP KONEKSI BARU
+# =====================================================
+def atur_sqlite(connection):
+    pragma = dict(settings.SQLITE_PRAGMA)
+    if connection.alias == REPLIKA:
+        # file snapshot diganti utuh, jangan diubah ke WAL
+        pragma.pop('journal_mode', None)
+
+    with connection.cursor() as cursor:
+        for nama, nilai in pragma.items():
+            cursor.execute(f"PRAGMA {nama} = {nilai}")
+
+
+# =====================================================
+# KONEKSI PERSISTEN: CEK SEBELUM DIPAKAI ULANG
+# =====================================================
+def cek_koneksi():
+    for conn in connections.all():
+        # koneksi yang ditutup tiap request (CONN_MAX_AGE=0) tidak perlu dicek
+        if conn.connection is None or not conn.settings_dict['CONN_MAX_AGE']:
+            continue
+        if conn.in_atomic_block:
+            continue
+        if not conn.is_usable():
+            conn.close()
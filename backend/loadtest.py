@@ -0,0 +1,377 @@
+import http.client
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+# =====================================================
+# DATABASE UJI (TERPISAH DARI DATA ASLI)
+# =====================================================
+@contextmanager
+def database_uji():
+    if connection.vendor == 'sqlite':
+        # sqlite in-memory tidak bisa dipakai bareng antar thread,
+        # jadi pakai file sementara
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+
+    from .nik import daftar_nik
+    daftar_nik.reset()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0,
+        autoclobber=True,
+        serialize=False,
+    )
+    try:
+        yield
+    finally:
+        # log aktivitas yang masih di buffer ditulis dulu sebelum db dihapus
+        from .audit import flush
+        flush()
+        daftar_nik.reset()
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+# =====================================================
+# HITUNG QUERY (TANPA BATAS 9000 SEPERTI CaptureQueriesContext)
+# =====================================================
+class PenghitungQuery:
+
+    def __init__(self):
+        self.jumlah = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.jumlah += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._wrapper.__exit__(*exc)
+
+
+# =====================================================
+# SKENARIO JALUR PANAS (BENCHMARK & TEST REGRESI)
+# =====================================================
+# nama -> (method, butuh login admin, porsi jumlah request)
+SKENARIO = {
+    'home_post': ('POST', False, 1),
+    'print_kartu': ('GET', False, 1),
+    'qr_kartu': ('GET', False, 1),
+    'dashboard_admin': ('GET', True, 1),
+    'pendaftaran_list': ('GET', True, 1),
+    'pendaftaran_cari': ('GET', True, 1),
+    'export_csv': ('GET', True, 0.1),
+}
+
+# batas regresi per skenario. Query per request (lengkap termasuk session &
+# user, koneksi test tidak ditutup per request) dicek backend/tests.py; p95
+# (ms) tergantung mesin, jadi cuma dicek `manage.py benchmark --cek-batas`
+# di mesin yang tidak sedang sibuk
+BATAS_QUERY = {
+    'home_post': 11,
+    'print_kartu': 1,
+    'qr_kartu': 1,
+    'dashboard_admin': 4,
+    'pendaftaran_list': 3,
+    'pendaftaran_cari': 4,
+    'export_csv': 3,
+}
+BATAS_P95_MS = {
+    'home_post': 1000,
+    'print_kartu': 500,
+    'qr_kartu': 500,
+    'dashboard_admin': 500,
+    'pendaftaran_list': 1000,
+    'pendaftaran_cari': 1000,
+    'export_csv': 1000,
+}
+
+
+def request_skenario(nama, i, nomors):
+    """(method, url, data POST) request ke-i skenario `nama`."""
+    from django.urls import reverse
+
+    nomor = nomors[i % len(nomors)]
+    if nama == 'home_post':
+        # NIK di luar rentang data dummy biar tidak bentrok
+        return 'post', reverse('home'), data_pendaftaran(10_000_000 + i)
+    if nama == 'print_kartu':
+        return 'get', reverse('print_kartu', args=[nomor]), None
+    if nama == 'qr_kartu':
+        return 'get', reverse('qr_kartu', args=[nomor]), None
+    if nama == 'dashboard_admin':
+        return 'get', reverse('dashboard_admin'), None
+    if nama == 'pendaftaran_list':
+        return 'get', reverse('admin_pendaftaran_list') + '?status=diterima', None
+    if nama == 'pendaftaran_cari':
+        keyword = ['BUDI', 'SITI RAHAYU', '33050000000', 'PPDB-'][i % 4]
+        return 'get', reverse('admin_pendaftaran_list') + f'?q={keyword}', None
+    return 'get', reverse('export_pendaftaran') + '?format=csv&status=diterima&jurusan=RPL', None
+
+
+# =====================================================
+# QUERY PLAN (EXPLAIN) QUERY PANAS
+# =====================================================
+# tanda query jatuh ke full scan / sort manual
+TANDA_FULL_SCAN = {
+    'sqlite': ['USE TEMP B-TREE FOR ORDER BY'],
+    'postgresql': ['Seq Scan', 'Sort'],
+}
+
+
+def query_panas():
+    from .models import Pendaftaran, LogAktivitas
+
+    pendaftaran = Pendaftaran.objects.order_by('-tanggal_pendaftaran')
+    log = LogAktivitas.objects.order_by('-timestamp')
+
+    return {
+        'dashboard terbaru': pendaftaran[:10],
+        'list filter status': pendaftaran.filter(status='diterima')[:10],
+        'list filter jurusan': pendaftaran.filter(jurusan='RPL')[:10],
+        'list filter status+jurusan': pendaftaran.filter(status='diterima', jurusan='RPL')[:10],
+        'kartu per nomor': Pendaftaran.objects.filter(nomor_pendaftaran=f'PPDB-{TAHUN_DUMMY}-RPL-0001'),
+        'cek nik': Pendaftaran.objects.filter(nik='3305000000000001'),
+        'log terbaru': log[:50],
+        'log per pendaftaran': log.filter(pendaftaran_id=1)[:50],
+        'log per user': log.filter(user_id=1)[:50],
+    }
+
+
+def siapkan_explain():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("ANALYZE")
+        elif connection.vendor == 'postgresql':
+            # tabel kecil di DB uji bikin planner pilih seq scan
+            cursor.execute("SET enable_seqscan = off")
+
+
+def regresi_plan(plan):
+    """Baris/tanda full scan di hasil EXPLAIN, kosong kalau pakai index."""
+    regresi = [t for t in TANDA_FULL_SCAN.get(connection.vendor, []) if t in plan]
+    if connection.vendor == 'sqlite':
+        regresi += [
+            line.strip() for line in plan.splitlines()
+            if 'SCAN ' in line and 'USING' not in line
+        ]
+    return regresi
+
+
+# =====================================================
+# EKSEKUSI PARALEL
+# =====================================================
+def jalankan_paralel(fungsi, jumlah, worker):
+    def tugas(i):
+        try:
+            return fungsi(i)
+        finally:
+            # tiap thread punya koneksi sendiri, tutup biar tidak bocor
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=worker) as executor:
+        return list(executor.map(tugas, range(jumlah)))
+
+
+def tulis_campur(nomor, transaksi):
+    """Satu penulis: daftar + baca statistik + ubah status, `transaksi` kali.
+    Error 'database is locked' dihitung terpisah dari error lain."""
+    from django.db import OperationalError
+    from .models import Pendaftaran
+    from .statistik import get_statistik
+
+    hasil = {'berhasil': 0, 'locked': 0, 'error': []}
+
+    for i in range(transaksi):
+        try:
+            p = Pendaftaran(**data_pendaftaran(nomor * 100_000 + i))
+            p.save()
+            get_statistik()
+            p.status = 'diterima'
+            p.save()
+            hasil['berhasil'] += 1
+        except OperationalError as exc:
+            if 'locked' in str(exc):
+                hasil['locked'] += 1
+            else:
+                hasil['error'].append(repr(exc))
+
+    return hasil
+
+
+def data_pendaftaran(i, jurusan='RPL'):
+    return {
+        'nik': f"{3305000000000000 + i}",
+        'nama_lengkap': f"siswa uji {i}",
+        'tempat_lahir': 'Kebumen',
+        'tanggal_lahir': '2010-01-01',
+        'jenis_kelamin': 'L' if i % 2 else 'P',
+        'agama': 'Islam',
+        'asal_sekolah': 'SMP Uji',
+        'desa_kelurahan': 'Desa Uji',
+        'kecamatan': 'Kecamatan Uji',
+        'kabupaten_kota': 'Kebumen',
+        'nama_ibu': 'Ibu Uji',
+        'no_wa': f"08{i:010d}"[:13],
+        'jurusan': jurusan,
+    }
+
+
+# =====================================================
+# DATA DUMMY (BULK, TANPA SIGNAL)
+# =====================================================
+NAMA_DEPAN = [
+    'AHMAD', 'BUDI', 'DEWI', 'EKO', 'FITRI', 'GILANG', 'HANA', 'INDRA',
+    'JOKO', 'KURNIA', 'LESTARI', 'MUHAMMAD', 'NUR', 'PUTRI', 'RIZKY',
+    'SITI', 'TAUFIK', 'UMI', 'WAHYU', 'YOGA',
+]
+NAMA_BELAKANG = [
+    'SANTOSO', 'PRASETYO', 'WIBOWO', 'SAPUTRA', 'RAHAYU', 'HIDAYAT',
+    'NUGROHO', 'KURNIAWAN', 'LESTARI', 'PURNOMO', 'SETIAWAN', 'WULANDARI',
+]
+
+
+# =====================================================
+# SERVER HTTP UJI (JUMLAH WORKER TETAP SEPERTI GUNICORN)
+# =====================================================
+class _HandlerSenyap(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class _ServerPool(WSGIServer):
+    # koneksi yang datang saat semua worker sibuk menunggu di antrean pool,
+    # sama seperti request yang menunggu worker gunicorn kosong
+    request_queue_size = 1024
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._proses, request, client_address)
+
+    def _proses(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            connections.close_all()
+
+
+@contextmanager
+def server_uji(app, worker):
+    server = _ServerPool(('127.0.0.1', 0), _HandlerSenyap)
+    server.pool = ThreadPoolExecutor(max_workers=worker)
+    server.set_app(app)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.pool.shutdown()
+        server.server_close()
+
+
+def request_http(alamat, method, url, ip='127.0.0.1', data=None, cookie=''):
+    conn = http.client.HTTPConnection(alamat, timeout=120)
+    headers = {'X-Forwarded-For': ip, 'Cookie': cookie}
+    body = None
+    if data is not None:
+        body = urlencode(data)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    try:
+        conn.request(method, url, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.headers, response.read().decode('utf-8', 'replace')
+    finally:
+        conn.close()
+
+
+# tahun nomor pendaftaran data dummy: jauh dari tahun berjalan, jadi tidak
+# bentrok dengan nomor yang dibagikan NomorUrutPendaftaran
+TAHUN_DUMMY = 9000
+
+
+def buat_pendaftaran_dummy(jumlah, batch_size=None, mulai=0):
+    from .models import Pendaftaran
+    from .signals import format_nomor
+
+    jurusans = [key for key, _ in Pendaftaran.JURUSAN_CHOICES]
+    statuses = [key for key, _ in Pendaftaran.STATUS_CHOICES]
+
+    objs = []
+    for i in range(mulai, mulai + jumlah):
+        jurusan = jurusans[i % len(jurusans)]
+        # format nomor asli (4 digit, muat di max_length=20); tiap 10.000
+        # pendaftar per jurusan pindah ke "tahun" berikutnya
+        urut = i // len(jurusans)
+        nomor = format_nomor(TAHUN_DUMMY + urut // 10000, jurusan, urut % 10000 + 1)
+        data = data_pendaftaran(i, jurusan)
+        data['nama_lengkap'] = (
+            f"{NAMA_DEPAN[i % len(NAMA_DEPAN)]} "
+            f"{NAMA_DEPAN[(i // 7) % len(NAMA_DEPAN)]} "
+            f"{NAMA_BELAKANG[(i // 3) % len(NAMA_BELAKANG)]}"
+        )
+        objs.append(Pendaftaran(
+            **data,
+            jalur='KHUSUS' if i % 3 else 'UMUM',
+            status=statuses[i % len(statuses)],
+            nomor_pendaftaran=nomor,
+        ))
+
+    # indeks pencarian ikut terisi lewat trigger
+    Pendaftaran.objects.bulk_create(objs, batch_size=batch_size)
+
+
+def buat_log_dummy(jumlah, batch_size=None, user=None):
+    from .models import Pendaftaran, LogAktivitas
+
+    pks = list(Pendaftaran.objects.values_list('pk', flat=True))
+    if not pks:
+        return
+
+    aksi = [
+        ("Tambah Pendaftaran", "Ditambahkan oleh admin"),
+        ("Ubah Status", "Status diubah ke Diterima"),
+        ("Ubah Status", "Status diubah ke Ditolak"),
+    ]
+    LogAktivitas.objects.bulk_create(
+        [
+            LogAktivitas(
+                user=user,
+                pendaftaran_id=pks[i % len(pks)],
+                aksi=aksi[i % len(aksi)][0],
+                detail=aksi[i % len(aksi)][1],
+            )
+            for i in range(jumlah)
+        ],
+        batch_size=batch_size
+    )
+
+
+# =====================================================
+# STATISTIK LATENSI
+# =====================================================
+def persentil(data, p):
+    # nearest-rank, data harus sudah urut
+    if not data:
+        return 0
+    index = max(0, min(len(data) - 1, int(round(p / 100 * len(data))) - 1))
+    return data[index]
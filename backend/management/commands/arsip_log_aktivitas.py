@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend.audit import arsipkan_log
+
+
+class Command(BaseCommand):
+    help = (
+        "Pindahkan log aktivitas musim PPDB lama (sebelum 1 Januari --tahun) "
+        "ke tabel arsip atau ke file JSONL gzip, biar tabel log tetap kecil."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tahun', type=int, required=True,
+            help="log sebelum 1 Januari tahun ini yang diarsipkan"
+        )
+        parser.add_argument('--file', help="tulis ke file .jsonl.gz, bukan ke tabel arsip")
+        parser.add_argument('--chunk', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        tahun = options['tahun']
+        if tahun > timezone.now().year:
+            raise CommandError("Musim yang sedang berjalan tidak boleh diarsipkan.")
+
+        sebelum = timezone.make_aware(datetime(tahun, 1, 1))
+        jumlah = arsipkan_log(sebelum, file=options['file'], chunk=options['chunk'])
+
+        tujuan = options['file'] or "tabel arsip"
+        self.stdout.write(self.style.SUCCESS(
+            f"{jumlah} log sebelum {sebelum:%d-%m-%Y} dipindah ke {tujuan}."
+        ))
@@ -0,0 +1,168 @@
+import json
+import platform
+import statistics
+import subprocess
+import threading
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from backend.loadtest import (
+    BATAS_P95_MS, SKENARIO, PenghitungQuery, buat_log_dummy, buat_pendaftaran_dummy,
+    database_uji, jalankan_paralel, persentil, request_skenario,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark jalur panas (latensi p50/p95/p99, throughput, query per request) "
+        "di database uji, hasilnya laporan JSON yang bisa di-diff antar commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ukuran', nargs='*', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--request', type=int, default=200)
+        parser.add_argument('--worker', type=int, default=8)
+        parser.add_argument('--skenario', nargs='*', choices=list(SKENARIO), default=list(SKENARIO))
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--bandingkan', help="laporan JSON lama untuk dibandingkan")
+        parser.add_argument(
+            '--cek-batas', action='store_true',
+            help="gagal kalau p95 skenario melewati BATAS_P95_MS",
+        )
+
+    def handle(self, *args, **options):
+        laporan = {
+            'meta': self.meta(),
+            'hasil': {},
+        }
+
+        for ukuran in options['ukuran']:
+            self.stdout.write(f"== {ukuran} pendaftar")
+            laporan['hasil'][str(ukuran)] = self.jalankan_ukuran(ukuran, options)
+
+        with open(options['output'], 'w') as f:
+            json.dump(laporan, f, indent=2, sort_keys=True)
+            f.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"Laporan ditulis ke {options['output']}"))
+
+        if options['bandingkan']:
+            with open(options['bandingkan']) as f:
+                self.bandingkan(json.load(f), laporan)
+
+        if options['cek_batas']:
+            self.cek_batas(laporan)
+
+    def meta(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            'commit': commit,
+            'waktu': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        }
+
+    def jalankan_ukuran(self, ukuran, options):
+        hasil = {}
+
+        with database_uji():
+            from django.contrib.auth.models import User, Group
+            from backend.models import Pendaftaran
+
+            admin = User.objects.create_user('benchmark')
+            admin.groups.add(Group.objects.create(name='Admin'))
+            buat_pendaftaran_dummy(ukuran)
+            buat_log_dummy(ukuran * 2, user=admin)
+
+            nomors = list(
+                Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True)[:1000]
+            )
+            lokal = threading.local()
+
+            def client(login):
+                key = 'admin' if login else 'publik'
+                if not hasattr(lokal, key):
+                    c = Client()
+                    if login:
+                        c.force_login(admin)
+                    setattr(lokal, key, c)
+                return getattr(lokal, key)
+
+            for nama in options['skenario']:
+                _, login, porsi = SKENARIO[nama]
+                jumlah = max(1, int(options['request'] * porsi))
+
+                def tugas(i, nama=nama, login=login):
+                    method, url, data = request_skenario(nama, i, nomors)
+                    c = client(login)
+                    with PenghitungQuery() as queries:
+                        mulai = time.perf_counter()
+                        response = getattr(c, method)(url, data) if data else getattr(c, method)(url)
+                        if response.streaming:
+                            for _ in response.streaming_content:
+                                pass
+                        durasi = (time.perf_counter() - mulai) * 1000
+                    return durasi, queries.jumlah, response.status_code < 400
+
+                mulai = time.perf_counter()
+                rows = jalankan_paralel(tugas, jumlah, options['worker'])
+                total = time.perf_counter() - mulai
+
+                latensi = sorted(r[0] for r in rows)
+                hasil[nama] = {
+                    'request': jumlah,
+                    'gagal': sum(1 for r in rows if not r[2]),
+                    'p50_ms': round(persentil(latensi, 50), 2),
+                    'p95_ms': round(persentil(latensi, 95), 2),
+                    'p99_ms': round(persentil(latensi, 99), 2),
+                    'rata2_ms': round(statistics.mean(latensi), 2),
+                    'rps': round(jumlah / total, 1),
+                    'query_per_request': round(statistics.mean(r[1] for r in rows), 2),
+                }
+                h = hasil[nama]
+                self.stdout.write(
+                    f"  {nama:<18} p50 {h['p50_ms']:8.2f}  p95 {h['p95_ms']:8.2f}  "
+                    f"p99 {h['p99_ms']:8.2f} ms  {h['rps']:7.1f} rps  "
+                    f"{h['query_per_request']:6.2f} query  gagal {h['gagal']}"
+                )
+
+        return hasil
+
+    def cek_batas(self, laporan):
+        lewat = []
+        for ukuran, skenarios in laporan['hasil'].items():
+            for nama, h in skenarios.items():
+                if h['p95_ms'] > BATAS_P95_MS[nama]:
+                    lewat.append(f"{ukuran} {nama}: p95 {h['p95_ms']} > {BATAS_P95_MS[nama]} ms")
+
+        if lewat:
+            raise CommandError("p95 melewati batas:\n  " + "\n  ".join(lewat))
+        self.stdout.write(self.style.SUCCESS("p95 semua skenario di dalam batas."))
+
+    def bandingkan(self, lama, baru):
+        self.stdout.write(
+            f"== Perbandingan {lama['meta'].get('commit')} -> {baru['meta'].get('commit')}"
+        )
+        for ukuran, skenarios in baru['hasil'].items():
+            for nama, h in skenarios.items():
+                sebelum = lama['hasil'].get(ukuran, {}).get(nama)
+                if not sebelum:
+                    continue
+                delta = (h['p95_ms'] - sebelum['p95_ms']) / (sebelum['p95_ms'] or 1) * 100
+                self.stdout.write(
+                    f"  {ukuran:>7} {nama:<18} p95 {sebelum['p95_ms']:8.2f} -> "
+                    f"{h['p95_ms']:8.2f} ms ({delta:+.0f}%)  query "
+                    f"{sebelum['query_per_request']} -> {h['query_per_request']}"
+                )
@@ -0,0 +1,78 @@
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from backend.loadtest import persentil
+
+
+LOADER_BIASA = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+LOADER_CACHE = [('django.template.loaders.cached.Loader', LOADER_BIASA)]
+
+SKENARIO = {
+    'index': lambda i: '/',
+    'formulir': lambda i: '/formulir/',
+    'lupa_password': lambda i: '/forgot-password/',
+    'pages_html': lambda i: '/index.html',
+    'login (csrf)': lambda i: '/login/',
+    'bot_404': lambda i: f'/wp-{uuid.uuid4().hex[:8]}.php',
+}
+
+
+def _templates(loaders):
+    templates = [dict(t, OPTIONS=dict(t['OPTIONS'])) for t in settings.TEMPLATES]
+    templates[0]['OPTIONS']['loaders'] = loaders
+    return templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark halaman frontend untuk pengunjung anonim: tanpa cache "
+        "(loader biasa) vs dengan cache halaman + cached template loader."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--request', type=int, default=500, help="per skenario")
+
+    def handle(self, *args, **options):
+        mode = {
+            'tanpa cache': {'HALAMAN_CACHE_TIMEOUT': 0, 'TEMPLATES': _templates(LOADER_BIASA)},
+            'dengan cache': {'HALAMAN_CACHE_TIMEOUT': 3600, 'TEMPLATES': _templates(LOADER_CACHE)},
+        }
+
+        # log "Not Found" tiap request bot bikin hasil susah dibaca
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+
+        for nama_mode, ubah in mode.items():
+            self.stdout.write(f"== {nama_mode}")
+            # frontend.urls belum di-include di openppdb.urls, jadi dipasang langsung
+            with override_settings(ROOT_URLCONF='frontend.urls', ALLOWED_HOSTS=['testserver'], **ubah):
+                cache.clear()
+                for nama, url in SKENARIO.items():
+                    self.jalankan(nama, url, options['request'])
+
+    def jalankan(self, nama, url, jumlah):
+        client = Client()
+        latensi = []
+        status = set()
+
+        mulai = time.perf_counter()
+        for i in range(jumlah):
+            t = time.perf_counter()
+            status.add(client.get(url(i)).status_code)
+            latensi.append((time.perf_counter() - t) * 1000)
+        total = time.perf_counter() - mulai
+
+        latensi.sort()
+        self.stdout.write(
+            f"  {nama:<14} p50 {persentil(latensi, 50):7.2f}  p95 {persentil(latensi, 95):7.2f} ms  "
+            f"{jumlah / total:8.1f} rps  status {sorted(status)}"
+        )
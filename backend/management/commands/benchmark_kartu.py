@@ -0,0 +1,54 @@
+import statistics
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from backend.loadtest import database_uji, data_pendaftaran
+
+
+class Command(BaseCommand):
+    help = "Bandingkan latensi cetak kartu (HTML + QR) saat cache QR dingin vs hangat."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jumlah', type=int, default=100)
+
+    def handle(self, *args, **options):
+        jumlah = options['jumlah']
+
+        with database_uji(), tempfile.TemporaryDirectory() as media:
+            from backend.forms import PendaftaranForm
+
+            nomors = [
+                PendaftaranForm(data_pendaftaran(i)).save().nomor_pendaftaran
+                for i in range(jumlah)
+            ]
+
+            with override_settings(MEDIA_ROOT=media):
+                cache.clear()
+                dingin = self.ukur(nomors)
+                hangat = self.ukur(nomors)
+
+        self.laporan('Dingin', dingin)
+        self.laporan('Hangat', hangat)
+
+    def ukur(self, nomors):
+        client = Client()
+        hasil = []
+        for nomor in nomors:
+            mulai = time.perf_counter()
+            client.get(reverse('print_kartu', args=[nomor]))
+            client.get(reverse('qr_kartu', args=[nomor]))
+            hasil.append((time.perf_counter() - mulai) * 1000)
+        return hasil
+
+    def laporan(self, label, hasil):
+        hasil = sorted(hasil)
+        p95 = hasil[int(len(hasil) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:<7}: rata-rata {statistics.mean(hasil):.2f} ms, "
+            f"p50 {statistics.median(hasil):.2f} ms, p95 {p95:.2f} ms"
+        )
@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from backend.loadtest import database_uji, buat_pendaftaran_dummy
+from backend.pencarian import cari_pendaftaran
+
+
+KATA_KUNCI = ['BUDI', 'siti rahayu', 'SANT', '33050000000012', 'PPDB-', 'tidak ada']
+
+
+class Command(BaseCommand):
+    help = "Bandingkan pencarian lama (triple icontains) dengan pencarian berindeks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('jumlah', nargs='*', type=int, default=[10000, 100000])
+        parser.add_argument('--ulang', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for jumlah in options['jumlah']:
+            with database_uji():
+                from backend.models import Pendaftaran
+
+                buat_pendaftaran_dummy(jumlah)
+                qs = Pendaftaran.objects.all().order_by('-tanggal_pendaftaran')
+
+                def lama(keyword):
+                    return qs.filter(
+                        Q(nama_lengkap__icontains=keyword) |
+                        Q(nik__icontains=keyword) |
+                        Q(nomor_pendaftaran__icontains=keyword)
+                    )
+
+                def baru(keyword):
+                    return cari_pendaftaran(qs, keyword)
+
+                self.stdout.write(f"== {jumlah} baris")
+                for keyword in KATA_KUNCI:
+                    waktu_lama = self.ukur(lama, keyword, options['ulang'])
+                    waktu_baru = self.ukur(baru, keyword, options['ulang'])
+                    self.stdout.write(
+                        f"{keyword!r:<18} lama {waktu_lama:8.2f} ms   "
+                        f"baru {waktu_baru:8.2f} ms"
+                    )
+
+    def ukur(self, cari, keyword, ulang):
+        hasil = []
+        for _ in range(ulang):
+            mulai = time.perf_counter()
+            # sama seperti Paginator: count + 1 halaman
+            qs = cari(keyword)
+            qs.count()
+            list(qs[:10])
+            hasil.append((time.perf_counter() - mulai) * 1000)
+        return statistics.median(hasil)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from backend.loadtest import database_uji, buat_pendaftaran_dummy, PenghitungQuery
+
+
+class Command(BaseCommand):
+    help = "Bandingkan jumlah query ubah status satu-satu vs massal."
+
+    def add_arguments(self, parser):
+        parser.add_argument('jumlah', nargs='*', type=int, default=[100, 1000, 2000])
+
+    def handle(self, *args, **options):
+        for jumlah in options['jumlah']:
+            with database_uji():
+                from django.contrib.auth.models import User
+                from backend.aksi_massal import ubah_status_massal
+                from backend.models import Pendaftaran, LogAktivitas
+
+                user = User.objects.create_user('bench')
+                buat_pendaftaran_dummy(jumlah * 2)
+                Pendaftaran.objects.update(status='terdaftar')
+                pks = list(Pendaftaran.objects.values_list('pk', flat=True))
+                satu_satu, massal = pks[:jumlah], pks[jumlah:]
+
+                def lama():
+                    # pola ubah_status_admin: get + save + log per pendaftar
+                    for pk in satu_satu:
+                        p = Pendaftaran.objects.get(pk=pk)
+                        p.status = 'diterima'
+                        p.save()
+                        LogAktivitas.objects.create(
+                            user=user, pendaftaran=p, aksi="Ubah Status",
+                            detail=f"Status diubah ke {p.get_status_display()}"
+                        )
+
+                def baru():
+                    ubah_status_massal(user, 'diterima', ids=massal)
+
+                for label, fungsi in (('satu-satu', lama), ('massal', baru)):
+                    with PenghitungQuery() as queries:
+                        mulai = time.perf_counter()
+                        fungsi()
+                        durasi = (time.perf_counter() - mulai) * 1000
+                    self.stdout.write(
+                        f"{jumlah:>6} pendaftar  {label:<10} "
+                        f"{queries.jumlah:>6} query  {durasi:9.1f} ms"
+                    )
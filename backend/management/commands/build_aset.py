@@ -0,0 +1,143 @@
+import gzip
+import logging
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from frontend.aset import build_aset
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# aset yang diunduh browser di halaman pertama (favicon/manifest tidak dihitung)
+ASET_HALAMAN = re.compile(
+    r'''<(?:link rel="stylesheet" href|script src|img[^>]*?\ssrc)="(/static/[^"]+)"'''
+)
+
+
+def _ukuran_folder(folder):
+    jumlah = total = 0
+    for root, _, files in os.walk(folder):
+        for nama in files:
+            jumlah += 1
+            total += os.path.getsize(os.path.join(root, nama))
+    return jumlah, total
+
+
+def _mb(n):
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+def _kb(n):
+    return f"{n / 1024:.0f} KB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Build aset frontend: bundle css/js per layout dan salin hanya file yang "
+        "dirujuk template ke ASET_BUILD_DIR. Jalankan sebelum collectstatic; "
+        "fingerprint + kompresi gzip/brotli dikerjakan storage WhiteNoise."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ukur', action='store_true',
+            help="bandingkan collectstatic dan ukuran halaman pertama sebelum/sesudah build",
+        )
+        parser.add_argument('--halaman', default='/', help="halaman yang diukur (default: /)")
+
+    def handle(self, *args, **options):
+        manifest = build_aset()
+        jumlah, total = _ukuran_folder(settings.ASET_BUILD_DIR)
+        self.stdout.write(
+            f"{len(manifest['bundle'])} bundle, {jumlah} file ({_mb(total)}) "
+            f"-> {settings.ASET_BUILD_DIR}"
+        )
+        for path in manifest['hilang']:
+            self.stderr.write(f"  tidak ditemukan (diganti url(data:,)): {path}")
+
+        if options['ukur']:
+            logging.getLogger('django.request').setLevel(logging.ERROR)
+            mode = {
+                'sebelum': {
+                    'ASET_BUILD': False,
+                    'STATICFILES_DIRS': settings.ASET_SUMBER_DIRS,
+                    'STATICFILES_FINDERS': [
+                        'django.contrib.staticfiles.finders.FileSystemFinder',
+                        'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+                    ],
+                },
+                'sesudah': {
+                    'ASET_BUILD': True,
+                    'STATICFILES_DIRS': [settings.ASET_BUILD_DIR],
+                    'STATICFILES_FINDERS': settings.ASET_BUILD_FINDERS,
+                },
+            }
+            for nama, ubah in mode.items():
+                self.stdout.write(f"== {nama}")
+                with tempfile.TemporaryDirectory() as root:
+                    with override_settings(STATIC_ROOT=root, **ubah):
+                        berhasil = self.ukur_collectstatic(root)
+                        self.ukur_halaman(options['halaman'], root, berhasil)
+
+    def ukur_collectstatic(self, root):
+        mulai = time.perf_counter()
+        try:
+            call_command('collectstatic', interactive=False, verbosity=0)
+            hasil = None
+        except Exception as exc:
+            hasil = f"GAGAL: {str(exc).splitlines()[0]}"
+        durasi = time.perf_counter() - mulai
+
+        jumlah, total = _ukuran_folder(root)
+        self.stdout.write(
+            f"  collectstatic : {durasi:6.2f} detik, {jumlah} file, {_mb(total)}"
+            + (f"  {hasil}" if hasil else "")
+        )
+        return hasil is None
+
+    def ukur_halaman(self, url, root, manifest_ada):
+        # tanpa manifest (collectstatic gagal) url static tidak ber-hash
+        cache.clear()
+        with override_settings(
+            ROOT_URLCONF='frontend.urls', ALLOWED_HOSTS=['testserver'],
+            HALAMAN_CACHE_TIMEOUT=0, DEBUG=not manifest_ada,
+        ):
+            html = Client().get(url).content
+
+        aset = list(dict.fromkeys(ASET_HALAMAN.findall(html.decode())))
+        mentah, gz, br = len(html), len(gzip.compress(html)), 0
+        if brotli:
+            br = len(brotli.compress(html))
+
+        for path in aset:
+            nama = path[len(settings.STATIC_URL):]
+            file = os.path.join(root, nama)
+            if not os.path.isfile(file):
+                file = finders.find(nama)
+            if not file:
+                self.stderr.write(f"  404: {path}")
+                continue
+            with open(file, 'rb') as f:
+                isi = f.read()
+            mentah += len(isi)
+            gz += len(gzip.compress(isi))
+            if brotli:
+                br += len(brotli.compress(isi))
+
+        self.stdout.write(
+            f"  halaman {url:<6}: {len(aset) + 1} request, {_kb(mentah)} mentah, "
+            f"{_kb(gz)} gzip" + (f", {_kb(br)} brotli" if brotli else "")
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.loadtest import (
+    database_uji, buat_pendaftaran_dummy, query_panas, regresi_plan, siapkan_explain,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Cek EXPLAIN query-query panas di database uji, "
+        "gagal kalau ada yang jatuh ke full scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jumlah', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        gagal = []
+
+        with database_uji():
+            buat_pendaftaran_dummy(options['jumlah'])
+
+            siapkan_explain()
+            for nama, qs in query_panas().items():
+                plan = qs.explain()
+                regresi = regresi_plan(plan)
+
+                status = 'GAGAL' if regresi else 'OK'
+                self.stdout.write(f"[{status}] {nama}")
+                if options['verbosity'] > 1 or regresi:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+                if regresi:
+                    gagal.append(nama)
+
+        if gagal:
+            raise CommandError(f"Query jatuh ke full scan: {', '.join(gagal)}")
+        self.stdout.write(self.style.SUCCESS("Semua query panas memakai index."))
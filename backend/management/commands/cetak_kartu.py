@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.ekspor import filter_ekspor
+from backend.kartu_pdf import cetak_kartu_pdf
+from backend.models import Pendaftaran
+
+
+class Command(BaseCommand):
+    help = (
+        "Cetak kartu pendaftaran semua pendaftar (bisa difilter jurusan/status/jalur) "
+        "ke satu file PDF, dua kartu per halaman A4."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="file PDF tujuan")
+        parser.add_argument('--jurusan')
+        parser.add_argument('--status')
+        parser.add_argument('--jalur')
+        parser.add_argument(
+            '--base-url', required=True,
+            help="alamat situs untuk isi QR, mis. https://ppdb.sekolah.sch.id",
+        )
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        qs = filter_ekspor(Pendaftaran.objects.all(), options)
+
+        try:
+            file = open(options['output'], 'wb')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        mulai = time.perf_counter()
+        with file:
+            jumlah = cetak_kartu_pdf(qs, file, options['base_url'], options['workers'])
+        durasi = time.perf_counter() - mulai
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{jumlah} kartu ditulis ke {options['output']} ({durasi:.2f} detik)."
+        ))
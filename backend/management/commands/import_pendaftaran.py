@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.impor import baca_baris, impor_pendaftaran
+
+
+class Command(BaseCommand):
+    help = (
+        "Impor pendaftar dari file CSV/XLSX (baris pertama = nama kolom, "
+        "sama seperti field formulir atau header hasil ekspor)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--batch', type=int, default=None)
+
+    def handle(self, *args, **options):
+        path = options['file']
+
+        try:
+            file = open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        mulai = time.perf_counter()
+        with file:
+            hasil = impor_pendaftaran(baca_baris(file, path), options['batch'])
+        durasi = time.perf_counter() - mulai
+
+        for nomor_baris, pesan in hasil.errors:
+            self.stderr.write(f"Baris {nomor_baris}: {pesan}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{hasil.berhasil} pendaftar diimpor, {len(hasil.errors)} baris gagal "
+            f"({durasi:.2f} detik)."
+        ))
+        if hasil.error_file:
+            raise CommandError(hasil.error_file)
@@ -0,0 +1,82 @@
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from backend.loadtest import buat_pendaftaran_dummy, database_uji
+from backend.notifikasi import GagalKirim, get_transport, kirim_semua
+
+
+class TransportUji:
+    # gateway pura-pura: latensi tetap, sebagian pesan gagal sementara
+
+    def __init__(self, latensi, gagal):
+        self.latensi = latensi
+        self.gagal = gagal
+
+    def kirim(self, no_wa, pesan):
+        time.sleep(self.latensi)
+        if random.random() < self.gagal:
+            raise GagalKirim("gateway sibuk (uji)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Kirim notifikasi WhatsApp yang antre dalam batch dengan batas laju, "
+        "lalu laporkan jumlah terkirim/gagal dan laju pengiriman."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transport', help="http / file / path kelas (default NOTIF_TRANSPORT)")
+        parser.add_argument('--per-menit', type=int, default=None, help="default NOTIF_PER_MENIT, 0 = tanpa batas")
+        parser.add_argument('--paralel', type=int, default=None, help="default NOTIF_PARALEL")
+        parser.add_argument('--batas', type=int, default=None, help="berhenti setelah sekian pesan")
+        parser.add_argument(
+            '--uji', type=int, default=0, metavar='N',
+            help="simulasi di database sementara: N pendaftar diterima/ditolak, gateway pura-pura",
+        )
+        parser.add_argument('--latensi', type=float, default=0.2, help="detik per pesan saat --uji")
+        parser.add_argument('--gagal', type=float, default=0.05, help="peluang gagal sementara saat --uji")
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'per_menit': options['per_menit'],
+            'paralel': options['paralel'],
+            'batas': options['batas'],
+        }
+        if not options['uji']:
+            transport = get_transport(options['transport'])
+            self.laporan(kirim_semua(transport, **kwargs))
+            return
+
+        with database_uji(), tempfile.NamedTemporaryFile(suffix='.jsonl') as file, override_settings(
+            NOTIF_AKTIF=True, TUGAS_AKTIF=False, NOTIF_BACKOFF_DETIK=0, NOTIF_FILE=file.name,
+        ):
+            from django.contrib.auth.models import User
+            from backend.aksi_massal import ubah_status_massal
+            from backend.models import Notifikasi, Pendaftaran
+
+            buat_pendaftaran_dummy(options['uji'])
+            user = User.objects.create_user('panitia_uji')
+            pks = list(Pendaftaran.objects.values_list('pk', flat=True))
+            ubah_status_massal(user, 'ditolak', ids=pks)
+            # diubah lagi sebelum terkirim: tetap satu pesan per pendaftar
+            ubah_status_massal(user, 'diterima', ids=pks[:len(pks) * 2 // 3])
+            self.stdout.write(f"{Notifikasi.objects.count()} notifikasi antre untuk {len(pks)} pendaftar")
+
+            if options['transport']:
+                transport = get_transport(options['transport'])
+            else:
+                transport = TransportUji(options['latensi'], options['gagal'])
+
+            # jeda ulang 0: yang gagal sementara ikut terkirim di putaran ini
+            self.laporan(kirim_semua(transport, **kwargs))
+
+    def laporan(self, hasil):
+        self.stdout.write(
+            f"{hasil['terkirim']} terkirim, {hasil['diulang']} gagal sementara (diulang), "
+            f"{hasil['gagal']} gagal dalam {hasil['detik']:.1f} detik "
+            f"({hasil['per_menit']:.0f} pesan/menit)"
+        )
@@ -0,0 +1,147 @@
+import itertools
+import re
+import statistics
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from backend.loadtest import (
+    data_pendaftaran, database_uji, persentil, request_http, server_uji,
+)
+
+
+INPUT_RE = re.compile(r'name="(csrfmiddlewaretoken|kunci|_tiket)" value="([^"]*)"')
+COOKIE_RE = re.compile(r'csrftoken=([^;]+)')
+
+
+class Command(BaseCommand):
+    help = (
+        "Banjiri POST form pendaftaran sambil mengukur latensi panel admin, "
+        "dengan AdmisiMiddleware mati vs hidup (server uji dengan worker tetap)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker', type=int, default=4, help="worker server (seperti gunicorn -w)")
+        parser.add_argument('--publik', type=int, default=32, help="klien paralel yang mendaftar")
+        parser.add_argument('--detik', type=float, default=15)
+        parser.add_argument('--maks', type=int, default=2, help="ADMISI_MAKS saat hidup")
+
+    def handle(self, *args, **options):
+        self.nomor = itertools.count()
+
+        with database_uji():
+            user = User.objects.create_user('admin_uji', password='x')
+            user.groups.add(Group.objects.get_or_create(name='Admin')[0])
+            client = Client()
+            client.force_login(user)
+            self.sesi = client.cookies['sessionid'].value
+
+            for aktif in (False, True):
+                with tempfile.TemporaryDirectory() as folder, override_settings(
+                    ADMISI_AKTIF=aktif,
+                    ADMISI_MAKS=options['maks'],
+                    ADMISI_JEDA=1,
+                    ADMISI_PERCAYA_PROXY=True,
+                    ADMISI_FOLDER=folder,
+                    ALLOWED_HOSTS=['*'],
+                ):
+                    cache.clear()
+                    hasil = self.jalankan(options)
+                self.laporan('hidup' if aktif else 'mati', hasil)
+
+    def jalankan(self, options):
+        hasil = {'admin': [], 'daftar': [], 'status': [], 'error': 0}
+        lock = threading.Lock()
+        berhenti = threading.Event()
+
+        with server_uji(get_wsgi_application(), options['worker']) as alamat:
+            def admin():
+                while not berhenti.is_set():
+                    mulai = time.perf_counter()
+                    try:
+                        status, _, _ = request_http(
+                            alamat, 'GET', reverse('dashboard_admin'),
+                            cookie=f"sessionid={self.sesi}",
+                        )
+                    except OSError:
+                        status = None
+                    with lock:
+                        hasil['admin'].append((time.perf_counter() - mulai) * 1000)
+                        hasil['error'] += status != 200
+                    time.sleep(0.05)
+
+            def publik(i):
+                ip = f"10.0.{i // 250}.{i % 250 + 1}"
+                while not berhenti.is_set():
+                    try:
+                        self.daftar(alamat, ip, hasil, lock, berhenti)
+                    except OSError:
+                        with lock:
+                            hasil['error'] += 1
+
+            threads = [threading.Thread(target=admin)] + [
+                threading.Thread(target=publik, args=(i,))
+                for i in range(options['publik'])
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(options['detik'])
+            berhenti.set()
+            for thread in threads:
+                thread.join()
+        return hasil
+
+    def daftar(self, alamat, ip, hasil, lock, berhenti):
+        url = reverse('home')
+        mulai = time.perf_counter()
+
+        status, header, html = request_http(alamat, 'GET', url, ip=ip)
+        cookie = COOKIE_RE.search(header.get('Set-Cookie', ''))
+        data = data_pendaftaran(next(self.nomor))
+        data.update(INPUT_RE.findall(html))
+
+        while not berhenti.is_set():
+            status, header, html = request_http(
+                alamat, 'POST', url, ip=ip, data=data,
+                cookie=f"csrftoken={cookie.group(1)}" if cookie else '',
+            )
+            with lock:
+                hasil['status'].append(status)
+            if status != 503:
+                break
+            # ruang tunggu: kirim ulang dengan tiket setelah Retry-After
+            data.update(INPUT_RE.findall(html))
+            time.sleep(int(header.get('Retry-After', 1)))
+
+        if status == 302:
+            with lock:
+                hasil['daftar'].append((time.perf_counter() - mulai) * 1000)
+        elif status == 429:
+            time.sleep(int(header.get('Retry-After', 1)))
+
+    def laporan(self, label, hasil):
+        admin = sorted(hasil['admin'])
+        daftar = sorted(hasil['daftar'])
+        status = hasil['status']
+
+        self.stdout.write(f"== admisi {label}")
+        self.stdout.write(
+            f"  admin  : {len(admin)} request, p50 {statistics.median(admin):.0f} ms, "
+            f"p95 {persentil(admin, 95):.0f} ms, maks {admin[-1]:.0f} ms"
+        )
+        if daftar:
+            self.stdout.write(
+                f"  daftar : {len(daftar)} berhasil, p50 {statistics.median(daftar):.0f} ms, "
+                f"p95 {persentil(daftar, 95):.0f} ms"
+            )
+        self.stdout.write(
+            f"  POST   : {status.count(302)} x 302, {status.count(503)} x ruang tunggu, "
+            f"{status.count(429)} x 429, {hasil['error']} error"
+        )
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from backend.loadtest import database_uji, jalankan_paralel, data_pendaftaran
+
+
+class Command(BaseCommand):
+    help = (
+        "Uji beban POST pendaftaran paralel di database uji terpisah, "
+        "memastikan tidak ada nomor pendaftaran yang bentrok."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jumlah', type=int, default=300)
+        parser.add_argument('--worker', type=int, default=16)
+        parser.add_argument('--jurusan', default='RPL')
+
+    def handle(self, *args, **options):
+        jumlah = options['jumlah']
+        jurusan = options['jurusan']
+
+        with database_uji():
+            from backend.models import Pendaftaran
+
+            url = reverse('home')
+
+            def kirim(i):
+                try:
+                    response = Client().post(url, data_pendaftaran(i, jurusan))
+                    return response.status_code
+                except Exception as exc:
+                    return repr(exc)
+
+            mulai = time.perf_counter()
+            hasil = jalankan_paralel(kirim, jumlah, options['worker'])
+            durasi = time.perf_counter() - mulai
+
+            gagal = [h for h in hasil if h != 302]
+            nomors = list(
+                Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True)
+            )
+            urut = sorted(int(n.split('-')[-1]) for n in nomors)
+
+            self.stdout.write(f"Request      : {jumlah} ({options['worker']} worker)")
+            self.stdout.write(f"Durasi       : {durasi:.2f} detik")
+            self.stdout.write(f"Berhasil     : {jumlah - len(gagal)}")
+            self.stdout.write(f"Gagal        : {len(gagal)}")
+            self.stdout.write(f"Nomor unik   : {len(set(nomors))} / {len(nomors)}")
+
+            if gagal:
+                raise CommandError(f"Ada request gagal: {gagal[:5]}")
+            if urut != list(range(1, jumlah + 1)):
+                raise CommandError("Nomor pendaftaran bentrok atau loncat")
+
+        self.stdout.write(self.style.SUCCESS("Tidak ada nomor yang bentrok."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from backend.pencarian import bangun_ulang_indeks, fts_tersedia
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang indeks pencarian FTS5 pendaftaran (khusus sqlite)."
+
+    def handle(self, *args, **options):
+        if not fts_tersedia():
+            self.stdout.write("Indeks FTS5 tidak dipakai di database ini.")
+            return
+
+        bangun_ulang_indeks()
+        self.stdout.write(self.style.SUCCESS("Indeks pencarian selesai dibangun ulang."))
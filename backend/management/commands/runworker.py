@@ -0,0 +1,95 @@
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+# dua fungsi ini yang dikirim ke proses spawn: modul ini boleh diimpor
+# sebelum django.setup(), backend.tugas (yang mengimpor model) tidak
+def _siapkan_proses():
+    import django
+    django.setup()
+
+
+def _jalankan(pk):
+    from backend.tugas import jalankan
+    return jalankan(pk)
+
+
+class Command(BaseCommand):
+    help = (
+        "Jalankan tugas latar belakang dari tabel Tugas (QR, PDF kartu, ...). "
+        "Bisa beberapa worker sekaligus, di satu atau beberapa server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jumlah', type=int, default=None, help="tugas paralel (default TUGAS_WORKER)")
+        parser.add_argument('--pool', choices=['thread', 'proses'], default=None, help="default TUGAS_POOL")
+        parser.add_argument('--sekali', action='store_true', help="berhenti kalau antrean sudah kosong")
+
+    def handle(self, *args, **options):
+        from backend.tugas import ambil_tugas, nama_worker
+
+        jumlah = options['jumlah'] or settings.TUGAS_WORKER
+        pool = options['pool'] or settings.TUGAS_POOL
+        worker = nama_worker()
+
+        if pool == 'proses':
+            # spawn: proses anak tidak mewarisi koneksi DB proses induk
+            executor = ProcessPoolExecutor(
+                jumlah,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_siapkan_proses,
+            )
+        else:
+            executor = ThreadPoolExecutor(jumlah, thread_name_prefix='tugas')
+
+        self.berhenti = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.stdout.write(f"Worker {worker}: {jumlah} {pool}")
+        sibuk = set()
+        selesai = gagal = 0
+        with executor:
+            while not self.berhenti:
+                pks = []
+                if len(sibuk) < jumlah:
+                    pks = ambil_tugas(jumlah - len(sibuk), worker)
+                    sibuk.update(executor.submit(_jalankan, pk) for pk in pks)
+
+                if not sibuk:
+                    if options['sekali']:
+                        break
+                    connections.close_all()
+                    time.sleep(settings.TUGAS_POLL_DETIK)
+                    continue
+
+                # tunggu ada yang selesai, sesekali cek tugas baru
+                done, sibuk = wait(
+                    sibuk,
+                    timeout=0 if pks and len(sibuk) < jumlah else settings.TUGAS_POLL_DETIK,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    if future.exception() is None and future.result():
+                        selesai += 1
+                    else:
+                        gagal += 1
+
+            done, _ = wait(sibuk)
+            for future in done:
+                if future.exception() is None and future.result():
+                    selesai += 1
+                else:
+                    gagal += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{selesai} tugas selesai, {gagal} gagal."))
+
+    def stop(self, *args):
+        # tugas yang sedang jalan diselesaikan dulu, tidak ambil yang baru
+        self.berhenti = True
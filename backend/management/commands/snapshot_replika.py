@@ -0,0 +1,42 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.replika import REPLIKA, salin_sqlite, terpasang
+
+
+class Command(BaseCommand):
+    help = (
+        "Salin database SQLite 'default' ke file replika (REPLIKA_SQLITE_PATH). "
+        "Pakai --tiap untuk snapshot berkala (mis. dari systemd/supervisor)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tiap', type=float, default=0,
+            help="ulang tiap sekian detik (mis. REPLIKA_SNAPSHOT_DETIK), 0 = sekali",
+        )
+
+    def handle(self, *args, **options):
+        if not terpasang():
+            raise CommandError("Replika belum diatur (REPLIKA_SQLITE_PATH)")
+        if connections['default'].vendor != 'sqlite' or connections[REPLIKA].vendor != 'sqlite':
+            raise CommandError(
+                "Snapshot cuma untuk SQLite; standby PostgreSQL diisi streaming replication"
+            )
+
+        sumber = connections['default'].settings_dict['NAME']
+        tujuan = connections[REPLIKA].settings_dict['NAME']
+
+        while True:
+            mulai = time.perf_counter()
+            salin_sqlite(sumber, tujuan)
+            self.stdout.write(
+                f"Snapshot {os.path.getsize(tujuan) / 1024 / 1024:.1f} MB "
+                f"dalam {time.perf_counter() - mulai:.2f} detik -> {tujuan}"
+            )
+            if not options['tiap']:
+                break
+            time.sleep(options['tiap'])
@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+from backend.loadtest import database_uji, tulis_campur
+
+
+def _penulis(args):
+    # jalan di proses terpisah (fork), seperti worker gunicorn
+    nomor, transaksi = args
+    connections.close_all()
+    try:
+        return tulis_campur(nomor, transaksi)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Uji N proses penulis paralel (daftar + ubah status + baca statistik) "
+        "di database uji, memastikan tidak ada error 'database is locked'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--penulis', type=int, default=8)
+        parser.add_argument('--transaksi', type=int, default=50, help="per penulis")
+        parser.add_argument(
+            '--tanpa-pragma', action='store_true',
+            help="pembanding: journal default, tanpa busy_timeout/WAL"
+        )
+
+    def handle(self, *args, **options):
+        penulis, transaksi = options['penulis'], options['transaksi']
+        ubah = {'AUDIT_FLUSH': 'langsung'}
+
+        if options['tanpa_pragma']:
+            ubah['SQLITE_PRAGMA'] = {}
+            connection.settings_dict['OPTIONS'] = {'timeout': 0.1}
+
+        with override_settings(**ubah), database_uji():
+            self.stdout.write(
+                f"Database     : {connection.vendor} "
+                f"(PRAGMA: {settings.SQLITE_PRAGMA or '-'})"
+            )
+            # koneksi induk ditutup sebelum fork, anak buka sendiri
+            connections.close_all()
+            fork = multiprocessing.get_context('fork')
+
+            mulai = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=penulis, mp_context=fork) as executor:
+                hasil = list(executor.map(
+                    _penulis, [(n + 1, transaksi) for n in range(penulis)]
+                ))
+            durasi = time.perf_counter() - mulai
+
+        berhasil = sum(h['berhasil'] for h in hasil)
+        locked = sum(h['locked'] for h in hasil)
+        error = [e for h in hasil for e in h['error']]
+
+        self.stdout.write(f"Penulis      : {penulis} proses x {transaksi} transaksi")
+        self.stdout.write(f"Durasi       : {durasi:.2f} detik ({berhasil / durasi:.0f} transaksi/detik)")
+        self.stdout.write(f"Berhasil     : {berhasil} / {penulis * transaksi}")
+        self.stdout.write(f"Locked       : {locked}")
+        self.stdout.write(f"Error lain   : {len(error)}")
+
+        if locked or error:
+            raise CommandError(f"Ada transaksi gagal: {error[:3]}")
+        self.stdout.write(self.style.SUCCESS("Tidak ada error 'database is locked'."))
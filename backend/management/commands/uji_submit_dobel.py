@@ -0,0 +1,68 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from backend.idempotensi import kunci_baru
+from backend.loadtest import database_uji, jalankan_paralel, data_pendaftaran
+
+
+class Command(BaseCommand):
+    help = (
+        "Uji submit dobel form pendaftaran (kunci idempotensi sama dikirim "
+        "beberapa kali paralel), tiap pendaftar harus jadi tepat satu data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pendaftar', type=int, default=100)
+        parser.add_argument('--klik', type=int, default=3, help="submit per pendaftar")
+        parser.add_argument('--worker', type=int, default=16)
+
+    def handle(self, *args, **options):
+        pendaftar, klik = options['pendaftar'], options['klik']
+
+        with database_uji():
+            from backend.models import Pendaftaran
+
+            url = reverse('home')
+            kunci = [kunci_baru() for _ in range(pendaftar)]
+
+            def kirim(i):
+                # submit ke-n dari pendaftar yang sama dikirim berdekatan
+                nomor = i // klik
+                data = dict(data_pendaftaran(nomor), kunci=kunci[nomor])
+                response = Client().post(url, data)
+                return nomor, response.status_code, response.get('Location')
+
+            mulai = time.perf_counter()
+            hasil = jalankan_paralel(kirim, pendaftar * klik, options['worker'])
+            durasi = time.perf_counter() - mulai
+
+            tujuan = defaultdict(set)
+            gagal = []
+            for nomor, status, lokasi in hasil:
+                if status != 302:
+                    gagal.append((nomor, status))
+                tujuan[nomor].add(lokasi)
+
+            beda = [n for n, lokasi in tujuan.items() if len(lokasi) != 1]
+            jumlah_data = Pendaftaran.objects.count()
+            urut = sorted(
+                int(n.split('-')[-1]) for n in
+                Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True)
+            )
+
+            self.stdout.write(f"Submit       : {pendaftar} pendaftar x {klik} klik ({options['worker']} worker)")
+            self.stdout.write(f"Durasi       : {durasi:.2f} detik")
+            self.stdout.write(f"Redirect     : {len(hasil) - len(gagal)} / {len(hasil)}")
+            self.stdout.write(f"Data tersimpan: {jumlah_data} (harus {pendaftar})")
+            self.stdout.write(f"Sukses beda  : {len(beda)}")
+
+            if gagal or beda or jumlah_data != pendaftar:
+                raise CommandError(f"Submit dobel tidak idempoten: {gagal[:5]} {beda[:5]}")
+            if urut != list(range(1, pendaftar + 1)):
+                raise CommandError("Nomor pendaftaran loncat / bentrok")
+
+        self.stdout.write(self.style.SUCCESS("Semua submit dobel dijawab dengan hasil yang sama."))
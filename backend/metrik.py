@@ -0,0 +1,139 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.template.backends.django import DjangoTemplates
+
+
+# =====================================================
+# HISTOGRAM SEDERHANA (FORMAT PROMETHEUS)
+# =====================================================
+# Angka disimpan per proses (tiap worker gunicorn punya sendiri), kumulatif
+# sejak worker start. Jendela waktu dihitung di sisi Prometheus pakai rate().
+BUCKET_DETIK = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+BUCKET_QUERY = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+BUCKET_BYTE = [1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 10_000_000]
+
+METRIK = {
+    'openppdb_request_detik': ('Durasi request per view', BUCKET_DETIK),
+    'openppdb_db_query': ('Jumlah query DB per request', BUCKET_QUERY),
+    'openppdb_db_detik': ('Total waktu query DB per request', BUCKET_DETIK),
+    'openppdb_template_detik': ('Waktu render template per request', BUCKET_DETIK),
+    'openppdb_response_byte': ('Ukuran response (non-streaming)', BUCKET_BYTE),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self.total = 0
+
+    def observe(self, nilai):
+        self.counts[bisect_left(self.buckets, nilai)] += 1
+        self.total += nilai
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histogram = {
+                nama: defaultdict(lambda b=buckets: Histogram(b))
+                for nama, (_, buckets) in METRIK.items()
+            }
+            self._request = defaultdict(int)
+
+    def catat(self, view, status, nilai):
+        with self._lock:
+            self._request[(view, status)] += 1
+            for nama, angka in nilai.items():
+                if angka is not None:
+                    self._histogram[nama][view].observe(angka)
+
+    def render(self):
+        baris = [
+            "# HELP openppdb_request_total Jumlah request per view dan status",
+            "# TYPE openppdb_request_total counter",
+        ]
+
+        with self._lock:
+            for (view, status), jumlah in sorted(self._request.items()):
+                baris.append(
+                    f'openppdb_request_total{{view="{view}",status="{status}"}} {jumlah}'
+                )
+
+            for nama, (keterangan, buckets) in METRIK.items():
+                baris.append(f"# HELP {nama} {keterangan}")
+                baris.append(f"# TYPE {nama} histogram")
+
+                for view, h in sorted(self._histogram[nama].items()):
+                    kumulatif = 0
+                    for batas, jumlah in zip(buckets + ['+Inf'], h.counts):
+                        kumulatif += jumlah
+                        baris.append(
+                            f'{nama}_bucket{{view="{view}",le="{batas}"}} {kumulatif}'
+                        )
+                    baris.append(f'{nama}_sum{{view="{view}"}} {h.total:.6f}')
+                    baris.append(f'{nama}_count{{view="{view}"}} {kumulatif}')
+
+        return "\n".join(baris) + "\n"
+
+
+registry = Registry()
+
+
+# =====================================================
+# WAKTU RENDER TEMPLATE (ENGINE TEMPLATES['BACKEND'])
+# =====================================================
+# Yang diukur cuma render lewat engine (render(), render_to_string(),
+# TemplateResponse), jadi include/extends di dalamnya tidak dihitung dobel.
+# Di luar blok ukur_template() (METRIK_AKTIF mati) render tidak diukur.
+_ukur = threading.local()
+
+
+@contextmanager
+def ukur_template():
+    hasil = {'detik': 0.0, 'jalan': False}
+    lama = getattr(_ukur, 'hasil', None)
+    _ukur.hasil = hasil
+    try:
+        yield hasil
+    finally:
+        _ukur.hasil = lama
+
+
+class TemplateTerukur:
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, nama):
+        return getattr(self.template, nama)
+
+    def render(self, context=None, request=None):
+        hasil = getattr(_ukur, 'hasil', None)
+        if hasil is None or hasil['jalan']:
+            return self.template.render(context, request)
+
+        hasil['jalan'] = True
+        mulai = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            hasil['detik'] += time.perf_counter() - mulai
+            hasil['jalan'] = False
+
+
+class DjangoTemplatesTerukur(DjangoTemplates):
+
+    def from_string(self, template_code):
+        return TemplateTerukur(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TemplateTerukur(super().get_template(template_name))
@@ -1,5 +1,21 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack
 from threading import local
 
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import admisi, replika
+from .metrik import registry, ukur_template
+
 _user = local()
 
 class CurrentUserMiddleware:
@@ -8,8 +24,212 @@ class CurrentUserMiddleware:
 
     def __call__(self, request):
         _user.value = request.user if request.user.is_authenticated else None
-        response = self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            # thread dipakai ulang, jangan sampai user request lama ikut tercatat
+            _user.value = None
         return response
 
 def get_current_user():
-    return getattr(_user, 'value', None)
\ No newline at end of file
+    return getattr(_user, 'value', None)
+
+# =====================================================
+# INSTRUMENTASI (OPT-IN: METRIK_AKTIF=True)
+# =====================================================
+class InstrumentasiMiddleware:
+    _profil_lock = threading.Lock()
+
+    def __init__(self, get_response):
+        if not settings.METRIK_AKTIF:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query = {'jumlah': 0, 'detik': 0.0}
+
+        def hitung_query(execute, sql, params, many, context):
+            mulai = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                query['jumlah'] += 1
+                query['detik'] += time.perf_counter() - mulai
+
+        profiler = self._mulai_profil()
+        mulai = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(hitung_query))
+                template = stack.enter_context(ukur_template())
+                response = self.get_response(request)
+        finally:
+            durasi = time.perf_counter() - mulai
+            if profiler:
+                profiler.disable()
+                self._profil_lock.release()
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'tidak_dikenal'
+
+        registry.catat(view, response.status_code, {
+            'openppdb_request_detik': durasi,
+            'openppdb_db_query': query['jumlah'],
+            'openppdb_db_detik': query['detik'],
+            'openppdb_template_detik': template['detik'],
+            'openppdb_response_byte': None if response.streaming else len(response.content),
+        })
+
+        if profiler and durasi * 1000 >= settings.METRIK_PROFIL_MS:
+            self._simpan_profil(profiler, view, durasi)
+        return response
+
+    def _mulai_profil(self):
+        if not settings.METRIK_PROFIL_MS:
+            return None
+        if random.random() >= settings.METRIK_PROFIL_SAMPLE:
+            return None
+        # cProfile tidak bisa jalan dobel, request lain dilewati saja
+        if not self._profil_lock.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _simpan_profil(self, profiler, view, durasi):
+        folder = os.path.join(settings.MEDIA_ROOT, 'profil')
+        os.makedirs(folder, exist_ok=True)
+
+        waktu = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+        nama = f"{waktu}_{view.replace(':', '-')}_{durasi * 1000:.0f}ms.prof"
+        # buka pakai: python -m pstats <file> / snakeviz <file>
+        profiler.dump_stats(os.path.join(folder, nama))
+
+
+# =====================================================
+# ADMISI FORM PENDAFTARAN (OPT-IN: ADMISI_AKTIF=True)
+# =====================================================
+class AdmisiMiddleware:
+    # detail antrean/slot/token bucket ada di backend/admisi.py
+
+    def __init__(self, get_response):
+        if not settings.ADMISI_AKTIF:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        slot = getattr(request, '_admisi_slot', None)
+        if slot:
+            admisi.selesai(slot)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        jalur = (request.resolver_match.url_name, request.method)
+        if jalur not in admisi.DIBATASI:
+            return None
+
+        nomor = None
+        if jalur in admisi.DIANTRE:
+            # tiket sekali pakai: yang sudah dipakai dianggap tanpa tiket
+            nomor = admisi.pakai_tiket(admisi.baca_tiket(request.POST.get('_tiket')))
+
+        # kirim ulang dari ruang tunggu tidak makan token lagi
+        if nomor is None:
+            tunggu = admisi.ambil_token(admisi.ip_klien(request))
+            if tunggu:
+                response = HttpResponse(
+                    "Terlalu banyak permintaan, coba lagi sebentar lagi.",
+                    status=429,
+                    content_type='text/plain; charset=utf-8',
+                )
+                response['Retry-After'] = str(int(tunggu) + 1)
+                response._has_been_logged = True  # bukan error, jangan isi log django.request
+                return response
+
+        if jalur not in admisi.DIANTRE:
+            return None
+
+        slot, antre = admisi.masuk(nomor)
+        if slot:
+            request._admisi_slot = slot
+            return None
+
+        tiket, posisi = antre
+        # tanpa query DB, isi form dikirim ulang apa adanya oleh ruang tunggu
+        response = HttpResponse(render_to_string('ruang_tunggu.html', {
+            'posisi': posisi,
+            'jeda': settings.ADMISI_JEDA,
+            'tiket': tiket,
+            'data': [
+                (key, value)
+                for key, values in request.POST.lists() if key != '_tiket'
+                for value in values
+            ],
+        }), status=503)
+        response['Retry-After'] = str(settings.ADMISI_JEDA)
+        response['Cache-Control'] = 'no-store'
+        response._has_been_logged = True
+        return response
+
+
+# =====================================================
+# REPLIKA BACA (AKTIF KALAU ADA DATABASES['replika'])
+# =====================================================
+def _konten_replika(konten):
+    # ekspor streaming: query jalan saat response dikirim, setelah view selesai
+    with replika.baca_replika():
+        yield from konten
+
+
+class ReplikaMiddleware:
+    # rute DB ada di backend/replika.py; taruh paling bawah biar process_view
+    # middleware lain (csrf, admisi) sudah jalan sebelum view dipanggil di sini
+
+    def __init__(self, get_response):
+        if not replika.terpasang():
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replika.mulai_request()
+        response = self.get_response(request)
+
+        if replika.ada_tulisan() and replika.aktif():
+            # baca-tulisan-sendiri: klien ini baca dari primary dulu
+            response.set_cookie(
+                settings.REPLIKA_COOKIE, '1',
+                max_age=settings.REPLIKA_LENGKET_DETIK,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            not replika.aktif()
+            or request.resolver_match.url_name not in settings.REPLIKA_VIEW
+            or request.method not in ('GET', 'HEAD')
+            or replika.lengket(request)
+        ):
+            return None
+
+        try:
+            with replika.baca_replika():
+                response = view_func(request, *view_args, **view_kwargs)
+        except Http404:
+            response = None
+
+        if response is None or response.status_code == 404:
+            # baris baru yang belum sampai di replika: view diulang di primary
+            return None
+
+        if response.streaming:
+            response.streaming_content = _konten_replika(response.streaming_content)
+        return response
@@ -0,0 +1,54 @@
+# Generated by Django 2.2.10 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+def isi_nomor_urut(apps, schema_editor):
+    # lanjutkan urutan dari nomor yang sudah terpakai
+    Pendaftaran = apps.get_model('backend', 'Pendaftaran')
+    NomorUrutPendaftaran = apps.get_model('backend', 'NomorUrutPendaftaran')
+
+    terakhir = {}
+    nomors = (
+        Pendaftaran.objects
+        .exclude(nomor_pendaftaran='')
+        .values_list('nomor_pendaftaran', flat=True)
+        .iterator()
+    )
+    for nomor in nomors:
+        try:
+            _, tahun, jurusan, urut = nomor.split('-')
+            key = (int(tahun), jurusan)
+            terakhir[key] = max(terakhir.get(key, 0), int(urut))
+        except ValueError:
+            continue
+
+    NomorUrutPendaftaran.objects.bulk_create([
+        NomorUrutPendaftaran(tahun=tahun, jurusan=jurusan, nomor_terakhir=urut)
+        for (tahun, jurusan), urut in terakhir.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_auto_20260103_1703'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NomorUrutPendaftaran',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tahun', models.PositiveSmallIntegerField(verbose_name='Tahun')),
+                ('jurusan', models.CharField(choices=[('TKRO', 'Teknik Kendaraan Ringan Otomotif'), ('TSM', 'Teknik Sepeda Motor'), ('AKL', 'Akuntansi dan Keuangan Lembaga'), ('RPL', 'Rekayasa Perangkat Lunak'), ('KUL', 'Kuliner')], max_length=10, verbose_name='Jurusan')),
+                ('nomor_terakhir', models.PositiveIntegerField(default=0, verbose_name='Nomor Terakhir')),
+            ],
+            options={
+                'verbose_name': 'Nomor Urut Pendaftaran',
+                'verbose_name_plural': 'Nomor Urut Pendaftaran',
+                'unique_together': {('tahun', 'jurusan')},
+            },
+        ),
+        migrations.RunPython(isi_nomor_urut, migrations.RunPython.noop),
+    ]
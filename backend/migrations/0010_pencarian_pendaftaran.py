@@ -0,0 +1,58 @@
+import backend.models
+from django.db import migrations, models
+
+
+def buat_indeks_pencarian(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+                return  # fallback ke icontains
+
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE backend_pendaftaran_fts "
+            "USING fts5(nama_lengkap)"
+        )
+        schema_editor.execute(
+            "INSERT INTO backend_pendaftaran_fts (rowid, nama_lengkap) "
+            "SELECT id, nama_lengkap FROM backend_pendaftaran"
+        )
+
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX backend_pendaftaran_nama_trgm "
+            "ON backend_pendaftaran "
+            "USING gin (UPPER(nama_lengkap::text) gin_trgm_ops)"
+        )
+
+
+def hapus_indeks_pencarian(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS backend_pendaftaran_fts")
+    elif schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS backend_pendaftaran_nama_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_nomorurutpendaftaran'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendaftaranFts',
+            fields=[
+                ('rowid', models.IntegerField(primary_key=True, serialize=False)),
+                ('nama_lengkap', backend.models.KolomFts()),
+            ],
+            options={
+                'db_table': 'backend_pendaftaran_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(buat_indeks_pencarian, hapus_indeks_pencarian),
+    ]
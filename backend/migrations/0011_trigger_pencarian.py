@@ -0,0 +1,70 @@
+# Generated by Django 2.2.10
+
+from django.db import migrations
+
+
+# SQL ditulis di sini (bukan impor backend.pencarian) biar migrasi lama tidak
+# ikut berubah kalau modul pencarian diedit
+TRIGGER = [
+    (
+        'backend_pendaftaran_fts_ai',
+        "AFTER INSERT ON backend_pendaftaran BEGIN "
+        "INSERT INTO backend_pendaftaran_fts (rowid, nama_lengkap) "
+        "VALUES (new.id, new.nama_lengkap); END"
+    ),
+    (
+        'backend_pendaftaran_fts_au',
+        "AFTER UPDATE OF nama_lengkap ON backend_pendaftaran BEGIN "
+        "DELETE FROM backend_pendaftaran_fts WHERE rowid = old.id; "
+        "INSERT INTO backend_pendaftaran_fts (rowid, nama_lengkap) "
+        "VALUES (new.id, new.nama_lengkap); END"
+    ),
+    (
+        'backend_pendaftaran_fts_ad',
+        "AFTER DELETE ON backend_pendaftaran BEGIN "
+        "DELETE FROM backend_pendaftaran_fts WHERE rowid = old.id; END"
+    ),
+]
+
+
+def _ada_fts(connection):
+    # tabel FTS5 cuma dibuat 0010 kalau sqlite-nya support
+    return (
+        connection.vendor == 'sqlite'
+        and 'backend_pendaftaran_fts' in connection.introspection.table_names()
+    )
+
+
+def pasang_trigger_pencarian(apps, schema_editor):
+    if not _ada_fts(schema_editor.connection):
+        return
+
+    for nama, isi in TRIGGER:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {nama}")
+        schema_editor.execute(f"CREATE TRIGGER {nama} {isi}")
+
+    # isi indeks yang mungkin ketinggalan sebelum trigger ada
+    schema_editor.execute("DELETE FROM backend_pendaftaran_fts")
+    schema_editor.execute(
+        "INSERT INTO backend_pendaftaran_fts (rowid, nama_lengkap) "
+        "SELECT id, nama_lengkap FROM backend_pendaftaran"
+    )
+
+
+def hapus_trigger_pencarian(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for nama, _ in TRIGGER:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {nama}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_pencarian_pendaftaran'),
+    ]
+
+    operations = [
+        migrations.RunPython(pasang_trigger_pencarian, hapus_trigger_pencarian),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.10 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_trigger_pencarian'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logaktivitas',
+            index=models.Index(fields=['-timestamp'], name='log_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logaktivitas',
+            index=models.Index(fields=['pendaftaran', '-timestamp'], name='log_pendaftaran_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logaktivitas',
+            index=models.Index(fields=['user', '-timestamp'], name='log_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['-tanggal_pendaftaran'], name='pendaftaran_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['status', '-tanggal_pendaftaran'], name='pendaftaran_status_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['jurusan', '-tanggal_pendaftaran'], name='pendaftaran_jurusan_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendaftaran',
+            index=models.Index(fields=['status', 'jurusan', '-tanggal_pendaftaran'], name='pendaftaran_st_jur_tgl_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.10 on 2026-10-18 15:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_index_pola_query'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logaktivitas',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Waktu'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.10 on 2026-10-18 15:07
+
+import json
+
+from django.db import migrations, models
+
+
+def isi_perubahan_status(apps, schema_editor):
+    # log lama "Status diubah ke X" -> perubahan terstruktur, status lama
+    # tidak tercatat jadi diisi null. Satu UPDATE per status, bukan per baris
+    LogAktivitas = apps.get_model('backend', 'LogAktivitas')
+    Pendaftaran = apps.get_model('backend', 'Pendaftaran')
+
+    for key, label in Pendaftaran._meta.get_field('status').choices:
+        LogAktivitas.objects.filter(
+            aksi="Ubah Status",
+            detail=f"Status diubah ke {label}",
+            perubahan='',
+        ).update(
+            perubahan=json.dumps([['status', None, key]], separators=(',', ':'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArsipLogAktivitas',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_id', models.IntegerField(verbose_name='ID Log Asal')),
+                ('tahun', models.PositiveSmallIntegerField(verbose_name='Tahun PPDB')),
+                ('timestamp', models.DateTimeField(verbose_name='Waktu')),
+                ('user_id', models.IntegerField(blank=True, null=True, verbose_name='ID User')),
+                ('username', models.CharField(blank=True, max_length=150, verbose_name='User')),
+                ('pendaftaran_id', models.IntegerField(verbose_name='ID Pendaftaran')),
+                ('nomor_pendaftaran', models.CharField(blank=True, max_length=20, verbose_name='Nomor Pendaftaran')),
+                ('aksi', models.CharField(max_length=100, verbose_name='Aksi')),
+                ('detail', models.TextField(verbose_name='Detail Perubahan')),
+                ('perubahan', models.TextField(blank=True, default='', verbose_name='Perubahan (JSON)')),
+            ],
+            options={
+                'verbose_name': 'Arsip Log Aktivitas',
+                'verbose_name_plural': 'Arsip Log Aktivitas',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddField(
+            model_name='logaktivitas',
+            name='perubahan',
+            field=models.TextField(blank=True, default='', verbose_name='Perubahan (JSON)'),
+        ),
+        migrations.AddIndex(
+            model_name='arsiplogaktivitas',
+            index=models.Index(fields=['tahun', '-timestamp'], name='arsip_tahun_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arsiplogaktivitas',
+            index=models.Index(fields=['pendaftaran_id', '-timestamp'], name='arsip_pendaftaran_ts_idx'),
+        ),
+        migrations.RunPython(isi_perubahan_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0014_log_perubahan_arsip'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendaftaran',
+            name='kunci_idempotensi',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True, verbose_name='Kunci Idempotensi'),
+        ),
+    ]
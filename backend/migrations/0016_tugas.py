@@ -0,0 +1,41 @@
+# Generated by Django 2.2.10 on 2026-10-18 16:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0015_kunci_idempotensi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tugas',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nama', models.CharField(max_length=100, verbose_name='Nama Tugas')),
+                ('argumen', models.TextField(default='{}', verbose_name='Argumen (JSON)')),
+                ('status', models.CharField(choices=[('antre', 'Antre'), ('jalan', 'Sedang Jalan'), ('selesai', 'Selesai'), ('gagal', 'Gagal')], default='antre', max_length=10, verbose_name='Status')),
+                ('percobaan', models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')),
+                ('maks_percobaan', models.PositiveSmallIntegerField(default=3, verbose_name='Maks Percobaan')),
+                ('jalan_setelah', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Jalan Setelah')),
+                ('dikunci_oleh', models.CharField(blank=True, max_length=100, verbose_name='Dikunci Oleh')),
+                ('dikunci_sampai', models.DateTimeField(blank=True, null=True, verbose_name='Dikunci Sampai')),
+                ('hasil', models.TextField(blank=True, verbose_name='Hasil (JSON)')),
+                ('error', models.TextField(blank=True, verbose_name='Error Terakhir')),
+                ('dibuat', models.DateTimeField(auto_now_add=True, verbose_name='Dibuat')),
+                ('selesai', models.DateTimeField(blank=True, null=True, verbose_name='Selesai')),
+            ],
+            options={
+                'verbose_name': 'Tugas',
+                'verbose_name_plural': 'Tugas',
+                'ordering': ['-dibuat'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tugas',
+            index=models.Index(fields=['status', 'jalan_setelah'], name='tugas_status_jalan_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.10 on 2026-10-18 16:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0016_tugas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notifikasi',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('no_wa', models.CharField(max_length=15, verbose_name='No WhatsApp')),
+                ('status_pendaftaran', models.CharField(max_length=20, verbose_name='Status Pendaftaran')),
+                ('pesan', models.TextField(verbose_name='Pesan')),
+                ('status', models.CharField(choices=[('antre', 'Antre'), ('kirim', 'Sedang Dikirim'), ('terkirim', 'Terkirim'), ('gagal', 'Gagal')], default='antre', max_length=10, verbose_name='Status')),
+                ('percobaan', models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')),
+                ('kirim_setelah', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Kirim Setelah')),
+                ('batch', models.CharField(blank=True, max_length=32, verbose_name='Batch')),
+                ('error', models.TextField(blank=True, verbose_name='Error Terakhir')),
+                ('dibuat', models.DateTimeField(auto_now_add=True, verbose_name='Dibuat')),
+                ('dikirim', models.DateTimeField(blank=True, null=True, verbose_name='Dikirim')),
+                ('pendaftaran', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifikasi', to='backend.Pendaftaran', verbose_name='Pendaftaran')),
+            ],
+            options={
+                'verbose_name': 'Notifikasi WhatsApp',
+                'verbose_name_plural': 'Notifikasi WhatsApp',
+                'ordering': ['-dibuat'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notifikasi',
+            index=models.Index(fields=['status', 'kirim_setelah'], name='notif_status_kirim_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0017_notifikasi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendaftaran',
+            name='sidik_data',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='Sidik Data Form'),
+        ),
+    ]
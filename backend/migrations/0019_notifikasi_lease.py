@@ -0,0 +1,27 @@
+# Generated by Django 2.2.10 on 2026-10-18 16:36
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def lepas_kirim_lama(apps, schema_editor):
+    # baris 'kirim' dari sebelum ada lease tidak punya batas waktu; anggap
+    # sudah habis supaya diambil ulang pengirim berikutnya
+    Notifikasi = apps.get_model('backend', 'Notifikasi')
+    Notifikasi.objects.filter(status='kirim').update(dikunci_sampai=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0018_sidik_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notifikasi',
+            name='dikunci_sampai',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dikunci Sampai'),
+        ),
+        migrations.RunPython(lepas_kirim_lama, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+import json
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from datetime import date
 
 
@@ -201,10 +205,35 @@ class Pendaftaran(models.Model):
         verbose_name="Tanggal & Waktu Pendaftaran"
     )
 
+    # token form pendaftaran publik, biar submit dobel tidak jadi dua data
+    kunci_idempotensi = models.CharField(
+        max_length=32,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Kunci Idempotensi"
+    )
+
+    # sha256 isi form saat kunci di atas dipakai: submit ulang dengan kunci
+    # sama tapi isi berbeda tidak dijawab dengan data pendaftaran ini
+    sidik_data = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Sidik Data Form"
+    )
+
     # =====================
     # SAVE OVERRIDE (AMAN)
     # =====================
     def save(self, *args, **kwargs):
+        self.normalisasi()
+        super().save(*args, **kwargs)
+
+    def normalisasi(self):
+        # dipisah dari save() biar bisa dipakai juga sebelum bulk_create
 
         # Normalisasi nama (AMAN)
         if self.nama_lengkap:
@@ -221,8 +250,6 @@ class Pendaftaran(models.Model):
             else:
                 self.jalur = None
 
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return f"{self.nomor_pendaftaran or 'Belum Ada Nomor'} - {self.nama_lengkap} ({self.jurusan})"
 
@@ -230,6 +257,13 @@ class Pendaftaran(models.Model):
         verbose_name = "Pendaftaran Siswa Baru"
         verbose_name_plural = "Pendaftaran Siswa Baru"
         ordering = ['-tanggal_pendaftaran']
+        # sesuai pola filter list/dashboard: status/jurusan + urut terbaru
+        indexes = [
+            models.Index(fields=['-tanggal_pendaftaran'], name='pendaftaran_tgl_idx'),
+            models.Index(fields=['status', '-tanggal_pendaftaran'], name='pendaftaran_status_tgl_idx'),
+            models.Index(fields=['jurusan', '-tanggal_pendaftaran'], name='pendaftaran_jurusan_tgl_idx'),
+            models.Index(fields=['status', 'jurusan', '-tanggal_pendaftaran'], name='pendaftaran_st_jur_tgl_idx'),
+        ]
 
 
 # =========================
@@ -255,15 +289,356 @@ class LogAktivitas(models.Model):
     detail = models.TextField(
         verbose_name="Detail Perubahan"
     )
+    # [[field, lama, baru], ...] dalam JSON ringkas, biar riwayat bisa
+    # dibaca tanpa parsing teks detail
+    perubahan = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Perubahan (JSON)"
+    )
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        # bukan auto_now_add: log di-buffer, waktunya diisi saat aksi terjadi
+        # bukan saat bulk_create
+        default=timezone.now,
+        editable=False,
         verbose_name="Waktu"
     )
 
     def __str__(self):
         return f"{self.timestamp} - {self.user or 'System'} - {self.aksi}"
 
+    def get_perubahan(self):
+        return json.loads(self.perubahan) if self.perubahan else []
+
     class Meta:
         verbose_name = "Log Aktivitas"
         verbose_name_plural = "Log Aktivitas"
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp'], name='log_timestamp_idx'),
+            models.Index(fields=['pendaftaran', '-timestamp'], name='log_pendaftaran_ts_idx'),
+            models.Index(fields=['user', '-timestamp'], name='log_user_ts_idx'),
+        ]
+
+
+# =========================
+# MODEL ARSIP LOG AKTIVITAS (MUSIM PPDB LAMA)
+# =========================
+class ArsipLogAktivitas(models.Model):
+    # tanpa foreign key: pendaftar / user musim lalu boleh sudah dihapus
+    log_id = models.IntegerField(
+        verbose_name="ID Log Asal"
+    )
+    tahun = models.PositiveSmallIntegerField(
+        verbose_name="Tahun PPDB"
+    )
+    timestamp = models.DateTimeField(
+        verbose_name="Waktu"
+    )
+    user_id = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name="ID User"
+    )
+    username = models.CharField(
+        max_length=150,
+        blank=True,
+        verbose_name="User"
+    )
+    pendaftaran_id = models.IntegerField(
+        verbose_name="ID Pendaftaran"
+    )
+    nomor_pendaftaran = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name="Nomor Pendaftaran"
+    )
+    aksi = models.CharField(
+        max_length=100,
+        verbose_name="Aksi"
+    )
+    detail = models.TextField(
+        verbose_name="Detail Perubahan"
+    )
+    perubahan = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Perubahan (JSON)"
+    )
+
+    def __str__(self):
+        return f"[{self.tahun}] {self.timestamp} - {self.username or 'System'} - {self.aksi}"
+
+    def get_perubahan(self):
+        return json.loads(self.perubahan) if self.perubahan else []
+
+    class Meta:
+        verbose_name = "Arsip Log Aktivitas"
+        verbose_name_plural = "Arsip Log Aktivitas"
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['tahun', '-timestamp'], name='arsip_tahun_ts_idx'),
+            models.Index(fields=['pendaftaran_id', '-timestamp'], name='arsip_pendaftaran_ts_idx'),
+        ]
+
+
+# =========================
+# MODEL NOMOR URUT PENDAFTARAN
+# =========================
+class NomorUrutPendaftaran(models.Model):
+    tahun = models.PositiveSmallIntegerField(
+        verbose_name="Tahun"
+    )
+    jurusan = models.CharField(
+        max_length=10,
+        choices=Pendaftaran.JURUSAN_CHOICES,
+        verbose_name="Jurusan"
+    )
+    nomor_terakhir = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Nomor Terakhir"
+    )
+
+    @classmethod
+    def ambil_berikutnya(cls, tahun, jurusan):
+        return cls.ambil_blok(tahun, jurusan, 1)
+
+    @classmethod
+    def ambil_blok(cls, tahun, jurusan, jumlah):
+        # UPDATE ... SET nomor_terakhir = nomor_terakhir + n dikunci DB,
+        # jadi aman walau banyak worker gunicorn daftar barengan.
+        # Hasilnya nomor pertama dari blok sepanjang `jumlah`.
+        with transaction.atomic():
+            updated = (
+                cls.objects
+                .filter(tahun=tahun, jurusan=jurusan)
+                .update(nomor_terakhir=F('nomor_terakhir') + jumlah)
+            )
+
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            tahun=tahun,
+                            jurusan=jurusan,
+                            nomor_terakhir=jumlah
+                        )
+                    return 1
+                except IntegrityError:
+                    # worker lain duluan bikin baris ini
+                    cls.objects.filter(
+                        tahun=tahun, jurusan=jurusan
+                    ).update(nomor_terakhir=F('nomor_terakhir') + jumlah)
+
+            terakhir = (
+                cls.objects
+                .values_list('nomor_terakhir', flat=True)
+                .get(tahun=tahun, jurusan=jurusan)
+            )
+            return terakhir - jumlah + 1
+
+    def __str__(self):
+        return f"{self.tahun} - {self.jurusan}: {self.nomor_terakhir}"
+
+    class Meta:
+        verbose_name = "Nomor Urut Pendaftaran"
+        verbose_name_plural = "Nomor Urut Pendaftaran"
+        unique_together = [('tahun', 'jurusan')]
+
+
+# =========================
+# MODEL TUGAS LATAR BELAKANG (ANTREAN DI DB)
+# =========================
+class Tugas(models.Model):
+    STATUS_CHOICES = [
+        ('antre', 'Antre'),
+        ('jalan', 'Sedang Jalan'),
+        ('selesai', 'Selesai'),
+        ('gagal', 'Gagal'),
+    ]
+
+    nama = models.CharField(
+        max_length=100,
+        verbose_name="Nama Tugas"
+    )
+    argumen = models.TextField(
+        default='{}',
+        verbose_name="Argumen (JSON)"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='antre',
+        verbose_name="Status"
+    )
+    percobaan = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Percobaan"
+    )
+    maks_percobaan = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name="Maks Percobaan"
+    )
+    jalan_setelah = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Jalan Setelah"
+    )
+    # worker yang sedang mengerjakan; lewat dikunci_sampai dianggap mati
+    # dan tugasnya boleh diambil worker lain
+    dikunci_oleh = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Dikunci Oleh"
+    )
+    dikunci_sampai = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Dikunci Sampai"
+    )
+    hasil = models.TextField(
+        blank=True,
+        verbose_name="Hasil (JSON)"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Error Terakhir"
+    )
+    dibuat = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Dibuat"
+    )
+    selesai = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Selesai"
+    )
+
+    def get_argumen(self):
+        return json.loads(self.argumen) if self.argumen else {}
+
+    def get_hasil(self):
+        return json.loads(self.hasil) if self.hasil else None
+
+    def __str__(self):
+        return f"#{self.pk} {self.nama} ({self.status})"
+
+    class Meta:
+        verbose_name = "Tugas"
+        verbose_name_plural = "Tugas"
+        ordering = ['-dibuat']
+        indexes = [
+            # pola ambil tugas: status antre/jalan + urut jalan_setelah
+            models.Index(fields=['status', 'jalan_setelah'], name='tugas_status_jalan_idx'),
+        ]
+
+
+# =========================
+# MODEL NOTIFIKASI WHATSAPP
+# =========================
+class Notifikasi(models.Model):
+    STATUS_CHOICES = [
+        ('antre', 'Antre'),
+        ('kirim', 'Sedang Dikirim'),
+        ('terkirim', 'Terkirim'),
+        ('gagal', 'Gagal'),
+    ]
+
+    pendaftaran = models.ForeignKey(
+        Pendaftaran,
+        on_delete=models.CASCADE,
+        related_name='notifikasi',
+        verbose_name="Pendaftaran"
+    )
+    no_wa = models.CharField(
+        max_length=15,
+        verbose_name="No WhatsApp"
+    )
+    # status pendaftaran yang diumumkan pesan ini
+    status_pendaftaran = models.CharField(
+        max_length=20,
+        verbose_name="Status Pendaftaran"
+    )
+    pesan = models.TextField(
+        verbose_name="Pesan"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='antre',
+        verbose_name="Status"
+    )
+    percobaan = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Percobaan"
+    )
+    kirim_setelah = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Kirim Setelah"
+    )
+    # penanda batch pengirim yang sedang memegang baris ini
+    batch = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name="Batch"
+    )
+    # batas waktu batch memegang baris 'kirim'; lewat dari ini pengirimnya
+    # dianggap mati dan barisnya boleh diambil batch lain
+    dikunci_sampai = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Dikunci Sampai"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Error Terakhir"
+    )
+    dibuat = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Dibuat"
+    )
+    dikirim = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Dikirim"
+    )
+
+    def __str__(self):
+        return f"{self.no_wa} - {self.status_pendaftaran} ({self.status})"
+
+    class Meta:
+        verbose_name = "Notifikasi WhatsApp"
+        verbose_name_plural = "Notifikasi WhatsApp"
+        ordering = ['-dibuat']
+        indexes = [
+            # pola ambil batch: status antre + urut kirim_setelah
+            models.Index(fields=['status', 'kirim_setelah'], name='notif_status_kirim_idx'),
+        ]
+
+
+# =========================
+# INDEKS PENCARIAN (FTS5 SQLITE)
+# =========================
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class KolomFts(models.TextField):
+    pass
+
+
+KolomFts.register_lookup(Match)
+
+
+class PendaftaranFts(models.Model):
+    # tabel virtual dibuat di migrasi 0010, rowid = id Pendaftaran
+    rowid = models.IntegerField(primary_key=True)
+    nama_lengkap = KolomFts()
+
+    class Meta:
+        managed = False
+        db_table = 'backend_pendaftaran_fts'
@@ -0,0 +1,93 @@
+import hashlib
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+
+
+# =====================================================
+# CEK KETERSEDIAAN NIK (TANPA QUERY UNTUK NIK BARU)
+# =====================================================
+# Tiap worker menyimpan hash 64-bit dari NIK yang sudah terdaftar (bukan NIK
+# aslinya). NIK yang tidak ada di set langsung dianggap tersedia tanpa query;
+# yang ada di set dicek ulang ke DB (bisa saja datanya sudah dihapus).
+# Yang terakhir menentukan tetap unique constraint waktu INSERT.
+NIK_RE = re.compile(r'^\d{16}$')
+
+
+def hash_nik(nik):
+    return int.from_bytes(hashlib.blake2b(nik.encode(), digest_size=8).digest(), 'big')
+
+
+class DaftarNik:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._hash = set()
+        self._pk_terakhir = None
+        self._refresh_terakhir = 0
+
+    def hangatkan(self):
+        from .models import Pendaftaran
+
+        with self._lock:
+            pk_terakhir = Pendaftaran.objects.aggregate(m=Max('pk'))['m'] or 0
+            self._hash = {
+                hash_nik(nik) for nik in
+                Pendaftaran.objects.filter(pk__lte=pk_terakhir)
+                .values_list('nik', flat=True).iterator()
+            }
+            self._pk_terakhir = pk_terakhir
+            self._refresh_terakhir = time.monotonic()
+
+    def _segarkan(self):
+        # NIK dari worker lain: ambil yang pk-nya lebih baru saja (pakai pk index)
+        from .models import Pendaftaran
+
+        if self._pk_terakhir is None:
+            self.hangatkan()
+            return
+        if time.monotonic() - self._refresh_terakhir < settings.NIK_REFRESH_DETIK:
+            return
+
+        with self._lock:
+            baru = list(
+                Pendaftaran.objects
+                .filter(pk__gt=self._pk_terakhir)
+                .values_list('pk', 'nik')
+            )
+            for pk, nik in baru:
+                self._hash.add(hash_nik(nik))
+                self._pk_terakhir = max(self._pk_terakhir, pk)
+            self._refresh_terakhir = time.monotonic()
+
+    def tambah(self, nik):
+        with self._lock:
+            self._hash.add(hash_nik(nik))
+
+    def buang(self, nik):
+        with self._lock:
+            self._hash.discard(hash_nik(nik))
+
+    def terdaftar(self, nik):
+        from .models import Pendaftaran
+
+        self._segarkan()
+        if hash_nik(nik) not in self._hash:
+            return False
+
+        if Pendaftaran.objects.filter(nik=nik).exists():
+            return True
+        self.buang(nik)
+        return False
+
+
+daftar_nik = DaftarNik()
+
+
+def nik_terdaftar(nik):
+    return daftar_nik.terdaftar(nik)
@@ -0,0 +1,290 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notifikasi, Pendaftaran, Tugas
+
+
+# =====================================================
+# NOTIFIKASI STATUS KE WHATSAPP PENDAFTAR
+# =====================================================
+# Ubah status (satu atau massal) cuma menambah baris Notifikasi, pesannya
+# dikirim belakangan lewat transport (gateway HTTP / file) dalam batch:
+# - satu pendaftar paling banyak punya satu pesan antre; status diubah lagi
+#   sebelum terkirim = pesan lama diganti, bukan dikirim dua-duanya
+# - laju total dibatasi NOTIF_PER_MENIT, NOTIF_PARALEL request bersamaan
+# - gagal sementara (timeout, 5xx) diulang dengan jeda berlipat,
+#   gagal permanen (4xx, nomor salah) langsung 'gagal'
+PESAN_STATUS = {
+    'diterima': (
+        "Halo {nama}, selamat! Pendaftaran PPDB dengan nomor {nomor} "
+        "jurusan {jurusan} dinyatakan DITERIMA. Silakan lakukan daftar ulang "
+        "sesuai jadwal yang diumumkan sekolah."
+    ),
+    'ditolak': (
+        "Halo {nama}, mohon maaf, pendaftaran PPDB dengan nomor {nomor} "
+        "jurusan {jurusan} dinyatakan TIDAK DITERIMA. Terima kasih sudah mendaftar."
+    ),
+}
+
+
+def buat_pesan(status, nama, nomor, jurusan):
+    return PESAN_STATUS[status].format(
+        nama=nama,
+        nomor=nomor,
+        jurusan=dict(Pendaftaran.JURUSAN_CHOICES).get(jurusan, jurusan),
+    )
+
+
+def antrekan(pks, status):
+    """Antrekan pesan `status` untuk pendaftar `pks` (status sudah diubah)."""
+    if not settings.NOTIF_AKTIF or status not in PESAN_STATUS or not pks:
+        return 0
+
+    rows = Pendaftaran.objects.filter(pk__in=pks).values_list(
+        'pk', 'no_wa', 'nama_lengkap', 'nomor_pendaftaran', 'jurusan'
+    )
+    with transaction.atomic():
+        # dedup per pendaftar: pesan yang belum terkirim diganti
+        Notifikasi.objects.filter(pendaftaran_id__in=pks, status='antre').delete()
+        jumlah = len(Notifikasi.objects.bulk_create([
+            Notifikasi(
+                pendaftaran_id=pk,
+                no_wa=no_wa,
+                status_pendaftaran=status,
+                pesan=buat_pesan(status, nama, nomor, jurusan),
+            )
+            for pk, no_wa, nama, nomor, jurusan in rows
+        ]))
+
+    if settings.TUGAS_AKTIF:
+        transaction.on_commit(jadwalkan)
+    return jumlah
+
+
+# =====================================================
+# TRANSPORT
+# =====================================================
+class GagalKirim(Exception):
+
+    def __init__(self, pesan, ulang=True):
+        super().__init__(pesan)
+        self.ulang = ulang
+
+
+def nomor_internasional(no_wa):
+    # 08xx -> 628xx, format yang diminta gateway WhatsApp
+    return '62' + no_wa[1:] if no_wa.startswith('0') else no_wa
+
+
+class TransportHTTP:
+    """POST JSON {"target": "628...", "message": "..."} ke NOTIF_HTTP_URL."""
+
+    def __init__(self):
+        if not settings.NOTIF_HTTP_URL:
+            raise ValueError("NOTIF_HTTP_URL belum diisi")
+
+    def kirim(self, no_wa, pesan):
+        request = Request(
+            settings.NOTIF_HTTP_URL,
+            data=json.dumps({
+                'target': nomor_internasional(no_wa),
+                'message': pesan,
+            }).encode(),
+            headers={
+                'Content-Type': 'application/json',
+                'Authorization': settings.NOTIF_HTTP_TOKEN,
+            },
+        )
+        try:
+            with urlopen(request, timeout=settings.NOTIF_HTTP_TIMEOUT) as response:
+                response.read()
+        except HTTPError as e:
+            # 429/5xx: gateway sibuk, coba lagi nanti; 4xx lain: data salah
+            raise GagalKirim(f"HTTP {e.code}", ulang=e.code == 429 or e.code >= 500)
+        except (URLError, OSError) as e:
+            raise GagalKirim(str(e))
+
+
+class TransportFile:
+    """Tulis pesan ke NOTIF_FILE (satu JSON per baris), untuk uji coba."""
+
+    _lock = threading.Lock()
+
+    def kirim(self, no_wa, pesan):
+        baris = json.dumps({
+            'waktu': timezone.now().isoformat(),
+            'target': nomor_internasional(no_wa),
+            'message': pesan,
+        })
+        with self._lock, open(settings.NOTIF_FILE, 'a', encoding='utf-8') as file:
+            file.write(baris + '\n')
+
+
+TRANSPORT = {
+    'http': TransportHTTP,
+    'file': TransportFile,
+}
+
+
+def get_transport(nama=None):
+    # 'http' / 'file', atau path kelas sendiri (mis. 'app.wa.TransportFonnte')
+    nama = nama or settings.NOTIF_TRANSPORT
+    kelas = TRANSPORT.get(nama) or import_string(nama)
+    return kelas()
+
+
+# =====================================================
+# KIRIM DALAM BATCH
+# =====================================================
+class _Laju:
+    # jarak antar pesan 60/per_menit detik, dipakai bersama semua thread
+
+    def __init__(self, per_menit):
+        self.jeda = 60 / per_menit if per_menit else 0
+        self.berikut = time.monotonic()
+        self.lock = threading.Lock()
+
+    def tunggu(self):
+        with self.lock:
+            sekarang = time.monotonic()
+            giliran = max(self.berikut, sekarang)
+            self.berikut = giliran + self.jeda
+        time.sleep(giliran - sekarang)
+
+
+def siap_kirim(sekarang=None):
+    # antre yang sudah waktunya, atau 'kirim' yang lease-nya habis (batch
+    # pengirimnya mati sebelum sempat mencatat hasil)
+    sekarang = sekarang or timezone.now()
+    return Notifikasi.objects.filter(
+        Q(status='antre', kirim_setelah__lte=sekarang)
+        | Q(status='kirim', dikunci_sampai__lt=sekarang)
+    )
+
+
+def _ambil_batch(jumlah):
+    batch = uuid.uuid4().hex
+    sekarang = timezone.now()
+    pks = list(
+        siap_kirim(sekarang)
+        .order_by('kirim_setelah', 'id')
+        .values_list('pk', flat=True)[:jumlah]
+    )
+    # syarat diulang di UPDATE: hanya baris yang masih siap yang didapat batch ini
+    siap_kirim(sekarang).filter(pk__in=pks).update(
+        status='kirim',
+        batch=batch,
+        dikunci_sampai=sekarang + timedelta(seconds=settings.NOTIF_LEASE_DETIK),
+    )
+    return list(Notifikasi.objects.filter(batch=batch, status='kirim'))
+
+
+def _catat_gagal(notif, error, ulang):
+    percobaan = notif.percobaan + 1
+    update = {'percobaan': percobaan, 'error': error, 'dikunci_sampai': None}
+    if ulang and percobaan < settings.NOTIF_MAKS_PERCOBAAN:
+        jeda = settings.NOTIF_BACKOFF_DETIK * 2 ** (percobaan - 1)
+        update.update(status='antre', kirim_setelah=timezone.now() + timedelta(seconds=jeda))
+    else:
+        update.update(status='gagal')
+    Notifikasi.objects.filter(pk=notif.pk, batch=notif.batch).update(**update)
+    return update['status']
+
+
+def kirim_semua(transport=None, per_menit=None, paralel=None, batas=None):
+    """Kirim semua notifikasi antre yang sudah waktunya. Hasilnya ringkasan
+    jumlah terkirim/diulang/gagal, lama (detik) dan laju (pesan/menit)."""
+    transport = transport or get_transport()
+    per_menit = settings.NOTIF_PER_MENIT if per_menit is None else per_menit
+    paralel = paralel or settings.NOTIF_PARALEL
+    laju = _Laju(per_menit)
+
+    hasil = {'terkirim': 0, 'diulang': 0, 'gagal': 0}
+    mulai = time.perf_counter()
+
+    def kirim(notif):
+        laju.tunggu()
+        try:
+            transport.kirim(notif.no_wa, notif.pesan)
+        except GagalKirim as e:
+            return notif, str(e), e.ulang
+        except Exception as e:
+            return notif, repr(e), True
+        return notif, None, None
+
+    with ThreadPoolExecutor(paralel, thread_name_prefix='notif') as pool:
+        while batas is None or sum(hasil.values()) < batas:
+            ukuran = settings.NOTIF_BATCH
+            if batas is not None:
+                ukuran = min(ukuran, batas - sum(hasil.values()))
+            notifs = _ambil_batch(ukuran)
+            if not notifs:
+                break
+
+            terkirim = []
+            for notif, error, ulang in pool.map(kirim, notifs):
+                if error is None:
+                    terkirim.append(notif.pk)
+                elif _catat_gagal(notif, error, ulang) == 'antre':
+                    hasil['diulang'] += 1
+                else:
+                    hasil['gagal'] += 1
+
+            Notifikasi.objects.filter(pk__in=terkirim).update(
+                status='terkirim',
+                percobaan=F('percobaan') + 1,
+                dikirim=timezone.now(),
+                dikunci_sampai=None,
+                error='',
+            )
+            hasil['terkirim'] += len(terkirim)
+
+    hasil['detik'] = time.perf_counter() - mulai
+    hasil['per_menit'] = hasil['terkirim'] * 60 / hasil['detik'] if hasil['detik'] else 0
+    return hasil
+
+
+# =====================================================
+# LEWAT ANTREAN TUGAS (TUGAS_AKTIF)
+# =====================================================
+def jadwalkan(setelah=None, dari_tugas=False):
+    from . import tugas
+
+    # kirim_notifikasi cuma boleh satu: dua tugas bersamaan masing-masing
+    # memakai NOTIF_PER_MENIT, laju totalnya jadi berlipat. Yang sedang jalan
+    # (kuncinya masih hidup) tetap mengambil pesan baru sampai antrean kosong.
+    # `dari_tugas`: dipanggil tugas itu sendiri di akhir, barisnya masih 'jalan'
+    ada = Q(status='antre')
+    if not dari_tugas:
+        ada |= Q(status='jalan', dikunci_sampai__gt=timezone.now())
+    if Tugas.objects.filter(ada, nama='kirim_notifikasi').exists():
+        return None
+
+    obj = tugas.kirim('kirim_notifikasi')
+    if setelah:
+        Tugas.objects.filter(pk=obj.pk).update(jalan_setelah=setelah)
+    return obj
+
+
+def tugas_kirim_notifikasi():
+    hasil = kirim_semua()
+
+    # pesan yang menunggu diulang: jadwalkan tugas berikutnya
+    berikut = Notifikasi.objects.filter(status='antre').aggregate(
+        waktu=Min('kirim_setelah')
+    )['waktu']
+    if berikut:
+        jadwalkan(berikut, dari_tugas=True)
+    return hasil
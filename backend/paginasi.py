@@ -0,0 +1,143 @@
+import base64
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+# =====================================================
+# KEYSET PAGINATION (TANPA COUNT & OFFSET)
+# =====================================================
+# posisi = urutan baris batas di hasil penuh, dibawa di cursor supaya nomor
+# baris tetap bersambung antar halaman tanpa OFFSET/COUNT
+def _encode_cursor(arah, item, posisi):
+    raw = json.dumps([arah, item.tanggal_pendaftaran.isoformat(), item.pk, posisi])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        arah, tanggal, pk, *sisa = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        tanggal = parse_datetime(tanggal)
+    except (ValueError, TypeError):
+        return None
+
+    posisi = sisa[0] if sisa else 0
+    if (
+        arah not in ('next', 'prev') or tanggal is None
+        or not isinstance(pk, int) or not isinstance(posisi, int) or posisi < 0
+    ):
+        return None
+    return arah, tanggal, pk, posisi
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, has_next, has_previous, offset=0):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        # jumlah baris sebelum halaman ini (untuk penomoran)
+        self.offset = offset if has_previous else 0
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return _encode_cursor(
+                'next', self.object_list[-1], self.offset + len(self.object_list)
+            )
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return _encode_cursor('prev', self.object_list[0], self.offset)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    # urutan tetap (-tanggal_pendaftaran, -id), jadi halaman 300 sama murahnya
+    # dengan halaman 1 karena cukup lanjut dari baris terakhir halaman sebelumnya
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by()
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        decoded = _decode_cursor(cursor) if cursor else None
+
+        if decoded is None:
+            rows = list(
+                self.queryset.order_by('-tanggal_pendaftaran', '-id')
+                [:self.per_page + 1]
+            )
+            return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, False)
+
+        arah, tanggal, pk, posisi = decoded
+
+        if arah == 'next':
+            rows = list(
+                self.queryset
+                .filter(
+                    Q(tanggal_pendaftaran__lt=tanggal) |
+                    Q(tanggal_pendaftaran=tanggal, id__lt=pk)
+                )
+                .order_by('-tanggal_pendaftaran', '-id')
+                [:self.per_page + 1]
+            )
+            return KeysetPage(
+                rows[:self.per_page], len(rows) > self.per_page, True, posisi
+            )
+
+        rows = list(
+            self.queryset
+            .filter(
+                Q(tanggal_pendaftaran__gt=tanggal) |
+                Q(tanggal_pendaftaran=tanggal, id__gt=pk)
+            )
+            .order_by('tanggal_pendaftaran', 'id')
+            [:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, True, has_previous, max(posisi - len(rows), 0))
+
+
+# =====================================================
+# PAGINATOR DENGAN JUMLAH PERKIRAAN (DJANGO ADMIN)
+# =====================================================
+class PerkiraanPaginator(Paginator):
+    # di PostgreSQL tanpa filter cukup perkiraan pg_class, selain itu COUNT(*)
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if qs.query.where:
+            return super().count
+
+        conn = connections[qs.db]
+        if conn.vendor == 'postgresql':
+            # reltuples diperbarui ANALYZE (arsipkan_log menjalankannya)
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [qs.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+
+        # sqlite tidak punya statistik baris; MAX(id) tidak bisa dipakai karena
+        # arsipkan_log menghapus rentang id (halaman kosong -> InvalidPage)
+        return super().count
@@ -0,0 +1,159 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+
+from .models import PendaftaranFts
+
+
+FTS_TABLE = PendaftaranFts._meta.db_table
+
+_fts_cache = {}
+
+
+# =====================================================
+# DETEKSI BACKEND PENCARIAN
+# =====================================================
+def fts_tersedia(conn=connection):
+    # tabel FTS5 cuma dibuat migrasi kalau sqlite-nya support
+    if conn.vendor != 'sqlite':
+        return False
+
+    key = conn.settings_dict['NAME']
+    if key not in _fts_cache:
+        _fts_cache[key] = FTS_TABLE in conn.introspection.table_names()
+    return _fts_cache[key]
+
+
+# =====================================================
+# SINKRON INDEKS (TRIGGER SQLITE)
+# =====================================================
+# Sinkron lewat trigger, bukan signal: tulis ke tabel virtual FTS5 dari
+# luar statement INSERT/UPDATE bikin "database is locked" kalau banyak
+# pendaftar submit barengan. Trigger ikut jalan di bulk_create / update().
+TRIGGER_FTS = {
+    'backend_pendaftaran_fts_ai': (
+        "AFTER INSERT ON backend_pendaftaran BEGIN "
+        "INSERT INTO {fts} (rowid, nama_lengkap) "
+        "VALUES (new.id, new.nama_lengkap); END"
+    ),
+    'backend_pendaftaran_fts_au': (
+        "AFTER UPDATE OF nama_lengkap ON backend_pendaftaran BEGIN "
+        "DELETE FROM {fts} WHERE rowid = old.id; "
+        "INSERT INTO {fts} (rowid, nama_lengkap) "
+        "VALUES (new.id, new.nama_lengkap); END"
+    ),
+    'backend_pendaftaran_fts_ad': (
+        "AFTER DELETE ON backend_pendaftaran BEGIN "
+        "DELETE FROM {fts} WHERE rowid = old.id; END"
+    ),
+}
+
+
+def pasang_trigger(conn=connection):
+    """Buat trigger yang belum ada. Kalau ada yang baru dibuat, isi indeks
+    bisa saja ketinggalan, jadi sekalian dibangun ulang."""
+    if conn.vendor != 'sqlite':
+        return False
+
+    with conn.cursor() as cursor:
+        tabel = conn.introspection.table_names(cursor)
+        if FTS_TABLE not in tabel or 'backend_pendaftaran' not in tabel:
+            return False
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        sudah_ada = {row[0] for row in cursor.fetchall()}
+
+        dibuat = False
+        for nama, isi in TRIGGER_FTS.items():
+            if nama not in sudah_ada:
+                cursor.execute(f"CREATE TRIGGER {nama} {isi.format(fts=FTS_TABLE)}")
+                dibuat = True
+
+        if dibuat:
+            _isi_ulang(cursor)
+    return dibuat
+
+
+def hapus_trigger(conn=connection):
+    if conn.vendor != 'sqlite':
+        return
+
+    with conn.cursor() as cursor:
+        for nama in TRIGGER_FTS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nama}")
+
+
+def _isi_ulang(cursor):
+    cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, nama_lengkap) "
+        f"SELECT id, nama_lengkap FROM backend_pendaftaran"
+    )
+
+
+def bangun_ulang_indeks():
+    if not fts_tersedia():
+        return
+
+    with connection.cursor() as cursor:
+        _isi_ulang(cursor)
+
+
+# =====================================================
+# QUERY PENCARIAN
+# =====================================================
+# Nama di sqlite dicari lewat FTS5 per awalan kata ("SAN" -> "SANTI",
+# "BUDI SANTOSO"). Potongan di tengah kata ("ANTO" -> "SUSANTO") baru dicari
+# dengan LIKE '%..%' kalau awalan tidak menemukan apa-apa; di postgres nama
+# selalu dicari sebagai potongan (icontains + index trigram). Jadi kalau ada
+# yang cocok awalannya, hasil sqlite bisa lebih sedikit dari postgres.
+# Semua query memakai koneksi database queryset-nya (qs.db), termasuk
+# replika kalau view dibaca dari sana.
+def _awalan(field, prefix, conn):
+    if conn.vendor == 'sqlite':
+        # LIKE di sqlite case-insensitive jadi tidak bisa pakai index,
+        # pakai rentang >= / < saja biar index unik tetap kepakai
+        batas = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return Q(**{f'{field}__gte': prefix, f'{field}__lt': batas})
+    return Q(**{f'{field}__startswith': prefix})
+
+
+def _kondisi_nama(keyword, conn):
+    tokens = re.findall(r'\w+', keyword)
+    if not tokens:
+        return Q()
+
+    if fts_tersedia(conn):
+        # tiap kata dicocokkan awalannya: "BUDI SAN" -> "BUDI"* "SAN"*
+        match = " ".join(f'"{t}"*' for t in tokens)
+        return Q(id__in=(
+            PendaftaranFts.objects
+            .filter(nama_lengkap__match=match)
+            .values('rowid')
+        ))
+
+    # postgres: index trigram di UPPER(nama_lengkap) dipakai oleh icontains
+    return Q(nama_lengkap__icontains=keyword)
+
+
+def cari_pendaftaran(qs, keyword):
+    keyword = " ".join(keyword.upper().split())
+    if not keyword:
+        return qs
+
+    conn = connections[qs.db]
+    kondisi = _awalan('nomor_pendaftaran', keyword, conn) | _kondisi_nama(keyword, conn)
+
+    if keyword.isdigit():
+        kondisi |= _awalan('nik', keyword, conn)
+
+    hasil = qs.filter(kondisi)
+    if not hasil.exists():
+        # potongan di tengah nama/NIK/nomor (mis. digit terakhir NIK) tidak
+        # ketemu lewat awalan: baru di sini LIKE '%..%' seperti pencarian lama
+        potongan = Q(nik__icontains=keyword) | Q(nomor_pendaftaran__icontains=keyword)
+        if not keyword.isdigit():
+            potongan |= Q(nama_lengkap__icontains=keyword)
+        return qs.filter(potongan)
+    return hasil
@@ -0,0 +1,62 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
+
+
+PERAN_ADMIN = {'Admin', 'Panitia'}
+
+_VERSI_KEY = 'peran:versi'
+
+
+# =====================================================
+# PERAN USER (DI-CACHE, TIDAK QUERY TIAP REQUEST)
+# =====================================================
+def _cache_key(user_id):
+    # versi = waktu perubahan grup terakhir -> semua cache peran otomatis
+    # basi. Bukan counter: kalau key versi ikut dibuang cache (LRU, dipakai
+    # bareng QR & halaman), versi baru tetap belum pernah dipakai, jadi
+    # peran lama yang masih tersimpan tidak terbaca lagi
+    versi = cache.get_or_set(_VERSI_KEY, time.time, None)
+    return f"peran:{versi}:{user_id}"
+
+
+def get_peran(user):
+    if not user.is_authenticated:
+        return frozenset()
+
+    # simpan juga di objek user biar satu request cukup sekali baca cache
+    peran = getattr(user, '_peran_cache', None)
+    if peran is not None:
+        return peran
+
+    key = _cache_key(user.pk)
+    peran = cache.get(key)
+    if peran is None:
+        peran = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(key, peran, settings.PERAN_CACHE_TIMEOUT)
+
+    user._peran_cache = peran
+    return peran
+
+
+def reset_peran():
+    cache.set(_VERSI_KEY, time.time(), None)
+
+
+# =====================================================
+# ROLE CHECK
+# =====================================================
+def is_admin(user):
+    return bool(get_peran(user) & PERAN_ADMIN)
+
+
+def admin_required(view_func):
+    @wraps(view_func)
+    @login_required
+    @user_passes_test(is_admin)
+    def wrapper(request, *args, **kwargs):
+        return view_func(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.cache import cache
+
+
+# =========================
+# QR CODE (TAJAM & AMAN)
+# =========================
+# naikkan kalau parameter QR di bawah diubah, biar cache lama tidak dipakai
+QR_VERSI = 1
+
+
+def render_qr_png(data):
+    qr = qrcode.QRCode(
+        version=3,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=12,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# =========================
+# CACHE QR
+# =========================
+def qr_key(nomor_pendaftaran, data):
+    raw = f"{QR_VERSI}|{nomor_pendaftaran}|{data}".encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(settings.MEDIA_ROOT, 'qr', f"{key}.png")
+
+
+def _baca_disk(key):
+    try:
+        with open(_disk_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _tulis_disk(key, png):
+    _tulis_file(_disk_path(key), png)
+
+
+def _tulis_file(path, png):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # tulis ke file sementara dulu biar worker lain tidak baca file setengah jadi
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(png)
+    os.replace(tmp, path)
+
+
+def ambil_qr_png(nomor_pendaftaran, data):
+    key = qr_key(nomor_pendaftaran, data)
+    cache_key = f"qr:{key}"
+
+    png = cache.get(cache_key)
+    if png is not None:
+        return png
+
+    if settings.QR_DISK_CACHE:
+        png = _baca_disk(key)
+
+    if png is None:
+        png = render_qr_png(data)
+        if settings.QR_DISK_CACHE:
+            _tulis_disk(key, png)
+
+    cache.set(cache_key, png, settings.QR_CACHE_TIMEOUT)
+    return png
+
+
+def render_qr_worker(tugas):
+    # dipanggil di ProcessPoolExecutor spawn (backend/kartu_pdf.py): tanpa
+    # django.setup(), path cache disk sudah dihitung proses induk
+    data, path = tugas
+    png = render_qr_png(data)
+    if path:
+        _tulis_file(path, png)
+    return png
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# =====================================================
+# REPLIKA BACA (DATABASES['replika'])
+# =====================================================
+# View baca yang berat (dashboard, list, ekspor) dan halaman publik
+# sukses/kartu dibaca dari replika, tulis selalu ke 'default'. Replika bisa:
+# - file SQLite hasil `manage.py snapshot_replika` (tertinggal sampai
+#   snapshot berikutnya)
+# - standby PostgreSQL (streaming replication)
+# Klien yang baru menulis dapat cookie REPLIKA_COOKIE selama
+# REPLIKA_LENGKET_DETIK; selama itu semua bacanya dari 'default', jadi
+# pendaftaran yang baru disimpan langsung kelihatan di halaman suksesnya.
+REPLIKA = 'replika'
+
+_lokal = threading.local()
+
+
+def terpasang():
+    return REPLIKA in settings.DATABASES
+
+
+def aktif():
+    # REPLIKA_AKTIF=False: database tetap terdaftar tapi view baca dari 'default'
+    return settings.REPLIKA_AKTIF and terpasang()
+
+
+def lengket(request):
+    return bool(request.COOKIES.get(settings.REPLIKA_COOKIE))
+
+
+def db_baca(request):
+    return REPLIKA if aktif() and not lengket(request) else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def baca_replika():
+    lama = getattr(_lokal, 'replika', False)
+    _lokal.replika = True
+    try:
+        yield
+    finally:
+        _lokal.replika = lama
+
+
+def mulai_request():
+    _lokal.menulis = False
+
+
+def ada_tulisan():
+    return getattr(_lokal, 'menulis', False)
+
+
+class RouterReplika:
+    # cuma model aplikasi ini; session, user & grup tetap di 'default' biar
+    # login yang baru dibuat tidak hilang karena replika tertinggal
+
+    def _dirute(self, model):
+        return model._meta.app_label in settings.REPLIKA_APP
+
+    def db_for_read(self, model, **hints):
+        if getattr(_lokal, 'replika', False) and self._dirute(model):
+            return REPLIKA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if self._dirute(model):
+            _lokal.menulis = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # isi replika = isi 'default', relasi lintas keduanya aman
+        return True
+
+
+# =====================================================
+# SNAPSHOT SQLITE
+# =====================================================
+def salin_sqlite(sumber, tujuan):
+    """Salin database SQLite `sumber` ke `tujuan` lewat backup API (konsisten
+    walau sedang ditulis), lalu ganti file tujuan sekaligus."""
+    folder = os.path.dirname(os.path.abspath(tujuan))
+    fd, sementara = tempfile.mkstemp(suffix='.sqlite3', dir=folder)
+    os.close(fd)
+    try:
+        src = sqlite3.connect(sumber)
+        dst = sqlite3.connect(sementara)
+        try:
+            src.backup(dst)
+            # tanpa WAL: file -wal/-shm replika lama tidak boleh ikut terbaca
+            dst.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            dst.close()
+            src.close()
+        # pembaca yang sedang jalan tetap memegang file lama sampai selesai
+        os.replace(sementara, tujuan)
+    except BaseException:
+        if os.path.exists(sementara):
+            os.remove(sementara)
+        raise
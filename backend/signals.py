@@ -1,8 +1,38 @@
-from django.db.models.signals import pre_save
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.signals import user_logged_in
+from django.core.signals import request_started, request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    pre_save, post_init, post_save, post_delete, post_migrate, m2m_changed,
+)
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Pendaftaran
+from . import audit, koneksi
+from .models import Pendaftaran, NomorUrutPendaftaran
+from .nik import daftar_nik
+from .pencarian import pasang_trigger
+from .peran import get_peran, reset_peran
+from .statistik import reset_statistik
+
+
+def jalur_otomatis():
+    today = timezone.now().date()
+
+    # 🔧 ATUR TANGGAL BATAS DI SINI
+    BATAS_JALUR_KHUSUS = timezone.datetime(
+        today.year, 6, 30
+    ).date()
+
+    if today <= BATAS_JALUR_KHUSUS:
+        return 'KHUSUS'
+    return 'UMUM'
+
+
+def format_nomor(tahun, jurusan, nomor):
+    return f"PPDB-{tahun}-{jurusan}-{nomor:04d}"
 
 
 @receiver(pre_save, sender=Pendaftaran)
@@ -11,17 +41,7 @@ def set_jalur_and_nomor_pendaftaran(sender, instance, **kwargs):
     # SET JALUR OTOMATIS
     # =========================
     if not instance.jalur:
-        today = timezone.now().date()
-
-        # 🔧 ATUR TANGGAL BATAS DI SINI
-        BATAS_JALUR_KHUSUS = timezone.datetime(
-            today.year, 6, 30
-        ).date()
-
-        if today <= BATAS_JALUR_KHUSUS:
-            instance.jalur = 'KHUSUS'
-        else:
-            instance.jalur = 'UMUM'
+        instance.jalur = jalur_otomatis()
 
     # =========================
     # SET NOMOR PENDAFTARAN
@@ -30,26 +50,76 @@ def set_jalur_and_nomor_pendaftaran(sender, instance, **kwargs):
         tahun = timezone.now().year
         jurusan = instance.jurusan
 
-        last = (
-            Pendaftaran.objects
-            .filter(
-                jurusan=jurusan,
-                tanggal_pendaftaran__year=tahun
-            )
-            .order_by('-id')
-            .first()
-        )
-
-        if last and last.nomor_pendaftaran:
-            try:
-                last_number = int(last.nomor_pendaftaran.split('-')[-1])
-            except (ValueError, IndexError):
-                last_number = 0
-        else:
-            last_number = 0
-
-        next_number = last_number + 1
-
-        instance.nomor_pendaftaran = (
-            f"PPDB-{tahun}-{jurusan}-{next_number:04d}"
-        )
+        # nomor diambil dari tabel urutan (atomic), bukan "baris terakhir + 1"
+        next_number = NomorUrutPendaftaran.ambil_berikutnya(tahun, jurusan)
+
+        instance.nomor_pendaftaran = format_nomor(tahun, jurusan, next_number)
+
+
+@receiver(post_save, sender=Pendaftaran)
+@receiver(post_delete, sender=Pendaftaran)
+def reset_statistik_pendaftaran(sender, **kwargs):
+    # angka dashboard dihitung ulang di request berikutnya
+    reset_statistik()
+
+
+@receiver(post_save, sender=Pendaftaran)
+def tambah_daftar_nik(sender, instance, **kwargs):
+    daftar_nik.tambah(instance.nik)
+
+
+@receiver(post_delete, sender=Pendaftaran)
+def buang_daftar_nik(sender, instance, **kwargs):
+    daftar_nik.buang(instance.nik)
+
+
+@receiver(post_init, sender=Pendaftaran)
+def simpan_nilai_awal(sender, instance, **kwargs):
+    audit.snapshot(instance)
+
+
+@receiver(post_save, sender=Pendaftaran)
+def catat_log_aktivitas(sender, instance, created, raw=False, **kwargs):
+    # loaddata (raw) tidak dicatat
+    if not raw:
+        audit.catat_pendaftaran(instance, created)
+
+
+@receiver(request_finished)
+def flush_log_aktivitas(sender, **kwargs):
+    if settings.AUDIT_FLUSH == 'request':
+        audit.flush()
+
+
+@receiver(connection_created)
+def atur_koneksi_baru(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMA:
+        koneksi.atur_sqlite(connection)
+
+
+@receiver(request_started)
+def cek_koneksi_database(sender, **kwargs):
+    if settings.DB_HEALTH_CHECK:
+        koneksi.cek_koneksi()
+
+
+@receiver(post_migrate)
+def cek_trigger_pencarian(sender, app_config, using, **kwargs):
+    # sqlite membuang trigger kalau tabel di-rebuild waktu AlterField dkk,
+    # jadi dicek lagi setiap selesai migrate
+    if app_config.name == 'backend':
+        pasang_trigger(connections[using])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_cache_peran(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        reset_peran()
+
+
+@receiver(user_logged_in)
+def hitung_peran_saat_login(sender, user, **kwargs):
+    # peran langsung dihitung & di-cache begitu login
+    get_peran(user)
@@ -0,0 +1,17 @@
+from django.db.backends.sqlite3 import base
+
+
+# =====================================================
+# SQLITE: TRANSAKSI TULIS LANGSUNG BEGIN IMMEDIATE
+# =====================================================
+# transaction.atomic() di sqlite membuka transaksi dengan BEGIN (DEFERRED):
+# kunci tulis baru diminta saat statement tulis pertama. Kalau sebelumnya
+# sudah ada SELECT (mis. ubah_status_massal baca status lama dulu) dan
+# penulis lain sempat commit, upgrade baca -> tulis langsung gagal
+# "database is locked" tanpa menunggu busy_timeout. BEGIN IMMEDIATE minta
+# kunci tulis di awal, jadi antre lewat busy_timeout seperti biasa.
+# (Pengganti OPTIONS transaction_mode='IMMEDIATE' di Django 5.1+.)
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Pendaftaran
+
+
+STATISTIK_CACHE_KEY = 'statistik_pendaftaran'
+
+
+# =====================================================
+# STATISTIK PENDAFTARAN (SATU QUERY GROUP BY)
+# =====================================================
+def hitung_statistik():
+    statistik = {
+        'total': 0,
+        'status': {key: 0 for key, _ in Pendaftaran.STATUS_CHOICES},
+        'jurusan': {key: 0 for key, _ in Pendaftaran.JURUSAN_CHOICES},
+        'jalur': {key: 0 for key, _ in Pendaftaran.JALUR_CHOICES},
+        # status -> jurusan -> jumlah, buat perkiraan jumlah di list
+        'status_jurusan': {},
+    }
+
+    rows = (
+        Pendaftaran.objects
+        .order_by()
+        .values('status', 'jurusan', 'jalur')
+        .annotate(jumlah=Count('id'))
+    )
+
+    for row in rows:
+        jumlah = row['jumlah']
+        statistik['total'] += jumlah
+        for field in ('status', 'jurusan', 'jalur'):
+            key = row[field]
+            if key:
+                statistik[field][key] = statistik[field].get(key, 0) + jumlah
+
+        per_jurusan = statistik['status_jurusan'].setdefault(row['status'], {})
+        per_jurusan[row['jurusan']] = per_jurusan.get(row['jurusan'], 0) + jumlah
+
+    return statistik
+
+
+def get_statistik():
+    statistik = cache.get(STATISTIK_CACHE_KEY)
+    if statistik is None:
+        statistik = hitung_statistik()
+        cache.set(
+            STATISTIK_CACHE_KEY,
+            statistik,
+            settings.STATISTIK_CACHE_TIMEOUT
+        )
+    return statistik
+
+
+def reset_statistik():
+    cache.delete(STATISTIK_CACHE_KEY)
+
+
+def perkiraan_jumlah(status=None, jurusan=None):
+    statistik = get_statistik()
+
+    if status and jurusan:
+        return statistik['status_jurusan'].get(status, {}).get(jurusan, 0)
+    if status:
+        return statistik['status'].get(status, 0)
+    if jurusan:
+        return statistik['jurusan'].get(jurusan, 0)
+    return statistik['total']
@@ -1,3 +1,1232 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, OperationalError, connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import admisi, audit, idempotensi, notifikasi, qr, replika, tugas
+from .aksi_massal import ubah_status_massal
+from .ekspor import KOLOM_PENDAFTARAN, stream_csv, stream_xlsx
+from .loadtest import (
+    BATAS_QUERY, SKENARIO, PenghitungQuery, buat_log_dummy, buat_pendaftaran_dummy,
+    data_pendaftaran, jalankan_paralel, query_panas, regresi_plan,
+    request_skenario, siapkan_explain, tulis_campur,
+)
+from .forms import FORM_SUDAH_DIKIRIM, PendaftaranForm, kolom_bentrok
+from .impor import baca_baris, impor_pendaftaran
+from .kartu_pdf import cetak_kartu_pdf
+from .metrik import registry
+from .models import ArsipLogAktivitas, LogAktivitas, Notifikasi, Pendaftaran, Tugas
+from .paginasi import PerkiraanPaginator
+from .pencarian import cari_pendaftaran
+from .statistik import reset_statistik
+
+
+def buat_admin(username='admin_uji'):
+    user = User.objects.create_user(username, password='x')
+    user.groups.add(Group.objects.get_or_create(name='Admin')[0])
+    return user
+
+
+def query_view(queries):
+    # load session & user (SessionMiddleware/AuthenticationMiddleware) tidak
+    # dihitung, itu ada di semua halaman login
+    return [
+        q['sql'] for q in queries
+        if 'django_session' not in q['sql'] and '"auth_user"' not in q['sql']
+    ]
+
+
+# =====================================================
+# NOMOR PENDAFTARAN (POST PARALEL)
+# =====================================================
+class NomorPendaftaranParalelTest(TransactionTestCase):
+    # POST home dari banyak thread sekaligus, seperti worker gunicorn saat
+    # jalur dibuka: semua berhasil tanpa retry, nomor urut tanpa bentrok/loncat
+    jumlah = 120
+    worker = 12
+
+    def test_tanpa_bentrok(self):
+        url = reverse('home')
+
+        def kirim(i):
+            return Client().post(url, data_pendaftaran(i, 'RPL')).status_code
+
+        hasil = jalankan_paralel(kirim, self.jumlah, self.worker)
+
+        self.assertEqual(hasil, [302] * self.jumlah)
+        nomors = list(Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True))
+        urut = sorted(int(nomor.split('-')[-1]) for nomor in nomors)
+        self.assertEqual(urut, list(range(1, self.jumlah + 1)))
+
+
+# =====================================================
+# SUBMIT DOBEL (KUNCI IDEMPOTENSI)
+# =====================================================
+class SubmitDobelParalelTest(TransactionTestCase):
+    # pola `manage.py uji_submit_dobel`: tiap pendaftar klik "Daftar" beberapa
+    # kali bersamaan, hasilnya tetap satu data dan semua klik ke sukses yang sama
+    pendaftar = 10
+    klik = 3
+
+    def test_satu_data_per_kunci(self):
+        url = reverse('home')
+        kunci = [idempotensi.kunci_baru() for _ in range(self.pendaftar)]
+
+        def kirim(i):
+            nomor = i // self.klik
+            response = Client().post(url, dict(data_pendaftaran(nomor), kunci=kunci[nomor]))
+            return nomor, response.status_code, response.get('Location')
+
+        hasil = jalankan_paralel(kirim, self.pendaftar * self.klik, 8)
+
+        self.assertEqual({status for _, status, _ in hasil}, {302})
+        tujuan = {}
+        for nomor, _, lokasi in hasil:
+            tujuan.setdefault(nomor, set()).add(lokasi)
+        self.assertEqual([len(lokasi) for lokasi in tujuan.values()], [1] * self.pendaftar)
+        self.assertEqual(Pendaftaran.objects.count(), self.pendaftar)
+
+
+class SubmitUlangTest(TestCase):
+
+    def setUp(self):
+        self.kunci = idempotensi.kunci_baru()
+        self.data = dict(data_pendaftaran(1), kunci=self.kunci)
+        response = self.client.post(reverse('home'), self.data)
+        self.pendaftaran = Pendaftaran.objects.get()
+        self.assertRedirects(response, reverse('sukses', args=[self.pendaftaran.pk]))
+
+    def test_isi_sama_dijawab_hasil_pertama(self):
+        # spasi tepi tidak mengubah sidik
+        data = dict(self.data, nama_lengkap=f"  {self.data['nama_lengkap']} ")
+        response = self.client.post(reverse('home'), data)
+        self.assertRedirects(response, reverse('sukses', args=[self.pendaftaran.pk]))
+
+    def test_isi_beda_ditolak(self):
+        data = dict(self.data, nik='3305000000009999', nama_lengkap="orang lain")
+        response = self.client.post(reverse('home'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, FORM_SUDAH_DIKIRIM)
+        self.assertNotEqual(response.context['kunci'], self.kunci)
+        self.assertEqual(Pendaftaran.objects.count(), 1)
+
+    def test_isi_beda_ditolak_dari_db(self):
+        # worker lain (cache kosong): ketahuan lewat bentrok NIK + kunci di DB
+        cache.clear()
+        data = dict(self.data, nama_ibu="ibu lain")
+        response = self.client.post(reverse('home'), data)
+        self.assertContains(response, FORM_SUDAH_DIKIRIM)
+        self.assertNotIn('sukses', response.get('Location', ''))
+
+    def test_error_lain_tidak_dicek_ke_db(self):
+        cache.clear()
+        data = dict(self.data, nik='3305000000009999', no_wa='12345')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('home'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, FORM_SUDAH_DIKIRIM)
+        self.assertFalse([q for q in ctx.captured_queries if 'kunci_idempotensi' in q['sql']])
+
+
+# =====================================================
+# PENULIS PARALEL (TANPA "DATABASE IS LOCKED")
+# =====================================================
+class PenulisParalelTest(TransactionTestCase):
+    # pola `manage.py uji_konkurensi_db`, tapi thread: tiap thread koneksi
+    # sendiri, WAL + busy_timeout + BEGIN IMMEDIATE (backend/sqlite) harus cukup
+    penulis = 8
+    transaksi = 15
+
+    def test_tanpa_locked(self):
+        hasil = jalankan_paralel(
+            lambda n: tulis_campur(n + 1, self.transaksi), self.penulis, self.penulis
+        )
+
+        self.assertEqual([h['error'] for h in hasil], [[]] * self.penulis)
+        self.assertEqual(sum(h['locked'] for h in hasil), 0)
+        self.assertEqual(
+            Pendaftaran.objects.filter(status='diterima').count(),
+            self.penulis * self.transaksi,
+        )
+
+    def test_baca_lalu_tulis_dalam_transaksi(self):
+        # ubah_status_massal SELECT status lama lalu UPDATE di satu atomic():
+        # dengan BEGIN biasa upgrade baca -> tulis langsung "locked"
+        buat_pendaftaran_dummy(40)
+        pks = list(Pendaftaran.objects.values_list('pk', flat=True))
+        admin = buat_admin()
+
+        def ubah(n):
+            locked = 0
+            for i in range(self.transaksi):
+                try:
+                    ubah_status_massal(admin, ['diterima', 'ditolak'][(n + i) % 2], ids=pks)
+                except OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    locked += 1
+            return locked
+
+        self.assertEqual(jalankan_paralel(ubah, self.penulis, self.penulis), [0] * self.penulis)
+
+
+# =====================================================
+# CEK NIK & BENTROK UNIK
+# =====================================================
+class CekNikTest(TestCase):
+
+    @override_settings(CEK_NIK_PER_MENIT=1, CEK_NIK_BURST=3)
+    def test_dibatasi_per_ip(self):
+        url = reverse('cek_nik')
+        status = [
+            self.client.get(url, {'nik': f'33050000000000{i:02d}'}, REMOTE_ADDR='10.9.8.7').status_code
+            for i in range(5)
+        ]
+        self.assertEqual(status, [200, 200, 200, 429, 429])
+
+        # IP lain punya jatah sendiri
+        response = self.client.get(url, {'nik': '3305000000000001'}, REMOTE_ADDR='10.9.8.6')
+        self.assertEqual(response.status_code, 200)
+
+
+class BentrokUnikTest(TestCase):
+
+    def setUp(self):
+        self.client.post(reverse('home'), data_pendaftaran(1))
+        self.lama = Pendaftaran.objects.get()
+
+    def simpan(self, data, kunci=None):
+        form = PendaftaranForm(data)
+        # lewati cek NIK di clean_nik, biar bentroknya di unique constraint
+        with mock.patch('backend.forms.nik_terdaftar', return_value=False):
+            self.assertTrue(form.is_valid(), form.errors)
+        return form, form.simpan(kunci)
+
+    def test_nik_dobel(self):
+        form, hasil = self.simpan(data_pendaftaran(1))
+        self.assertIsNone(hasil)
+        self.assertTrue(form.has_error('nik', 'terdaftar'))
+
+    def test_kunci_dobel(self):
+        Pendaftaran.objects.filter(pk=self.lama.pk).update(kunci_idempotensi='a' * 32)
+        form, hasil = self.simpan(data_pendaftaran(2), kunci='a' * 32)
+        self.assertIsNone(hasil)
+        self.assertTrue(form.has_error(NON_FIELD_ERRORS, 'dikirim'))
+
+    def test_constraint_lain_tidak_jadi_error_nik(self):
+        form = PendaftaranForm(data_pendaftaran(3))
+        self.assertTrue(form.is_valid(), form.errors)
+        gagal = IntegrityError("NOT NULL constraint failed: backend_pendaftaran.nama_ibu")
+        with mock.patch.object(PendaftaranForm, 'save', side_effect=gagal):
+            with self.assertRaises(IntegrityError):
+                form.simpan()
+
+    def test_kolom_bentrok(self):
+        self.assertEqual(kolom_bentrok(IntegrityError(
+            "UNIQUE constraint failed: backend_pendaftaran.nik")), 'nik')
+        self.assertEqual(kolom_bentrok(IntegrityError(
+            'duplicate key value violates unique constraint '
+            '"backend_pendaftaran_kunci_idempotensi_key"')), 'kunci_idempotensi')
+        self.assertIsNone(kolom_bentrok(IntegrityError(
+            "NOT NULL constraint failed: backend_pendaftaran.jurusan")))
+
+
+# =====================================================
+# ADMISI (TIKET RUANG TUNGGU SEKALI PAKAI)
+# =====================================================
+class AdmisiTiketTest(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        # ADMISI_MAKS=0: tidak ada slot, semua POST masuk ruang tunggu
+        pengaturan = override_settings(
+            ADMISI_AKTIF=True, ADMISI_MAKS=0, ADMISI_IP_BURST=1, ADMISI_FOLDER=folder.name,
+        )
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        cache.clear()
+
+    def test_tiket_sekali_pakai(self):
+        _, (tiket, posisi) = admisi.masuk()
+        self.assertEqual(posisi, 1)
+
+        self.assertEqual(admisi.pakai_tiket(admisi.baca_tiket(tiket)), 1)
+        self.assertIsNone(admisi.pakai_tiket(admisi.baca_tiket(tiket)))
+        self.assertIsNone(admisi.baca_tiket(tiket + 'x'))
+
+    def test_tiket_lama_tidak_melewati_token_bucket(self):
+        url = reverse('home')
+        client = Client(REMOTE_ADDR='10.1.2.3')
+
+        response = client.post(url, data_pendaftaran(1))  # token terakhir
+        self.assertEqual(response.status_code, 503)
+        tiket = response.context['tiket']
+
+        # kirim ulang dari ruang tunggu: tanpa token, dapat tiket baru
+        response = client.post(url, dict(data_pendaftaran(1), _tiket=tiket))
+        self.assertEqual(response.status_code, 503)
+        self.assertNotEqual(response.context['tiket'], tiket)
+
+        # tiket yang sudah dipakai diputar ulang: dihitung request baru
+        response = client.post(url, dict(data_pendaftaran(1), _tiket=tiket))
+        self.assertEqual(response.status_code, 429)
+
+
+class AdmisiAntreanTest(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        pengaturan = override_settings(ADMISI_MAKS=1, ADMISI_JEDA=5, ADMISI_FOLDER=folder.name)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+
+    def kirim_ulang(self, tiket):
+        return admisi.masuk(admisi.pakai_tiket(admisi.baca_tiket(tiket)))
+
+    def test_antrean_habis_walau_ada_yang_pergi(self):
+        slot, _ = admisi.masuk()
+        self.assertIsNotNone(slot)
+
+        tiket = {}
+        for nomor in range(1, 7):
+            _, (tiket[nomor], posisi) = admisi.masuk()
+            self.assertEqual(posisi, nomor)
+
+        # nomor 1, 2, 4 menutup halaman: tiketnya tidak pernah diperbarui
+        pergi = {1, 2, 4}
+        with admisi._Antrean() as antrean:
+            for nomor in pergi:
+                antrean['tiket'][str(nomor)][1] -= 5 * admisi.JEDA_PERGI + 1
+        # nomor 6 sudah memakai tiketnya lalu pergi (baris tiketnya dibuang)
+        admisi.pakai_tiket(admisi.baca_tiket(tiket.pop(6)))
+        with admisi._Antrean() as antrean:
+            del antrean['tiket']['6']
+        admisi.selesai(slot)
+
+        # yang masih menunggu masuk berurutan, satu kirim ulang per orang
+        for nomor in sorted(set(tiket) - pergi):
+            slot, antre = self.kirim_ulang(tiket[nomor])
+            self.assertIsNotNone(slot, nomor)
+            admisi.selesai(slot)
+
+        # antrean kosong: pengunjung baru langsung diproses
+        slot, antre = admisi.masuk()
+        self.assertIsNotNone(slot)
+        self.assertIsNone(antre)
+        slot.lepas()
+
+    def test_slot_kosong_memanggil_pengirim_berikutnya(self):
+        slot, _ = admisi.masuk()
+        _, (tiket1, _) = admisi.masuk()
+        _, (tiket2, _) = admisi.masuk()
+        slot.lepas()  # slot bebas tanpa selesai() (mis. worker mati)
+
+        # nomor 2 datang duluan: nomor 1 masih hidup, jadi 2 tetap menunggu
+        # dan nomor 1 yang dipanggil
+        slot, antre = self.kirim_ulang(tiket2)
+        self.assertIsNone(slot)
+        tiket2, posisi = antre
+        self.assertEqual(posisi, 1)
+
+        slot, _ = self.kirim_ulang(tiket1)
+        self.assertIsNotNone(slot)
+        admisi.selesai(slot)
+        slot, _ = self.kirim_ulang(tiket2)
+        self.assertIsNotNone(slot)
+        slot.lepas()
+
+
+# =====================================================
+# LOG AUDIT (LEWAT BUFFER)
+# =====================================================
+@override_settings(AUDIT_FLUSH='request')
+class AuditBufferTest(TransactionTestCase):
+    # mode 'request': log tertahan di buffer sampai flush, jadi kelihatan
+    # kalau ada jalur yang menulis LogAktivitas langsung
+
+    def setUp(self):
+        self.admin = buat_admin()
+        audit.flush()
+
+    def test_ubah_status_massal(self):
+        buat_pendaftaran_dummy(12)
+        Pendaftaran.objects.update(status='terdaftar')
+
+        pks = list(Pendaftaran.objects.values_list('pk', flat=True))
+        jumlah = ubah_status_massal(self.admin, 'diterima', ids=pks)
+        self.assertEqual(jumlah, 12)
+        self.assertEqual(LogAktivitas.objects.count(), 0)
+
+        self.assertEqual(audit.flush(), 12)
+        logs = LogAktivitas.objects.filter(user=self.admin, aksi="Ubah Status")
+        self.assertEqual(logs.count(), 12)
+
+    def test_impor(self):
+        rows = [
+            (i + 2, {**data_pendaftaran(i), 'tanggal_lahir': '2010-01-01'})
+            for i in range(5)
+        ]
+        hasil = impor_pendaftaran(rows, user=self.admin)
+        self.assertEqual((hasil.berhasil, hasil.errors), (5, []))
+        self.assertEqual(LogAktivitas.objects.count(), 0)
+
+        self.assertEqual(audit.flush(), 5)
+        self.assertEqual(
+            set(LogAktivitas.objects.values_list('pendaftaran_id', flat=True)),
+            set(Pendaftaran.objects.values_list('pk', flat=True)),
+        )
+
+    def test_pendaftaran_publik_tanpa_log(self):
+        # buffer di-flush sendiri di akhir request (mode 'request')
+        response = Client().post(reverse('home'), data_pendaftaran(1))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(LogAktivitas.objects.count(), 0)
+
+        with override_settings(AUDIT_PENDAFTARAN_ONLINE=True):
+            Client().post(reverse('home'), data_pendaftaran(2))
+        self.assertEqual(LogAktivitas.objects.filter(aksi="Pendaftaran Online").count(), 1)
+
+
+# =====================================================
+# QR KARTU (ETAG & CACHE)
+# =====================================================
+class QrKartuTest(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        pengaturan = override_settings(MEDIA_ROOT=folder.name, QR_DISK_CACHE=True)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        cache.clear()
+
+        buat_pendaftaran_dummy(1)
+        nomor = Pendaftaran.objects.get().nomor_pendaftaran
+        self.url = reverse('qr_kartu', args=[nomor])
+
+    def test_etag_dan_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('max-age=86400', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_cache_tidak_render_ulang(self):
+        with mock.patch('backend.qr.render_qr_png', wraps=qr.render_qr_png) as render:
+            png = self.client.get(self.url).content
+            self.assertEqual(render.call_count, 1)
+
+            # cache memori
+            self.assertEqual(self.client.get(self.url).content, png)
+            # cache memori hilang (worker lain / restart): dibaca dari disk
+            cache.clear()
+            self.assertEqual(self.client.get(self.url).content, png)
+            self.assertEqual(render.call_count, 1)
+
+        self.assertEqual(len(os.listdir(os.path.join(settings.MEDIA_ROOT, 'qr'))), 1)
+
+
+# =====================================================
+# DASHBOARD (JUMLAH QUERY)
+# =====================================================
+class DashboardQueryTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(40)
+        self.client.force_login(buat_admin())
+
+    def test_dashboard_maks_dua_query(self):
+        # statistik belum di-cache: satu GROUP BY + 10 pendaftar terbaru
+        reset_statistik()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('dashboard_admin'))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(query_view(ctx.captured_queries)), 2)
+
+        # statistik dari cache: tinggal daftar terbaru
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('dashboard_admin'))
+        self.assertLessEqual(len(query_view(ctx.captured_queries)), 1)
+
+    def test_statistik_sesuai_count(self):
+        reset_statistik()
+        response = self.client.get(reverse('dashboard_admin'))
+        for status in ('terdaftar', 'diterima', 'ditolak', 'daftar_ulang'):
+            self.assertEqual(
+                response.context[status],
+                Pendaftaran.objects.filter(status=status).count(),
+            )
+        self.assertEqual(response.context['total'], Pendaftaran.objects.count())
+
+
+# =====================================================
+# PERAN ADMIN (CACHE)
+# =====================================================
+def query_grup(queries):
+    return [q['sql'] for q in queries if 'auth_group' in q['sql']]
+
+
+class PeranQueryTest(TestCase):
+
+    def setUp(self):
+        self.user = buat_admin()
+        self.client.force_login(self.user)
+
+    def test_peran_tidak_diquery_tiap_request(self):
+        # login sudah menghitung peran, request admin berikutnya tanpa query grup
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('admin_pendaftaran_list'))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(query_grup(ctx.captured_queries), [])
+
+    def test_perubahan_grup_langsung_berlaku(self):
+        self.client.get(reverse('admin_pendaftaran_list'))
+
+        self.user.groups.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin_pendaftaran_list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(query_grup(ctx.captured_queries)), 1)
+
+    def test_versi_terbuang_tidak_menghidupkan_peran_lama(self):
+        self.client.get(reverse('admin_pendaftaran_list'))
+        self.user.groups.clear()
+
+        # key versi dibuang LRU: peran lama (masih tersimpan) tidak boleh terpakai
+        cache.delete('peran:versi')
+        response = self.client.get(reverse('admin_pendaftaran_list'))
+        self.assertEqual(response.status_code, 302)
+
+
+# =====================================================
+# REGRESI JALUR PANAS (JUMLAH QUERY, BATAS DI loadtest.BATAS_QUERY)
+# =====================================================
+# yang dijaga lonjakan seperti N+1 atau COUNT penuh; latensi tidak dicek di
+# sini (mesin CI bisa lambat), lihat `manage.py benchmark --cek-batas`
+class RegresiJalurPanasTest(TestCase):
+    jumlah_request = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = buat_admin()
+        buat_pendaftaran_dummy(1000)
+        buat_log_dummy(2000, user=cls.admin)
+        cls.nomors = list(
+            Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True)[:100]
+        )
+
+    def test_jumlah_query(self):
+        admin = Client()
+        admin.force_login(self.admin)
+
+        for nama, maks_query in BATAS_QUERY.items():
+            login = SKENARIO[nama][1]
+            queries = []
+            for i in range(self.jumlah_request):
+                method, url, data = request_skenario(nama, i, self.nomors)
+                kirim = getattr(admin if login else Client(), method)
+                with PenghitungQuery() as hitung:
+                    response = kirim(url, data) if data else kirim(url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 400, url)
+                queries.append(hitung.jumlah)
+
+            with self.subTest(nama):
+                self.assertLessEqual(max(queries), maks_query)
+
+
+# =====================================================
+# INDEX QUERY PANAS (EXPLAIN)
+# =====================================================
+class QueryPlanTest(TestCase):
+    # gagal kalau query list/dashboard/kartu/log jatuh ke full scan atau
+    # sort manual (index di migrasi 0011 hilang / query berubah)
+
+    def test_query_panas_pakai_index(self):
+        buat_pendaftaran_dummy(500)
+        buat_log_dummy(500)
+        siapkan_explain()
+
+        for nama, qs in query_panas().items():
+            with self.subTest(nama):
+                plan = qs.explain()
+                self.assertEqual(regresi_plan(plan), [], plan)
+
+
+# =====================================================
+# PAGINASI (NOMOR BARIS)
+# =====================================================
+class PaginasiTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(25)
+        self.client.force_login(buat_admin())
+
+    def nomor_halaman(self, cursor=None):
+        data = {'per_page': 10}
+        if cursor:
+            data['cursor'] = cursor
+        response = self.client.get(reverse('admin_pendaftaran_list'), data)
+        page = response.context['page_obj']
+        awal = response.context['nomor_awal']
+        return page, [awal + i for i in range(1, len(page) + 1)]
+
+    def test_nomor_bersambung_antar_halaman(self):
+        page1, nomor1 = self.nomor_halaman()
+        page2, nomor2 = self.nomor_halaman(page1.next_cursor)
+        page3, nomor3 = self.nomor_halaman(page2.next_cursor)
+        self.assertEqual(nomor1 + nomor2 + nomor3, list(range(1, 26)))
+
+        # mundur dari halaman 3 balik ke nomor halaman 2
+        _, mundur = self.nomor_halaman(page3.previous_cursor)
+        self.assertEqual(mundur, nomor2)
+
+    def test_jumlah_log_setelah_diarsip(self):
+        # arsipkan_log menghapus rentang id di awal tabel
+        buat_log_dummy(30)
+        batas = LogAktivitas.objects.order_by('id').values_list('id', flat=True)[19]
+        LogAktivitas.objects.filter(id__lte=batas).delete()
+
+        paginator = PerkiraanPaginator(LogAktivitas.objects.order_by('-id'), 10)
+        self.assertEqual(paginator.count, 10)
+        self.assertEqual(paginator.num_pages, 1)
+
+
+# =====================================================
+# ARSIP LOG MUSIM LAMA
+# =====================================================
+class ArsipLogTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(5)
+        buat_log_dummy(30, user=buat_admin())
+        # 20 log pertama dari musim lalu
+        self.lama = list(LogAktivitas.objects.order_by('id').values_list('id', flat=True)[:20])
+        LogAktivitas.objects.filter(id__in=self.lama).update(
+            timestamp=timezone.make_aware(timezone.datetime(2020, 7, 1))
+        )
+
+    def test_arsip_ke_tabel_per_potongan(self):
+        out = io.StringIO()
+        call_command('arsip_log_aktivitas', tahun=2021, chunk=7, stdout=out)
+
+        self.assertIn('20 log', out.getvalue())
+        self.assertEqual(LogAktivitas.objects.count(), 10)
+        self.assertEqual(
+            sorted(ArsipLogAktivitas.objects.values_list('log_id', flat=True)), self.lama
+        )
+        arsip = ArsipLogAktivitas.objects.get(log_id=self.lama[0])
+        self.assertEqual((arsip.tahun, arsip.username), (2020, 'admin_uji'))
+
+        paginator = PerkiraanPaginator(LogAktivitas.objects.order_by('-id'), 10)
+        self.assertEqual((paginator.count, paginator.num_pages), (10, 1))
+
+    def test_arsip_ke_file(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        path = os.path.join(folder.name, 'log.jsonl.gz')
+
+        self.assertEqual(audit.arsipkan_log(timezone.make_aware(timezone.datetime(2021, 1, 1)), file=path), 20)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            baris = [json.loads(line) for line in f]
+        self.assertEqual([b['log_id'] for b in baris], self.lama)
+        self.assertFalse(ArsipLogAktivitas.objects.exists())
+
+    def test_musim_berjalan_ditolak(self):
+        with self.assertRaises(CommandError):
+            call_command('arsip_log_aktivitas', tahun=timezone.now().year + 1)
+
+    def test_analyze_setelah_arsip_di_postgres(self):
+        conn = mock.MagicMock(vendor='postgresql')
+        conn.ops.quote_name = lambda nama: f'"{nama}"'
+        cursor = conn.cursor.return_value.__enter__.return_value
+        with mock.patch.object(audit, 'connections', {'default': conn}):
+            audit.arsipkan_log(timezone.make_aware(timezone.datetime(2021, 1, 1)))
+
+        self.assertEqual(
+            [c.args[0] for c in cursor.execute.call_args_list],
+            ['ANALYZE "backend_logaktivitas"', 'ANALYZE "backend_arsiplogaktivitas"'],
+        )
+
+
+# =====================================================
+# EKSPOR
+# =====================================================
+class EksporTest(TestCase):
+
+    def test_rumus_di_isian_tidak_dieksekusi(self):
+        buat_pendaftaran_dummy(1)
+        Pendaftaran.objects.update(nama_lengkap='=HYPERLINK("http://x")', asal_sekolah='@SUM(A1)')
+        qs = Pendaftaran.objects.all()
+
+        csv = ''.join(stream_csv(qs, KOLOM_PENDAFTARAN))
+        self.assertIn("'=HYPERLINK", csv)
+        self.assertIn("'@SUM(A1)", csv)
+
+        xlsx = b''.join(stream_xlsx(qs, KOLOM_PENDAFTARAN))
+        with zipfile.ZipFile(io.BytesIO(xlsx)) as zf:
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn("<t>'=HYPERLINK", sheet)
+        self.assertIn("<t>'@SUM(A1)</t>", sheet)
+
+
+# =====================================================
+# IMPOR CSV / XLSX
+# =====================================================
+def xlsx_uji(rows):
+    # XLSX minimal: teks lewat sharedStrings, angka sebagai <v> biasa
+    shared = []
+    xml_rows = []
+    for r, values in enumerate(rows, start=1):
+        cells = []
+        for c, value in enumerate(values):
+            ref = f"{chr(ord('A') + c)}{r}"
+            if value is None:
+                # sel shared string tanpa <v>
+                cells.append(f'<c r="{ref}" t="s"/>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                shared.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{len(shared) - 1}</v></c>')
+        xml_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr('xl/sharedStrings.xml', f'<sst {ns}>' + ''.join(
+            f'<si><t>{teks}</t></si>' for teks in shared
+        ) + '</sst>')
+        zf.writestr(
+            'xl/worksheets/sheet1.xml',
+            f'<worksheet {ns}><sheetData>{"".join(xml_rows)}</sheetData></worksheet>'
+        )
+    buffer.seek(0)
+    return buffer
+
+
+class ImporTest(TestCase):
+
+    def impor(self, file, nama_file):
+        return impor_pendaftaran(baca_baris(file, nama_file))
+
+    def test_csv_label_tanggal_dan_no_wa(self):
+        data = data_pendaftaran(1)
+        header = ['NIK', 'Nama Lengkap', 'Jenis Kelamin', 'Jurusan', 'Tanggal Lahir', 'No WA']
+        kolom = [k for k in data if k not in ('nik', 'nama_lengkap', 'jenis_kelamin',
+                                                'jurusan', 'tanggal_lahir', 'no_wa')]
+        baris = [
+            header + kolom,
+            [data['nik'], 'Siswa CSV', 'Laki-laki', 'Rekayasa Perangkat Lunak',
+             '17/8/2009', '81234567890'] + [data[k] for k in kolom],
+        ]
+        isi = '\n'.join(';'.join(row) for row in baris).encode('utf-8-sig')
+
+        hasil = self.impor(io.BytesIO(isi), 'data.csv')
+        self.assertEqual((hasil.berhasil, hasil.errors), (1, []))
+
+        obj = Pendaftaran.objects.get(nik=data['nik'])
+        self.assertEqual((obj.jenis_kelamin, obj.jurusan), ('L', 'RPL'))
+        self.assertEqual(obj.tanggal_lahir.isoformat(), '2009-08-17')
+        self.assertEqual(obj.no_wa, '081234567890')
+
+    def test_xlsx_shared_string_dan_serial_tanggal(self):
+        data = data_pendaftaran(2)
+        kolom = [k for k in data if k not in ('tanggal_lahir', 'no_wa', 'nik')]
+        rows = [
+            ['nik', 'tanggal_lahir', 'no_wa', 'dusun'] + kolom,
+            [data['nik'], 40000, 81234567890, None] + [data[k] for k in kolom],
+        ]
+
+        hasil = self.impor(xlsx_uji(rows), 'data.xlsx')
+        self.assertEqual((hasil.berhasil, hasil.errors, hasil.error_file), (1, [], ''))
+
+        obj = Pendaftaran.objects.get(nik=data['nik'])
+        self.assertEqual(obj.tanggal_lahir.isoformat(), '2009-07-06')
+        self.assertEqual(obj.no_wa, '081234567890')
+        self.assertEqual(obj.dusun, '')
+
+    def test_baris_tidak_valid_dilaporkan(self):
+        rows = [['nik', 'nama_lengkap'], ['123', 'tanpa data lain']]
+        hasil = self.impor(xlsx_uji(rows), 'data.xlsx')
+        self.assertEqual(hasil.berhasil, 0)
+        self.assertEqual(hasil.errors[0][0], 2)
+        self.assertIn('nik', hasil.errors[0][1])
+
+    def test_file_rusak_tidak_500(self):
+        hasil = self.impor(io.BytesIO(b'bukan zip'), 'data.xlsx')
+        self.assertIn('rusak', hasil.error_file)
+
+        self.client.force_login(buat_admin())
+        file = SimpleUploadedFile('data.xlsx', b'PK\x03\x04 bukan xlsx')
+        response = self.client.post(reverse('admin_pendaftaran_import'), {'file': file})
+        self.assertContains(response, 'rusak')
+
+
+# =====================================================
+# CETAK KARTU MASSAL (TANPA ANTREAN TUGAS)
+# =====================================================
+@override_settings(TUGAS_AKTIF=False, KARTU_PDF_MAKS_SINKRON=5)
+class CetakKartuMassalTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(8)
+        self.client.force_login(buat_admin())
+
+    def test_sedikit_langsung_pdf(self):
+        response = self.client.get(reverse('cetak_kartu_massal'), {'jurusan': 'RPL'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_banyak_ditolak(self):
+        response = self.client.get(reverse('cetak_kartu_massal'))
+        self.assertRedirects(response, reverse('admin_pendaftaran_list'), fetch_redirect_response=False)
+        pesan = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn('runworker', pesan[0])
+
+
+# =====================================================
+# ANTREAN TUGAS (AMBIL, ULANG, KUNCI)
+# =====================================================
+def tugas_gagal():
+    raise RuntimeError("gagal terus")
+
+
+def tugas_lama():
+    # lebih lama dari TUGAS_LEASE_DETIK: tanpa detak worker lain mengambil alih
+    time.sleep(1)
+    return {'diambil_alih': tugas.ambil_tugas(1, 'worker-lain')}
+
+
+@override_settings(TUGAS_BACKOFF_DETIK=10, TUGAS_MAKS_PERCOBAAN=3)
+class AntreanTugasTest(TransactionTestCase):
+
+    def setUp(self):
+        daftar = mock.patch.dict(tugas.DAFTAR_TUGAS, {'gagal': tugas_gagal, 'lama': tugas_lama})
+        daftar.start()
+        self.addCleanup(daftar.stop)
+
+    def kirim(self, jumlah, nama='gagal'):
+        return [tugas.kirim(nama).pk for _ in range(jumlah)]
+
+    def kedaluwarsa(self, pk, **field):
+        Tugas.objects.filter(pk=pk).update(dikunci_sampai=timezone.now() - timedelta(seconds=1), **field)
+
+    def test_ambil_menghitung_percobaan(self):
+        pks = self.kirim(3)
+
+        self.assertEqual(tugas.ambil_tugas(2, 'w1'), pks[:2])
+        self.assertEqual(tugas.ambil_tugas(2, 'w2'), pks[2:])
+        self.assertEqual(tugas.ambil_tugas(2, 'w3'), [])
+
+        obj = Tugas.objects.get(pk=pks[0])
+        self.assertEqual((obj.status, obj.dikunci_oleh, obj.percobaan), ('jalan', 'w1', 1))
+        self.assertGreater(obj.dikunci_sampai, timezone.now())
+
+    def test_compare_and_set_sqlite(self):
+        # SQLite tanpa SKIP LOCKED: tiap tugas cuma dimenangkan satu worker
+        self.assertFalse(connection.features.has_select_for_update_skip_locked)
+        pks = self.kirim(40)
+
+        def worker(n):
+            dapat = []
+            while True:
+                hasil = tugas.ambil_tugas(1, f'w{n}')
+                if not hasil:
+                    return dapat
+                dapat += hasil
+
+        hasil = jalankan_paralel(worker, 8, 8)
+        semua = [pk for dapat in hasil for pk in dapat]
+        self.assertEqual(sorted(semua), pks)
+        for n, dapat in enumerate(hasil):
+            self.assertEqual(
+                set(Tugas.objects.filter(dikunci_oleh=f'w{n}').values_list('pk', flat=True)),
+                set(dapat),
+            )
+        self.assertEqual(set(Tugas.objects.values_list('percobaan', flat=True)), {1})
+
+    def test_ulang_dengan_backoff(self):
+        pk, = self.kirim(1)
+
+        for percobaan, jeda in [(1, 10), (2, 20)]:
+            self.assertEqual(tugas.ambil_tugas(1, 'w1'), [pk])
+            mulai = timezone.now()
+            self.assertFalse(tugas.jalankan(pk))
+
+            obj = Tugas.objects.get(pk=pk)
+            self.assertEqual((obj.status, obj.percobaan), ('antre', percobaan))
+            self.assertIn('gagal terus', obj.error)
+            self.assertAlmostEqual(
+                (obj.jalan_setelah - mulai).total_seconds(), jeda, delta=1,
+            )
+            # belum waktunya diulang
+            self.assertEqual(tugas.ambil_tugas(1, 'w1'), [])
+            Tugas.objects.filter(pk=pk).update(jalan_setelah=timezone.now())
+
+        self.assertEqual(tugas.ambil_tugas(1, 'w1'), [pk])
+        self.assertFalse(tugas.jalankan(pk))
+        obj = Tugas.objects.get(pk=pk)
+        self.assertEqual((obj.status, obj.percobaan), ('gagal', 3))
+        self.assertIsNotNone(obj.selesai)
+
+    def test_kunci_kedaluwarsa_diambil_alih(self):
+        pk, = self.kirim(1)
+        tugas.ambil_tugas(1, 'w1')
+        lama = Tugas.objects.get(pk=pk)
+
+        # w1 mati: kuncinya lewat, w2 mengambil alih sebagai percobaan kedua
+        self.kedaluwarsa(pk)
+        self.assertEqual(tugas.ambil_tugas(1, 'w2'), [pk])
+        obj = Tugas.objects.get(pk=pk)
+        self.assertEqual((obj.dikunci_oleh, obj.percobaan), ('w2', 2))
+
+        # w1 ternyata masih hidup: tidak bisa memperpanjang/menimpa lagi
+        self.assertFalse(tugas.perpanjang_kunci(pk, 'w1'))
+        tugas._gagal(lama, 'hasil w1')
+        self.assertEqual(Tugas.objects.get(pk=pk).status, 'jalan')
+
+        # mati lagi di percobaan terakhir: gagal, tidak diambil lagi
+        self.kedaluwarsa(pk, percobaan=3)
+        self.assertEqual(tugas.ambil_tugas(1, 'w3'), [])
+        obj = Tugas.objects.get(pk=pk)
+        self.assertEqual((obj.status, obj.dikunci_sampai), ('gagal', None))
+
+    @override_settings(TUGAS_LEASE_DETIK=0.3)
+    def test_detak_memperpanjang_kunci(self):
+        pk, = self.kirim(1, 'lama')
+        tugas.ambil_tugas(1, 'w1')
+
+        self.assertTrue(tugas.jalankan(pk))
+        obj = Tugas.objects.get(pk=pk)
+        self.assertEqual(obj.status, 'selesai')
+        self.assertEqual(obj.get_hasil(), {'diambil_alih': []})
+        self.assertEqual(obj.percobaan, 1)
+
+
+# =====================================================
+# TUGAS CETAK KARTU (FILE HASIL PRIVAT)
+# =====================================================
+class TugasCetakKartuTest(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        pengaturan = override_settings(TUGAS_AKTIF=True, TUGAS_FOLDER=folder.name)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+
+        buat_pendaftaran_dummy(3)
+        self.client.force_login(buat_admin())
+
+    def test_pdf_di_luar_media_dan_diunduh_admin(self):
+        hasil = tugas.cetak_kartu({}, 'http://testserver/', 'kartu.pdf')
+        path = os.path.join(settings.TUGAS_FOLDER, hasil['file'])
+        self.assertTrue(os.path.isfile(path))
+        self.assertFalse(os.path.abspath(path).startswith(os.path.abspath(settings.MEDIA_ROOT)))
+
+        obj = Tugas.objects.create(nama='cetak_kartu', status='selesai', hasil=json.dumps(hasil))
+        response = self.client.get(reverse('unduh_tugas', args=[obj.pk]))
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+        self.client.logout()
+        response = self.client.get(reverse('unduh_tugas', args=[obj.pk]))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(QR_DISK_CACHE=False)
+    def test_pool_proses_sama_dengan_tanpa_pool(self):
+        # pool spawn: QR dirender proses anak tanpa django.setup()
+        hasil = []
+        for workers in (1, 2):
+            cache.clear()
+            file = io.BytesIO()
+            jumlah = cetak_kartu_pdf(Pendaftaran.objects.all(), file, 'http://testserver/', workers)
+            self.assertEqual(jumlah, 3)
+            hasil.append(file.getvalue())
+        self.assertEqual(hasil[0], hasil[1])
+
+    def test_pendaftaran_tanpa_tugas_qr(self):
+        self.client.post(reverse('home'), data_pendaftaran(100))
+        self.assertFalse(Tugas.objects.filter(nama='render_qr').exists())
+
+
+# =====================================================
+# NOTIFIKASI
+# =====================================================
+class TransportCatat:
+
+    def __init__(self):
+        self.terkirim = []
+
+    def kirim(self, no_wa, pesan):
+        self.terkirim.append(no_wa)
+
+
+class NotifikasiLeaseTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(2)
+        lama, baru = Pendaftaran.objects.order_by('id')
+        sekarang = timezone.now()
+        self.mati = Notifikasi.objects.create(
+            pendaftaran=lama, no_wa='081200000001', status_pendaftaran='diterima',
+            pesan='x', status='kirim', batch='batchmati',
+            dikunci_sampai=sekarang - timedelta(seconds=1),
+        )
+        self.jalan = Notifikasi.objects.create(
+            pendaftaran=baru, no_wa='081200000002', status_pendaftaran='diterima',
+            pesan='x', status='kirim', batch='batchjalan',
+            dikunci_sampai=sekarang + timedelta(minutes=5),
+        )
+
+    def test_kirim_lease_habis_diambil_ulang(self):
+        transport = TransportCatat()
+        hasil = notifikasi.kirim_semua(transport, per_menit=0)
+
+        self.assertEqual(hasil['terkirim'], 1)
+        self.assertEqual(transport.terkirim, ['081200000001'])
+        self.mati.refresh_from_db()
+        self.assertEqual(self.mati.status, 'terkirim')
+        self.assertIsNone(self.mati.dikunci_sampai)
+
+        # yang lease-nya masih jalan tetap milik batch lain
+        self.jalan.refresh_from_db()
+        self.assertEqual((self.jalan.status, self.jalan.batch), ('kirim', 'batchjalan'))
+
+    def test_ambil_batch_memasang_lease(self):
+        Notifikasi.objects.filter(pk=self.mati.pk).update(status='antre', dikunci_sampai=None)
+        notifs = notifikasi._ambil_batch(10)
+
+        self.assertEqual([n.pk for n in notifs], [self.mati.pk])
+        self.assertGreater(notifs[0].dikunci_sampai, timezone.now())
+
+
+@override_settings(TUGAS_AKTIF=True)
+class JadwalNotifikasiTest(TestCase):
+
+    def tugas_kirim(self):
+        return Tugas.objects.filter(nama='kirim_notifikasi')
+
+    def test_satu_tugas_kirim(self):
+        self.assertIsNotNone(notifikasi.jadwalkan())
+        # sudah ada yang antre
+        self.assertIsNone(notifikasi.jadwalkan())
+
+        # sedang jalan dengan kunci hidup: tidak ditambah
+        self.tugas_kirim().update(
+            status='jalan', dikunci_sampai=timezone.now() + timedelta(minutes=5),
+        )
+        self.assertIsNone(notifikasi.jadwalkan())
+        self.assertEqual(self.tugas_kirim().count(), 1)
+
+        # kuncinya kedaluwarsa (worker mati): boleh dijadwalkan lagi
+        self.tugas_kirim().update(dikunci_sampai=timezone.now() - timedelta(seconds=1))
+        self.assertIsNotNone(notifikasi.jadwalkan())
+        self.assertEqual(self.tugas_kirim().count(), 2)
+
+    def test_tugas_jalan_menjadwalkan_ulang_dirinya(self):
+        notifikasi.jadwalkan()
+        self.tugas_kirim().update(
+            status='jalan', dikunci_sampai=timezone.now() + timedelta(minutes=5),
+        )
+        berikut = timezone.now() + timedelta(seconds=30)
+
+        obj = notifikasi.jadwalkan(berikut, dari_tugas=True)
+        self.assertIsNotNone(obj)
+        self.assertEqual(Tugas.objects.get(pk=obj.pk).jalan_setelah, berikut)
+
+
+# =====================================================
+# PENCARIAN
+# =====================================================
+class PencarianTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(30)
+        self.pendaftaran = Pendaftaran.objects.get(nik='3305000000000017')
+
+    def cari(self, keyword):
+        return list(cari_pendaftaran(Pendaftaran.objects.all(), keyword))
+
+    def test_awalan_nama_nomor_nik(self):
+        self.assertIn(self.pendaftaran, self.cari(self.pendaftaran.nama_lengkap.split()[0][:3]))
+        self.assertEqual(self.cari(self.pendaftaran.nomor_pendaftaran), [self.pendaftaran])
+        self.assertEqual(self.cari('330500000000001'), list(
+            Pendaftaran.objects.filter(nik__startswith='330500000000001')
+        ))
+
+    def test_potongan_tengah_nik(self):
+        # digit terakhir NIK bukan awalan, tetap ketemu lewat fallback
+        self.assertIn(self.pendaftaran, self.cari('0017'))
+
+    def test_potongan_tengah_nama(self):
+        # tidak ada kata berawalan ANTOS: jatuh ke LIKE, SANTOSO ketemu
+        hasil = self.cari('antos')
+        self.assertTrue(hasil)
+        self.assertTrue(all('SANTOSO' in p.nama_lengkap for p in hasil))
+
+    def test_nomor_dummy_muat_di_kolom(self):
+        # 21 karakter (TKRO + 6 digit) ditolak postgres
+        buat_pendaftaran_dummy(5, mulai=5 * 12345)
+        panjang = Pendaftaran._meta.get_field('nomor_pendaftaran').max_length
+        self.assertLessEqual(
+            max(len(nomor) for nomor in Pendaftaran.objects.values_list('nomor_pendaftaran', flat=True)),
+            panjang
+        )
+
+
+# =====================================================
+# INSTRUMENTASI (METRIK)
+# =====================================================
+@override_settings(METRIK_AKTIF=True)
+class InstrumentasiTest(TestCase):
+
+    def setUp(self):
+        buat_pendaftaran_dummy(1)
+        self.pendaftaran = Pendaftaran.objects.get()
+        registry.reset()
+
+    def test_waktu_template_per_request(self):
+        response = self.client.get(reverse('print_kartu', args=[self.pendaftaran.nomor_pendaftaran]))
+        self.assertEqual(response.status_code, 200)
+
+        metrik = registry.render()
+        self.assertIn('openppdb_request_total{view="print_kartu",status="200"} 1', metrik)
+        self.assertIn('openppdb_template_detik_count{view="print_kartu"} 1', metrik)
+
+    def test_render_di_luar_request_tidak_diukur(self):
+        from django.template.base import Template
+        from django.template.loader import render_to_string
+
+        # tidak ada patch global ke Template.render
+        self.assertFalse(hasattr(Template.render, '_diukur'))
+        render_to_string('kartu_pendaftaran.html', {'pendaftaran': self.pendaftaran})
+        self.assertNotIn('openppdb_template_detik_count', registry.render())
+
+
+# =====================================================
+# REPLIKA BACA
+# =====================================================
+# 'default' dan 'replika' dua database SQLite terpisah (settings/test.py), isi
+# replika dibuat sendiri supaya kelihatan dari mana halaman dibaca.
+@override_settings(REPLIKA_AKTIF=True)
+class ReplikaTest(TestCase):
+    databases = {'default', replika.REPLIKA}
+
+    def setUp(self):
+        buat_pendaftaran_dummy(3)
+        self.pendaftaran = Pendaftaran.objects.order_by('pk').first()
+
+        # "replikasi": baris yang sama, nama dibedakan
+        salinan = list(Pendaftaran.objects.order_by('pk')[:2])
+        for obj in salinan:
+            obj.nama_lengkap = f"REPLIKA {obj.pk}"
+        Pendaftaran.objects.using(replika.REPLIKA).bulk_create(salinan)
+
+        self.user = buat_admin()
+
+    def test_router_baca_dari_replika(self):
+        self.assertEqual(Pendaftaran.objects.count(), 3)
+        with replika.baca_replika():
+            self.assertEqual(Pendaftaran.objects.count(), 2)
+            # tulis tetap ke primary
+            Pendaftaran.objects.filter(pk=self.pendaftaran.pk).update(status='diterima')
+        self.assertEqual(Pendaftaran.objects.get(pk=self.pendaftaran.pk).status, 'diterima')
+
+    def test_pencarian_di_replika(self):
+        with replika.baca_replika():
+            hasil = cari_pendaftaran(Pendaftaran.objects.all(), 'REPLIKA')
+            self.assertEqual(hasil.db, replika.REPLIKA)
+            self.assertEqual(len(hasil), 2)
+
+    def test_view_publik_dari_replika(self):
+        response = self.client.get(f'/kartu/{self.pendaftaran.nomor_pendaftaran}/')
+        self.assertContains(response, f"REPLIKA {self.pendaftaran.pk}")
+
+    def test_belum_di_replika_dibaca_dari_primary(self):
+        terakhir = Pendaftaran.objects.order_by('pk').last()
+        response = self.client.get(f'/sukses/{terakhir.pk}/')
+        self.assertContains(response, terakhir.nama_lengkap)
+
+    def test_view_lain_tidak_dirute(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/pendaftaran/tambah/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.REPLIKA_COOKIE, response.cookies)
+
+    def test_baca_tulisan_sendiri(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            f'/admin/ubah-status/{self.pendaftaran.pk}/', {'status': 'diterima'}
+        )
+        self.assertIn(settings.REPLIKA_COOKIE, response.cookies)
+
+        # klien yang baru menulis baca dari primary, klien lain dari replika
+        response = self.client.get(f'/kartu/{self.pendaftaran.nomor_pendaftaran}/')
+        self.assertContains(response, self.pendaftaran.nama_lengkap)
+        self.assertNotContains(response, "REPLIKA")
+
+        self.client.cookies.pop(settings.REPLIKA_COOKIE)
+        response = self.client.get(f'/kartu/{self.pendaftaran.nomor_pendaftaran}/')
+        self.assertContains(response, f"REPLIKA {self.pendaftaran.pk}")
+
+    def test_ekspor_streaming_dari_replika(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/export/?format=csv')
+        isi = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertIn(f"REPLIKA {self.pendaftaran.pk}", isi)
+        self.assertEqual(isi.count('\n'), 3)  # header + 2 baris replika
+
+
+class SnapshotSqliteTest(TestCase):
+
+    def test_salin_sqlite(self):
+        with tempfile.TemporaryDirectory() as folder:
+            sumber = os.path.join(folder, 'db.sqlite3')
+            tujuan = os.path.join(folder, 'replika.sqlite3')
+
+            conn = sqlite3.connect(sumber)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('CREATE TABLE t (x INTEGER)')
+            conn.execute('INSERT INTO t VALUES (1)')
+            conn.commit()
+
+            salin = sqlite3.connect(tujuan)  # pembaca yang sedang buka file lama
+            replika.salin_sqlite(sumber, tujuan)
+            conn.execute('INSERT INTO t VALUES (2)')
+            conn.commit()
+            replika.salin_sqlite(sumber, tujuan)
+            conn.close()
+            salin.close()
+
+            hasil = sqlite3.connect(tujuan)
+            self.assertEqual(hasil.execute('SELECT COUNT(*) FROM t').fetchone(), (2,))
+            self.assertEqual(hasil.execute('PRAGMA journal_mode').fetchone(), ('delete',))
+            hasil.close()
+            self.assertEqual(os.listdir(folder).count('replika.sqlite3-wal'), 0)
@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Tugas
+
+logger = logging.getLogger(__name__)
+
+# =====================================================
+# ANTREAN TUGAS DI DATABASE (TANPA REDIS/CELERY)
+# =====================================================
+# kirim('nama', **argumen) cuma INSERT satu baris; `manage.py runworker`
+# mengambil dan menjalankannya. Ambil tugas:
+# - PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED, worker tidak saling tunggu
+# - SQLite: UPDATE ... WHERE status='antre' per baris (compare-and-set),
+#   penulisan SQLite berurutan jadi satu tugas cuma dimenangkan satu worker
+# Percobaan dihitung saat tugas diambil; selama jalan kuncinya diperpanjang
+# (detak) tiap TUGAS_LEASE_DETIK/3, jadi cuma worker yang mati yang kehilangan
+# kunci. Tugas yang gagal diulang dengan jeda TUGAS_BACKOFF_DETIK * 2^(percobaan-1).
+DAFTAR_TUGAS = {}
+
+
+def tugas(nama):
+    def daftar(fungsi):
+        DAFTAR_TUGAS[nama] = fungsi
+        return fungsi
+    return daftar
+
+
+def kirim(nama, **argumen):
+    if nama not in DAFTAR_TUGAS:
+        raise ValueError(f"Tugas tidak dikenal: {nama}")
+
+    return Tugas.objects.create(
+        nama=nama,
+        argumen=json.dumps(argumen, separators=(',', ':')),
+        maks_percobaan=settings.TUGAS_MAKS_PERCOBAAN,
+    )
+
+
+def nama_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# =====================================================
+# AMBIL TUGAS
+# =====================================================
+def _siap(sekarang):
+    # tugas antre yang sudah waktunya, atau yang kuncinya kedaluwarsa
+    # (worker-nya mati di tengah jalan)
+    return Tugas.objects.filter(
+        Q(status='antre', jalan_setelah__lte=sekarang)
+        | Q(status='jalan', dikunci_sampai__lt=sekarang, percobaan__lt=F('maks_percobaan'))
+    ).order_by('jalan_setelah', 'id')
+
+
+def _lease_habis(sekarang):
+    # worker-nya mati di percobaan terakhir (mis. kehabisan memori): jangan
+    # diambil lagi, nanti tiap worker yang mengambilnya ikut mati
+    habis = Tugas.objects.filter(
+        status='jalan', dikunci_sampai__lt=sekarang, percobaan__gte=F('maks_percobaan'),
+    )
+    # dicek dulu: di SQLite UPDATE kosong tiap poll tetap mengambil kunci tulis
+    if not habis.exists():
+        return
+    habis.update(
+        status='gagal',
+        error="Kunci kedaluwarsa di percobaan terakhir (worker berhenti).",
+        selesai=sekarang,
+        dikunci_sampai=None,
+    )
+
+
+def ambil_tugas(jumlah, worker):
+    """Kunci paling banyak `jumlah` tugas untuk `worker`, hasilnya daftar pk."""
+    sekarang = timezone.now()
+    kunci = {
+        'status': 'jalan',
+        'dikunci_oleh': worker,
+        'dikunci_sampai': sekarang + timedelta(seconds=settings.TUGAS_LEASE_DETIK),
+        'percobaan': F('percobaan') + 1,
+    }
+    _lease_habis(sekarang)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(
+                _siap(sekarang)
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:jumlah]
+            )
+            Tugas.objects.filter(pk__in=pks).update(**kunci)
+        return pks
+
+    pks = []
+    for pk, status, dikunci_sampai in _siap(sekarang).values_list(
+        'pk', 'status', 'dikunci_sampai'
+    )[:jumlah * 2]:
+        # cuma menang kalau barisnya belum diubah worker lain sejak dibaca
+        if Tugas.objects.filter(
+            pk=pk, status=status, dikunci_sampai=dikunci_sampai
+        ).update(**kunci):
+            pks.append(pk)
+            if len(pks) == jumlah:
+                break
+    return pks
+
+
+# =====================================================
+# JALANKAN (DI THREAD / PROSES WORKER)
+# =====================================================
+def perpanjang_kunci(pk, worker):
+    """False kalau kunci tugas sudah bukan milik `worker` lagi."""
+    return bool(Tugas.objects.filter(pk=pk, status='jalan', dikunci_oleh=worker).update(
+        dikunci_sampai=timezone.now() + timedelta(seconds=settings.TUGAS_LEASE_DETIK),
+    ))
+
+
+@contextmanager
+def _detak(obj):
+    berhenti = threading.Event()
+
+    def jalan():
+        try:
+            while not berhenti.wait(settings.TUGAS_LEASE_DETIK / 3):
+                try:
+                    if not perpanjang_kunci(obj.pk, obj.dikunci_oleh):
+                        return
+                except DatabaseError:
+                    # mis. database sedang terkunci: coba lagi di detak berikutnya
+                    logger.warning("Gagal memperpanjang kunci tugas %s", obj.pk, exc_info=True)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=jalan, name=f'detak-tugas-{obj.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        berhenti.set()
+        thread.join()
+
+
+def jalankan(pk):
+    close_old_connections()
+    try:
+        obj = Tugas.objects.get(pk=pk)
+        fungsi = DAFTAR_TUGAS.get(obj.nama)
+        try:
+            if fungsi is None:
+                raise LookupError(f"Tugas tidak dikenal: {obj.nama}")
+            with _detak(obj):
+                hasil = fungsi(**obj.get_argumen())
+        except Exception:
+            _gagal(obj, traceback.format_exc(), ulang=fungsi is not None)
+            return False
+
+        # filter dikunci_oleh: kalau kunci sudah diambil alih worker lain,
+        # hasil worker ini tidak menimpa
+        Tugas.objects.filter(pk=pk, dikunci_oleh=obj.dikunci_oleh).update(
+            status='selesai',
+            hasil=json.dumps(hasil, separators=(',', ':')),
+            selesai=timezone.now(),
+            dikunci_sampai=None,
+        )
+        return True
+    finally:
+        close_old_connections()
+
+
+def _gagal(obj, error, ulang=True):
+    # percobaan ini sudah dihitung saat diambil (ambil_tugas)
+    percobaan = obj.percobaan
+    update = {
+        'error': error,
+        'dikunci_sampai': None,
+    }
+    if ulang and percobaan < obj.maks_percobaan:
+        jeda = settings.TUGAS_BACKOFF_DETIK * 2 ** (percobaan - 1)
+        update.update(status='antre', jalan_setelah=timezone.now() + timedelta(seconds=jeda))
+    else:
+        update.update(status='gagal', selesai=timezone.now())
+
+    Tugas.objects.filter(pk=obj.pk, dikunci_oleh=obj.dikunci_oleh).update(**update)
+
+
+# =====================================================
+# DAFTAR TUGAS
+# =====================================================
+@tugas('render_qr')
+def render_qr(nomor_pendaftaran, data):
+    # isi cache QR disk sebelum kartu dibuka pertama kali (QR_PRA_RENDER)
+    from .qr import ambil_qr_png
+
+    ambil_qr_png(nomor_pendaftaran, data)
+
+
+@tugas('cetak_kartu')
+def cetak_kartu(params, base_url, nama_file):
+    from .ekspor import filter_ekspor
+    from .kartu_pdf import cetak_kartu_pdf
+    from .models import Pendaftaran
+
+    # kartu berisi data pribadi: disimpan di luar MEDIA_ROOT, cuma bisa
+    # diunduh admin lewat unduh_tugas
+    os.makedirs(settings.TUGAS_FOLDER, exist_ok=True)
+    nama = f"{timezone.now():%Y%m%d-%H%M%S}-{nama_file}"
+    path = os.path.join(settings.TUGAS_FOLDER, nama)
+
+    qs = filter_ekspor(Pendaftaran.objects.all(), params)
+    with open(path, 'wb') as file:
+        jumlah = cetak_kartu_pdf(qs, file, base_url)
+    return {'file': nama, 'jumlah': jumlah}
+
+
+@tugas('kirim_notifikasi')
+def kirim_notifikasi():
+    from .notifikasi import tugas_kirim_notifikasi
+
+    return tugas_kirim_notifikasi()
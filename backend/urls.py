@@ -24,12 +24,18 @@ urlpatterns = [
     # PUBLIC
     # ======================
     path('', views.home, name='home'),
+    path('cek-nik/', views.cek_nik, name='cek_nik'),
     path('sukses/<int:pk>/', views.sukses, name='sukses'),
     path(
         'kartu/<str:nomor_pendaftaran>/',
         views.print_kartu,
         name='print_kartu'
     ),
+    path(
+        'kartu/<str:nomor_pendaftaran>/qr.png',
+        views.qr_kartu,
+        name='qr_kartu'
+    ),
 
     # ======================
     # ADMIN PANEL
@@ -49,10 +55,50 @@ urlpatterns = [
         views.admin_pendaftaran_tambah,
         name='admin_pendaftaran_tambah'
     ),
+    path(
+        'admin/pendaftaran/impor/',
+        views.admin_pendaftaran_import,
+        name='admin_pendaftaran_import'
+    ),
     path(
         'admin/ubah-status/<int:pk>/',
         views.ubah_status_admin,
         name='ubah_status_admin'
     ),
+    path(
+        'admin/ubah-status-massal/',
+        views.ubah_status_massal_admin,
+        name='ubah_status_massal_admin'
+    ),
+    path(
+        'admin/export/',
+        views.export_pendaftaran,
+        name='export_pendaftaran'
+    ),
+    path(
+        'admin/export/rekap-daftar-ulang/',
+        views.export_excel_rekap,
+        name='export_excel_rekap'
+    ),
+    path(
+        'admin/kartu/',
+        views.cetak_kartu_massal,
+        name='cetak_kartu_massal'
+    ),
+    path(
+        'admin/tugas/<int:pk>/',
+        views.status_tugas,
+        name='status_tugas'
+    ),
+    path(
+        'admin/tugas/<int:pk>/unduh/',
+        views.unduh_tugas,
+        name='unduh_tugas'
+    ),
+    path(
+        'admin/metrik/',
+        views.metrik,
+        name='metrik'
+    ),
 
 ]
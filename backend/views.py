@@ -1,65 +1,116 @@
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required, user_passes_test
-from django.views.decorators.http import require_POST
-from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator
-from django.db.models import Q
-
-from .forms import PendaftaranForm
-from .models import Pendaftaran, LogAktivitas
-
-# =========================
-# QR CODE (TAJAM & AMAN)
-# =========================
-import qrcode
-from io import BytesIO
-import base64
-
-
-def generate_qr_base64(data):
-    qr = qrcode.QRCode(
-        version=3,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=12,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-
-    return f"data:image/png;base64,{img_str}"
-
-
-# =====================================================
-# ROLE CHECK
-# =====================================================
-def is_admin(user):
-    return (
-        user.is_authenticated
-        and user.groups.filter(name__in=['Admin', 'Panitia']).exists()
-    )
+from django.views.decorators.http import require_GET, require_POST, condition
+from django.core.exceptions import NON_FIELD_ERRORS, PermissionDenied, ValidationError
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+
+from . import admisi, idempotensi, notifikasi, tugas
+from .aksi_massal import STATUS_MASSAL, baca_file_identitas, ubah_status_massal
+from .ekspor import KOLOM_PENDAFTARAN, KOLOM_REKAP, filter_ekspor, response_ekspor
+from .forms import FORM_SUDAH_DIKIRIM, NIK_SUDAH_TERDAFTAR, PendaftaranForm
+from .impor import baca_baris, impor_pendaftaran
+from .kartu_pdf import cetak_ke_file_sementara, melebihi_batas_sinkron, nama_file_kartu
+from .metrik import registry
+from .models import Pendaftaran, Tugas
+from .nik import NIK_RE, nik_terdaftar
+from .paginasi import KeysetPaginator
+from .pencarian import cari_pendaftaran
+from .peran import admin_required
+from .qr import ambil_qr_png, qr_key
+from .statistik import get_statistik, perkiraan_jumlah
 
 
 # =====================================================
 # PUBLIC
 # =====================================================
 def home(request):
+    kunci = None
+
     if request.method == 'POST':
+        kunci = idempotensi.kunci_dari(request)
+        sidik = idempotensi.sidik_data(request.POST)
+
+        # klik "Daftar" dua kali: jawab dengan hasil submit pertama
+        hasil = idempotensi.hasil_cache(kunci)
+        if hasil:
+            return _submit_ulang(request, hasil, sidik)
+
         form = PendaftaranForm(request.POST)
-        if form.is_valid():
-            pendaftaran = form.save()
+        pendaftaran = form.simpan(kunci, sidik) if form.is_valid() else None
+        if pendaftaran:
+            idempotensi.simpan_hasil(kunci, pendaftaran.pk, sidik)
+            if settings.TUGAS_AKTIF and settings.QR_PRA_RENDER:
+                # QR kartu sudah ada di cache disk saat halaman sukses dibuka
+                tugas.kirim(
+                    'render_qr',
+                    nomor_pendaftaran=pendaftaran.nomor_pendaftaran,
+                    data=_qr_kartu_data(request, pendaftaran.nomor_pendaftaran),
+                )
             messages.success(request, 'Pendaftaran berhasil!')
             return redirect('sukses', pk=pendaftaran.pk)
+
+        # NIK "sudah terdaftar" / kunci bentrok bisa jadi karena submit
+        # pertama (worker lain); error form lain tidak perlu dicek ke DB
+        if form.has_error('nik', 'terdaftar') or form.has_error(NON_FIELD_ERRORS, 'dikirim'):
+            hasil = idempotensi.hasil_db(kunci)
+            if hasil:
+                return _submit_ulang(request, hasil, sidik)
     else:
         form = PendaftaranForm()
 
-    return render(request, 'pendaftaran.html', {'form': form})
+    return render(request, 'pendaftaran.html', {
+        'form': form,
+        # kunci lama dipakai lagi kalau form cuma salah isi
+        'kunci': kunci or idempotensi.kunci_baru(),
+    })
+
+
+def _submit_ulang(request, hasil, sidik):
+    pk, sidik_awal = hasil
+    if sidik_awal == sidik:
+        return redirect('sukses', pk=pk)
+
+    # kunci sama, isi beda: jangan bocorkan pendaftaran orang lain
+    form = PendaftaranForm(request.POST)
+    form.full_clean()
+    form.add_error(None, ValidationError(FORM_SUDAH_DIKIRIM, code='dikirim'))
+    return render(request, 'pendaftaran.html', {
+        'form': form,
+        'kunci': idempotensi.kunci_baru(),
+    })
+
+
+@require_GET
+def cek_nik(request):
+    # validasi live di form pendaftaran, tanpa query untuk NIK yang belum ada
+    tunggu = admisi.ambil_token(
+        admisi.ip_klien(request), 'cek_nik',
+        settings.CEK_NIK_PER_MENIT, settings.CEK_NIK_BURST,
+    )
+    if tunggu:
+        response = JsonResponse(
+            {'pesan': "Terlalu banyak permintaan, coba lagi sebentar lagi."},
+            status=429,
+        )
+        response['Retry-After'] = str(int(tunggu) + 1)
+        return response
+
+    nik = request.GET.get('nik', '').strip()
+    if not NIK_RE.match(nik):
+        data = {'valid': False, 'tersedia': False, 'pesan': "NIK harus terdiri dari 16 digit angka."}
+    elif nik_terdaftar(nik):
+        data = {'valid': True, 'tersedia': False, 'pesan': NIK_SUDAH_TERDAFTAR}
+    else:
+        data = {'valid': True, 'tersedia': True, 'pesan': ""}
+
+    response = JsonResponse(data)
+    response['Cache-Control'] = 'no-store'
+    return response
 
 
 def sukses(request, pk):
@@ -73,36 +124,59 @@ def print_kartu(request, nomor_pendaftaran):
         nomor_pendaftaran=nomor_pendaftaran
     )
 
-    qr_data = request.build_absolute_uri(
-        f"/kartu/{pendaftaran.nomor_pendaftaran}/"
-    )
-    qr_image = generate_qr_base64(qr_data)
-
+    # QR dilayani terpisah lewat qr_kartu biar HTML tidak bawa base64 besar
     return render(request, 'kartu_pendaftaran.html', {
         'pendaftaran': pendaftaran,
-        'qr_image': qr_image,
     })
 
 
+def _qr_kartu_data(request, nomor_pendaftaran):
+    return request.build_absolute_uri(
+        reverse('print_kartu', args=[nomor_pendaftaran])
+    )
+
+
+def _qr_kartu_etag(request, nomor_pendaftaran):
+    return qr_key(
+        nomor_pendaftaran,
+        _qr_kartu_data(request, nomor_pendaftaran)
+    )
+
+
+@cache_control(public=True, max_age=60 * 60 * 24)
+@condition(etag_func=_qr_kartu_etag)
+def qr_kartu(request, nomor_pendaftaran):
+    if not Pendaftaran.objects.filter(
+        nomor_pendaftaran=nomor_pendaftaran
+    ).exists():
+        raise Http404
+
+    png = ambil_qr_png(
+        nomor_pendaftaran,
+        _qr_kartu_data(request, nomor_pendaftaran)
+    )
+    return HttpResponse(png, content_type='image/png')
+
+
 # =====================================================
 # ADMIN PANEL
 # =====================================================
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def dashboard_admin(request):
-    qs = Pendaftaran.objects.all()
+    statistik = get_statistik()
 
     return render(request, 'adminpanel/dashboard.html', {
-        'pendaftarans': qs.order_by('-tanggal_pendaftaran')[:10],
-        'total': qs.count(),
-        'terdaftar': qs.filter(status='terdaftar').count(),
-        'diterima': qs.filter(status='diterima').count(),
-        'ditolak': qs.filter(status='ditolak').count(),
+        'pendaftarans': Pendaftaran.objects.order_by('-tanggal_pendaftaran')[:10],
+        'total': statistik['total'],
+        'terdaftar': statistik['status']['terdaftar'],
+        'diterima': statistik['status']['diterima'],
+        'ditolak': statistik['status']['ditolak'],
+        'daftar_ulang': statistik['status']['daftar_ulang'],
+        'statistik': statistik,
     })
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def admin_pendaftaran_list(request):
     status_filter = request.GET.get('status')
     jurusan_filter = request.GET.get('jurusan')
@@ -117,40 +191,47 @@ def admin_pendaftaran_list(request):
         qs = qs.filter(jurusan=jurusan_filter)
 
     if keyword:
-        qs = qs.filter(
-            Q(nama_lengkap__icontains=keyword) |
-            Q(nik__icontains=keyword) |
-            Q(nomor_pendaftaran__icontains=keyword)
-        )
+        qs = cari_pendaftaran(qs, keyword)
+
+    try:
+        per_page = int(request.GET.get('per_page', settings.PENDAFTARAN_PAGE_SIZE))
+    except ValueError:
+        per_page = settings.PENDAFTARAN_PAGE_SIZE
+    if per_page not in settings.PENDAFTARAN_PAGE_SIZES:
+        per_page = settings.PENDAFTARAN_PAGE_SIZE
+
+    paginator = KeysetPaginator(qs, per_page)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
 
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # jumlah dari cache statistik, tidak ada COUNT(*) tiap pindah halaman
+    jumlah = None
+    if not keyword:
+        jumlah = perkiraan_jumlah(status_filter, jurusan_filter)
+
+    querystring = request.GET.copy()
+    querystring.pop('cursor', None)
 
     return render(request, 'adminpanel/pendaftaran_list.html', {
         'pendaftarans': page_obj,
         'status_filter': status_filter,
         'jurusan_filter': jurusan_filter,
+        'jurusan_choices': Pendaftaran.JURUSAN_CHOICES,
         'keyword': keyword,
         'page_obj': page_obj,
+        'nomor_awal': page_obj.offset,
+        'per_page': per_page,
+        'page_sizes': settings.PENDAFTARAN_PAGE_SIZES,
+        'jumlah': jumlah,
+        'querystring': querystring.urlencode(),
     })
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def admin_pendaftaran_tambah(request):
     if request.method == 'POST':
         form = PendaftaranForm(request.POST)
-        if form.is_valid():
-            pendaftaran = form.save()
-
-            LogAktivitas.objects.create(
-                user=request.user,
-                pendaftaran=pendaftaran,
-                aksi="Tambah Pendaftaran",
-                detail="Ditambahkan oleh admin"
-            )
-
+        # log aktivitas dicatat otomatis lewat signal (backend/audit.py)
+        if form.is_valid() and form.simpan():
             messages.success(request, "Pendaftaran berhasil ditambahkan")
             return redirect('admin_pendaftaran_list')
     else:
@@ -161,8 +242,23 @@ def admin_pendaftaran_tambah(request):
     })
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
+def admin_pendaftaran_import(request):
+    hasil = None
+
+    if request.method == 'POST' and request.FILES.get('file'):
+        file = request.FILES['file']
+        hasil = impor_pendaftaran(baca_baris(file, file.name), user=request.user)
+
+        if hasil.berhasil:
+            messages.success(request, f"{hasil.berhasil} pendaftar berhasil diimpor")
+
+    return render(request, 'adminpanel/pendaftaran_import.html', {
+        'hasil': hasil
+    })
+
+
+@admin_required
 @require_POST
 def ubah_status_admin(request, pk):
     pendaftaran = get_object_or_404(Pendaftaran, pk=pk)
@@ -171,15 +267,150 @@ def ubah_status_admin(request, pk):
     if status not in ['diterima', 'ditolak']:
         raise PermissionDenied
 
+    lama = pendaftaran.status
     pendaftaran.status = status
     pendaftaran.save()
+    if lama != status:
+        notifikasi.antrekan([pendaftaran.pk], status)
+
+    messages.success(request, "Status berhasil diubah")
+    return redirect('admin_pendaftaran_list')
+
+
+@admin_required
+@require_POST
+def ubah_status_massal_admin(request):
+    status = request.POST.get('status')
 
-    LogAktivitas.objects.create(
-        user=request.user,
-        pendaftaran=pendaftaran,
-        aksi="Ubah Status",
-        detail=f"Status diubah ke {pendaftaran.get_status_display()}"
+    if status not in STATUS_MASSAL:
+        raise PermissionDenied
+
+    ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+    nomors, niks = set(), set()
+    if request.FILES.get('file'):
+        nomors, niks = baca_file_identitas(request.FILES['file'])
+
+    jumlah = ubah_status_massal(
+        request.user, status, ids=ids, nomors=nomors, niks=niks
     )
 
-    messages.success(request, "Status berhasil diubah")
+    messages.success(request, f"Status {jumlah} pendaftar berhasil diubah")
     return redirect('admin_pendaftaran_list')
+
+
+# =====================================================
+# EKSPOR DATA
+# =====================================================
+@admin_required
+def export_pendaftaran(request):
+    qs = filter_ekspor(Pendaftaran.objects.all(), request.GET)
+    return response_ekspor(
+        qs,
+        KOLOM_PENDAFTARAN,
+        'data_pendaftaran',
+        request.GET.get('format', 'csv')
+    )
+
+
+@admin_required
+def export_excel_rekap(request):
+    qs = Pendaftaran.objects.filter(status='daftar_ulang')
+    return response_ekspor(
+        qs,
+        KOLOM_REKAP,
+        'rekap_daftar_ulang',
+        request.GET.get('format', 'xlsx')
+    )
+
+
+# =====================================================
+# CETAK KARTU MASSAL
+# =====================================================
+@admin_required
+def cetak_kartu_massal(request):
+    # filter sama dengan ekspor (status/jurusan/jalur), satu PDF untuk semua
+    if settings.TUGAS_AKTIF:
+        # ribuan kartu tidak menahan worker web: dibuat runworker, admin
+        # memantau lewat URL status
+        obj = tugas.kirim(
+            'cetak_kartu',
+            params={k: request.GET[k] for k in ('status', 'jurusan', 'jalur') if request.GET.get(k)},
+            base_url=request.build_absolute_uri('/'),
+            nama_file=nama_file_kartu(request.GET),
+        )
+        messages.success(
+            request,
+            f"Kartu sedang dibuat di latar belakang, cek {reverse('status_tugas', args=[obj.pk])}"
+        )
+        return redirect('admin_pendaftaran_list')
+
+    qs = filter_ekspor(Pendaftaran.objects.all(), request.GET)
+    pesan = melebihi_batas_sinkron(qs)
+    if pesan:
+        messages.error(request, pesan)
+        return redirect('admin_pendaftaran_list')
+
+    file = cetak_ke_file_sementara(qs, request.build_absolute_uri('/'))
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=nama_file_kartu(request.GET),
+        content_type='application/pdf'
+    )
+
+
+# =====================================================
+# TUGAS LATAR BELAKANG
+# =====================================================
+@admin_required
+def status_tugas(request, pk):
+    obj = get_object_or_404(Tugas, pk=pk)
+    hasil = obj.get_hasil()
+
+    return JsonResponse({
+        'id': obj.pk,
+        'nama': obj.nama,
+        'status': obj.status,
+        'percobaan': obj.percobaan,
+        'hasil': hasil,
+        'error': obj.error.strip().splitlines()[-1] if obj.error else '',
+        'dibuat': obj.dibuat,
+        'selesai': obj.selesai,
+        'unduh': (
+            reverse('unduh_tugas', args=[obj.pk])
+            if obj.status == 'selesai' and isinstance(hasil, dict) and hasil.get('file')
+            else None
+        ),
+    })
+
+
+@admin_required
+def unduh_tugas(request, pk):
+    obj = get_object_or_404(Tugas, pk=pk, status='selesai')
+    hasil = obj.get_hasil()
+    if not isinstance(hasil, dict) or not hasil.get('file'):
+        raise Http404("Tugas ini tidak menghasilkan file")
+
+    path = os.path.join(settings.TUGAS_FOLDER, os.path.basename(hasil['file']))
+    if not os.path.isfile(path):
+        raise Http404("File hasil tugas sudah dihapus")
+
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=os.path.basename(path).split('-', 2)[-1],
+    )
+
+
+# =====================================================
+# METRIK (PROMETHEUS)
+# =====================================================
+@admin_required
+def metrik(request):
+    if not settings.METRIK_AKTIF:
+        raise Http404("Instrumentasi tidak aktif (METRIK_AKTIF)")
+
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import shutil
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import AppDirectoriesFinder
+
+
+# =====================================================
+# BUNDLE CSS/JS PER LAYOUT
+# =====================================================
+# Dipakai lewat {% aset 'base.css' %}. Sebelum `manage.py build_aset`
+# file-nya tetap dikirim satu-satu seperti biasa.
+FONTAWESOME = 'assets/plugins/fontawesome-free/css/all.min.css'
+ADMINLTE_CSS = 'assets/css/adminlte.min.css'
+JQUERY = 'assets/plugins/jquery/jquery.min.js'
+BOOTSTRAP_JS = 'assets/plugins/bootstrap/js/bootstrap.bundle.min.js'
+ADMINLTE_JS = 'assets/js/adminlte.min.js'
+
+ASET_BUNDLE = {
+    'base.css': [
+        FONTAWESOME,
+        'assets/plugins/overlayScrollbars/css/OverlayScrollbars.min.css',
+        ADMINLTE_CSS,
+    ],
+    'base.js': [
+        JQUERY,
+        BOOTSTRAP_JS,
+        'assets/plugins/overlayScrollbars/js/jquery.overlayScrollbars.min.js',
+        ADMINLTE_JS,
+    ],
+    'singleform.css': [
+        FONTAWESOME,
+        'assets/plugins/icheck-bootstrap/icheck-bootstrap.min.css',
+        ADMINLTE_CSS,
+    ],
+    'singleform.js': [JQUERY, BOOTSTRAP_JS, ADMINLTE_JS],
+    'error.css': [FONTAWESOME, ADMINLTE_CSS],
+    'error.js': [JQUERY, BOOTSTRAP_JS, ADMINLTE_JS, 'assets/js/demo.js'],
+    'formulir.css': [
+        'assets/plugins/daterangepicker/daterangepicker.css',
+        'assets/plugins/tempusdominus-bootstrap-4/css/tempusdominus-bootstrap-4.min.css',
+    ],
+    'formulir.js': [
+        'assets/plugins/moment/moment.min.js',
+        'assets/plugins/inputmask/jquery.inputmask.min.js',
+        'assets/plugins/daterangepicker/daterangepicker.js',
+        'assets/plugins/tempusdominus-bootstrap-4/js/tempusdominus-bootstrap-4.min.js',
+    ],
+}
+
+# folder kecil yang selalu ikut (favicon dirujuk juga dari manifest.json)
+ASET_TAMBAHAN = ['favicon', 'images', 'sitemap.xml']
+
+MANIFEST = 'aset.json'
+
+URL_CSS = re.compile(r'''url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s]*))\s*\)''')
+STATIC_TEMPLATE = re.compile(
+    r'''/static/([^"'\s?#)]+)|\{%\s*static\s+["']([^"']+)["']\s*%\}'''
+)
+ASET_TEMPLATE = re.compile(r'''\{%\s*aset\s+["']([^"']+)["']\s*%\}''')
+
+
+# =====================================================
+# STATUS BUILD
+# =====================================================
+_manifest = {}
+
+
+def manifest_build():
+    """Isi aset.json hasil build, kosong kalau belum pernah build."""
+    if not settings.ASET_BUILD:
+        return {}
+
+    path = os.path.join(settings.ASET_BUILD_DIR, MANIFEST)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    if _manifest.get('kunci') != (path, mtime):
+        with open(path) as f:
+            _manifest.update(kunci=(path, mtime), isi=json.load(f))
+    return _manifest['isi']
+
+
+class AppDirectoriesFinderBuild(AppDirectoriesFinder):
+    # static bawaan app frontend (sumber mentah ~77MB) dilewati, isinya yang
+    # terpakai sudah disalin ke ASET_BUILD_DIR oleh build_aset
+    def __init__(self, app_names=None, *args, **kwargs):
+        if app_names is None:
+            app_names = [
+                app.name for app in apps.get_app_configs()
+                if app.name not in settings.ASET_SUMBER_APPS
+            ]
+        super().__init__(app_names, *args, **kwargs)
+
+
+# =====================================================
+# BUILD
+# =====================================================
+def _sumber(path):
+    for folder in settings.ASET_SUMBER_DIRS:
+        full = os.path.join(folder, path)
+        if os.path.isfile(full):
+            return full
+    return None
+
+
+def minify_css(css):
+    # cukup buang komentar (kecuali /*! lisensi */) dan spasi berlebih
+    css = re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def _tulis(tujuan, path, isi):
+    full = os.path.join(tujuan, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    mode = 'wb' if isinstance(isi, bytes) else 'w'
+    with open(full, mode) as f:
+        f.write(isi)
+
+
+class Build:
+    def __init__(self, tujuan):
+        self.tujuan = tujuan
+        self.file = set()
+        self.hilang = set()
+
+    def salin(self, path):
+        if path in self.file:
+            return True
+
+        sumber = _sumber(path)
+        if not sumber:
+            self.hilang.add(path)
+            return False
+
+        self.file.add(path)
+        target = os.path.join(self.tujuan, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(sumber, target)
+
+        if path.endswith('.css'):
+            # font/gambar yang dirujuk css ikut disalin, path-nya tetap
+            with open(sumber, encoding='utf-8', errors='replace') as f:
+                self.css_untuk(f.read(), path, os.path.dirname(path))
+        return True
+
+    def css_untuk(self, css, asal, folder_baru):
+        """Rujukan url() di `css` (asal: path static file aslinya) ditulis
+        ulang relatif ke `folder_baru`, file yang dirujuk ikut disalin."""
+        folder_asal = os.path.dirname(asal)
+
+        def ganti(match):
+            url = next(g for g in match.groups() if g is not None)
+            if not url or url.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+                return match.group(0)
+
+            # ?#iefix / #svgfont milik @font-face tetap dibawa
+            bersih = re.split(r'[?#]', url, 1)[0]
+            path = os.path.normpath(os.path.join(folder_asal, bersih)).replace(os.sep, '/')
+            if not self.salin(path):
+                # file tidak ada di paket plugin-nya, jangan bikin collectstatic gagal
+                return 'url(data:,)'
+
+            baru = os.path.relpath(path, folder_baru or '.').replace(os.sep, '/')
+            baru += url[len(bersih):]
+            return f'url("{baru}")'
+
+        return URL_CSS.sub(ganti, css)
+
+    def bundle(self, nama):
+        isi = []
+        for path in ASET_BUNDLE[nama]:
+            sumber = _sumber(path)
+            if not sumber:
+                self.hilang.add(path)
+                continue
+            with open(sumber, encoding='utf-8', errors='replace') as f:
+                teks = f.read()
+
+            # source map tidak ikut dikirim
+            teks = re.sub(r'^\s*(//|/\*)# sourceMappingURL=.*$', '', teks, flags=re.M)
+            if nama.endswith('.css'):
+                isi.append(minify_css(self.css_untuk(teks, path, 'bundle')))
+            else:
+                isi.append(teks.strip())
+
+        pemisah = '\n' if nama.endswith('.css') else '\n;\n'
+        path = f'bundle/{nama}'
+        _tulis(self.tujuan, path, pemisah.join(isi) + '\n')
+        self.file.add(path)
+        return path
+
+
+def referensi_template():
+    """(file static, nama bundle) yang disebut template milik proyek ini."""
+    from .views import _folder_template
+
+    static, bundle = set(), set()
+    for folder in set(_folder_template()):
+        # template bawaan django/admin pakai static app-nya sendiri
+        if not str(folder).startswith(str(settings.BASE_DIR)):
+            continue
+        for root, _, files in os.walk(folder):
+            for nama in files:
+                if not nama.endswith(('.html', '.txt')):
+                    continue
+                with open(os.path.join(root, nama), encoding='utf-8') as f:
+                    teks = f.read()
+                for a, b in STATIC_TEMPLATE.findall(teks):
+                    static.add(a or b)
+                bundle.update(ASET_TEMPLATE.findall(teks))
+    return static, bundle
+
+
+def build_aset(tujuan=None):
+    tujuan = tujuan or settings.ASET_BUILD_DIR
+    if os.path.isdir(tujuan):
+        shutil.rmtree(tujuan)
+    os.makedirs(tujuan)
+
+    build = Build(tujuan)
+    static, bundle = referensi_template()
+
+    hasil_bundle = {nama: build.bundle(nama) for nama in sorted(bundle)}
+    for path in sorted(static):
+        build.salin(path)
+
+    for path in ASET_TAMBAHAN:
+        for folder in settings.ASET_SUMBER_DIRS:
+            full = os.path.join(folder, path)
+            if os.path.isdir(full):
+                for root, _, files in os.walk(full):
+                    for nama in files:
+                        rel = os.path.relpath(os.path.join(root, nama), folder)
+                        build.salin(rel.replace(os.sep, '/'))
+            elif os.path.isfile(full):
+                build.salin(path)
+
+    manifest = {
+        'bundle': hasil_bundle,
+        'file': sorted(build.file),
+        'hilang': sorted(build.hilang),
+    }
+    _tulis(tujuan, MANIFEST, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    return manifest
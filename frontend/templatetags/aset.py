@@ -0,0 +1,25 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from frontend.aset import ASET_BUNDLE, manifest_build
+
+
+register = template.Library()
+
+TAG = {
+    'css': '<link rel="stylesheet" href="{}">',
+    'js': '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def aset(nama):
+    """{% aset 'base.css' %} -> satu file bundle kalau sudah build_aset,
+    kalau belum semua file penyusunnya satu-satu."""
+    tag = TAG[nama.rsplit('.', 1)[-1]]
+
+    bundle = manifest_build().get('bundle', {})
+    if nama in bundle:
+        return format_html(tag, static(bundle[nama]))
+    return format_html_join('\n', tag, ((static(path),) for path in ASET_BUNDLE[nama]))
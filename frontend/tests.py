@@ -1,3 +1,129 @@
-from django.test import TestCase
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import views
+from .aset import ASET_BUNDLE, MANIFEST, URL_CSS
+
+
+def key_halaman(path):
+    return 'halaman:' + hashlib.md5(path.encode()).hexdigest()
+
+
+# =====================================================
+# CACHE HALAMAN STATIS
+# =====================================================
+@override_settings(ROOT_URLCONF='frontend.urls', HALAMAN_CACHE_TIMEOUT=3600)
+class HalamanCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def get_template(self):
+        return mock.patch.object(views.loader, 'get_template', wraps=views.loader.get_template)
+
+    def test_hit_kedua_dari_cache(self):
+        pertama = self.client.get('/forgot-password/')
+        self.assertEqual(pertama.status_code, 200)
+        self.assertIsNotNone(cache.get(key_halaman('/forgot-password/')))
+
+        with self.get_template() as get_template:
+            kedua = self.client.get('/forgot-password/')
+        self.assertEqual(kedua.content, pertama.content)
+        get_template.assert_not_called()
+
+    def test_halaman_dengan_csrf_tidak_dicache(self):
+        # login.html memakai {% csrf_token %}: token per pengunjung
+        response = self.client.get('/halaman/login.html')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertIsNone(cache.get(key_halaman('/halaman/login.html')))
+
+        with self.get_template() as get_template:
+            self.client.get('/halaman/login.html')
+        get_template.assert_called_once_with('login.html')
+
+    def test_path_asing_tanpa_loader(self):
+        with self.get_template() as get_template:
+            response = self.client.get('/tidak-ada.html')
+            self.assertEqual(response.status_code, 404)
+            # nama tidak dikenal tidak dicari loader, cuma 404.html yang dirender
+            get_template.assert_called_once_with('404.html')
+
+            get_template.reset_mock()
+            response = self.client.get('/wp-login.php')
+            self.assertEqual(response.status_code, 404)
+            # 404 kedua dari cache
+            get_template.assert_not_called()
+
+
+# =====================================================
+# BUILD ASET
+# =====================================================
+def render_aset(nama):
+    return Template("{% load aset %}{% aset '" + nama + "' %}").render(Context())
+
+
+class AsetTest(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tujuan = os.path.join(tempfile.mkdtemp(), 'aset_build')
+        with override_settings(ASET_BUILD_DIR=cls.tujuan):
+            call_command('build_aset', stdout=StringIO(), stderr=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(os.path.dirname(cls.tujuan))
+        super().tearDownClass()
+
+    def path(self, *nama):
+        return os.path.join(self.tujuan, *nama)
+
+    def test_build_bundle_dan_manifest(self):
+        self.assertTrue(os.path.isfile(self.path(MANIFEST)))
+        for nama in ['base.css', 'base.js', 'singleform.css', 'error.js']:
+            self.assertTrue(os.path.isfile(self.path('bundle', nama)), nama)
+
+        with open(self.path('bundle', 'base.js')) as f:
+            self.assertNotIn('sourceMappingURL', f.read())
+
+        # plugin yang tidak dirujuk template tidak ikut disalin
+        self.assertFalse(os.path.exists(self.path('assets', 'plugins', 'chart.js')))
+
+    def test_url_css_bundle_ikut_disalin(self):
+        with open(self.path('bundle', 'base.css')) as f:
+            css = f.read()
+
+        url = [next(g for g in m if g) for m in URL_CSS.findall(css)]
+        url = [u for u in url if not u.startswith('data:')]
+        self.assertTrue(url)
+        for u in url:
+            file = re.split(r'[?#]', u, 1)[0]
+            self.assertTrue(os.path.isfile(self.path('bundle', file)), u)
+
+    @override_settings(ASET_BUILD=False)
+    def test_tag_tanpa_build(self):
+        # sisa build lama di ASET_BUILD_DIR diabaikan selama ASET_BUILD mati
+        with self.settings(ASET_BUILD_DIR=self.tujuan):
+            html = render_aset('base.css')
+
+        self.assertEqual(html.count('<link'), len(ASET_BUNDLE['base.css']))
+        for path in ASET_BUNDLE['base.css']:
+            self.assertIn(f'href="/static/{path}"', html)
+
+    def test_tag_sesudah_build(self):
+        with self.settings(ASET_BUILD=True, ASET_BUILD_DIR=self.tujuan):
+            self.assertEqual(
+                render_aset('base.js'), '<script src="/static/bundle/base.js"></script>'
+            )
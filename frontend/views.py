@@ -1,33 +1,113 @@
+import hashlib
+import os
+from functools import wraps
+
 from django.shortcuts import render
-from django.template import loader
+from django.template import loader, engines
 from django.http import HttpResponse, HttpResponseBadRequest
 from django import template
+from django.conf import settings
+from django.core.cache import cache
 
 # Create your views here.
 
+# =====================================================
+# CACHE HALAMAN STATIS
+# =====================================================
+# Halaman di bawah isinya sama untuk semua pengunjung, jadi HTML utuhnya
+# di-cache per path (query string diabaikan). Key cache ikut DEPLOY_VERSI (KEY_PREFIX di CACHES),
+# jadi deploy baru = cache baru. Halaman yang memakai {% csrf_token %}
+# (login, register, ...) tidak pernah di-cache, token-nya per pengunjung.
+def halaman_cache(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.HALAMAN_CACHE_TIMEOUT or request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        key = 'halaman:' + hashlib.md5(request.path.encode()).hexdigest()
+        html = cache.get(key)
+        if html is not None:
+            return HttpResponse(html)
+
+        response = view(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+        ):
+            cache.set(key, response.content, settings.HALAMAN_CACHE_TIMEOUT)
+        return response
+    return wrapper
+
+
+_nama_template = None
+
+
+def _folder_template():
+    for engine in engines.all():
+        loaders = list(engine.engine.template_loaders)
+        while loaders:
+            loader_ = loaders.pop(0)
+            # cached.Loader membungkus loader lain
+            loaders.extend(getattr(loader_, 'loaders', []))
+            if hasattr(loader_, 'get_dirs'):
+                yield from loader_.get_dirs()
+
+
+def nama_template_halaman():
+    # route `pages` cuma pakai segmen terakhir path, jadi yang mungkin ketemu
+    # hanya file di level teratas folder template. Dikumpulkan sekali, nama
+    # lain langsung 404 tanpa pencarian loader (bot yang nembak path acak
+    # juga tidak memenuhi cache loader)
+    global _nama_template
+    if _nama_template is None:
+        nama = set()
+        for folder in _folder_template():
+            if os.path.isdir(folder):
+                nama.update(
+                    f for f in os.listdir(folder)
+                    if os.path.isfile(os.path.join(folder, f))
+                )
+        _nama_template = frozenset(nama)
+    return _nama_template
+
+
+def halaman_404(request, context):
+    # isi 404 tidak tergantung path, render sekali per deploy
+    html = cache.get('halaman:404')
+    if html is None:
+        html = loader.get_template( '404.html' ).render(context, request)
+        cache.set('halaman:404', html, settings.HALAMAN_CACHE_TIMEOUT)
+    return HttpResponseBadRequest(html, status=404)
+
+
 class OpenPpdbFrontend:
 
+    @halaman_cache
     def index(request):
         context = {"side_dashboard": "active"}
         context['segment'] = 'index'
         html_template = loader.get_template( 'index.html' )
         return HttpResponse(html_template.render(context, request))
 
+    @halaman_cache
     def formulir(request):
         context = {"side_formulir": "active"}
         html_template = loader.get_template( 'formulir.html' )
         return HttpResponse(html_template.render(context, request))
 
+    @halaman_cache
     def pages(request):
         context = {}
         try:
             load_template      = request.path.split('/')[-1]
             context['segment'] = load_template
+            if load_template not in nama_template_halaman():
+                raise template.TemplateDoesNotExist(load_template)
             html_template = loader.get_template( load_template )
             return HttpResponse(html_template.render(context, request))
         except template.TemplateDoesNotExist:
-            html_template = loader.get_template( '404.html' )
-            return HttpResponseBadRequest(html_template.render(context, request), status=404)
+            return halaman_404(request, context)
         except:
             html_template = loader.get_template( '500.html' )
             return HttpResponseBadRequest(html_template.render(context, request), status=500)
@@ -42,11 +122,13 @@ class OpenPpdbFrontend:
         html_template = loader.get_template( 'register.html' )
         return HttpResponse(html_template.render(context, request))
 
+    @halaman_cache
     def forgot_password(request):
         context = {}
         html_template = loader.get_template( 'forgot-password.html' )
         return HttpResponse(html_template.render(context, request))
 
+    @halaman_cache
     def recovery_password(request):
         context = {}
         html_template = loader.get_template( 'recovery-password.html' )
@@ -7,7 +7,8 @@ import sys
 def main():
     os.environ.setdefault(
         'DJANGO_SETTINGS_MODULE',
-        'openppdb.settings.dev'
+        # `manage.py test` pakai database uji di file (settings/test.py)
+        'openppdb.settings.test' if sys.argv[1:2] == ['test'] else 'openppdb.settings.dev'
     )
     try:
         from django.core.management import execute_from_command_line
@@ -12,9 +12,10 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 from decouple import config
-import dj_database_url
 from pathlib import Path
 
+from . import database
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -44,7 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.InstrumentasiMiddleware',  # paling atas biar total waktu terukur
     'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.AdmisiMiddleware',  # sebelum session/csrf, ruang tunggu tanpa DB
 
     'corsheaders.middleware.CorsMiddleware',  # CORS HARUS DI ATAS
 
@@ -57,16 +60,26 @@ MIDDLEWARE = [
 
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'backend.middleware.CurrentUserMiddleware',
+    'backend.middleware.ReplikaMiddleware',  # paling bawah, lihat backend/replika.py
 ]
 
 ROOT_URLCONF = 'openppdb.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates biasa + ukur waktu render per request (METRIK_AKTIF)
+        'BACKEND': 'backend.metrik.DjangoTemplatesTerukur',
+        'NAME': 'django',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # template di-compile sekali per proses (dev.py pakai loader biasa
+            # biar perubahan template langsung kelihatan)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -79,14 +92,45 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'openppdb.wsgi.application'
 
-# Database
+# Database (lihat settings/database.py, prod.py bisa pilih DATABASE_MODE)
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    'default': database.sqlite(os.path.join(BASE_DIR, 'db.sqlite3')),
+}
+
+# Replika baca (opsional): file snapshot SQLite dari `manage.py snapshot_replika`
+# (atau REPLIKA_DATABASE_URL untuk standby PostgreSQL). View di REPLIKA_VIEW
+# dibaca dari sana; klien yang baru menulis tetap baca dari 'default' selama
+# REPLIKA_LENGKET_DETIK (buat >= jeda snapshot / lag standby).
+# REPLIKA_AKTIF=False mematikan rute baca tanpa membuang DATABASES['replika'].
+REPLIKA_AKTIF = config('REPLIKA_AKTIF', default=True, cast=bool)
+REPLIKA_SQLITE_PATH = config('REPLIKA_SQLITE_PATH', default='')
+if REPLIKA_SQLITE_PATH:
+    DATABASES['replika'] = database.sqlite(REPLIKA_SQLITE_PATH)
+
+DATABASE_ROUTERS = ['backend.replika.RouterReplika']
+REPLIKA_APP = ['backend']
+REPLIKA_VIEW = [
+    'dashboard_admin', 'admin_pendaftaran_list',
+    'export_pendaftaran', 'export_excel_rekap',
+    'sukses', 'print_kartu', 'qr_kartu',
+]
+REPLIKA_LENGKET_DETIK = config('REPLIKA_LENGKET_DETIK', default=60, cast=int)
+REPLIKA_COOKIE = 'baca_primary'
+REPLIKA_SNAPSHOT_DETIK = config('REPLIKA_SNAPSHOT_DETIK', default=30, cast=int)
+
+# PRAGMA sqlite tiap koneksi baru: WAL biar pembaca tidak memblok penulis,
+# synchronous=NORMAL cukup aman di mode WAL dan jauh lebih cepat
+SQLITE_PRAGMA = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=20000, cast=int),  # ms
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
 }
 
+# Koneksi persisten (CONN_MAX_AGE) dicek dulu di awal request, yang putus
+# ditutup biar Django buka baru (pengganti CONN_HEALTH_CHECKS di Django 4.1+)
+DB_HEALTH_CHECK = config('DB_HEALTH_CHECK', default=True, cast=bool)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -127,12 +171,181 @@ MEDIA_URL = '/media/'
 
 DATABASE_ROOT = os.path.join(BASE_DIR, 'databasefiles')
 
+# Versi deploy (mis. hasil `git rev-parse --short HEAD`), jadi prefix semua
+# key cache: habis deploy, cache halaman/statistik/dll otomatis basi
+DEPLOY_VERSI = config('DEPLOY_VERSI', default='dev')
+
+# Cache (LocMem sudah LRU + TTL). LocMem milik satu proses: kalau jalan
+# dengan beberapa worker/server, isi CACHE_BACKEND + CACHE_LOCATION dengan
+# cache bersama, mis. django.core.cache.backends.db.DatabaseCache +
+# nama tabel (`manage.py createcachetable`) atau FileBasedCache + folder
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHE_BERSAMA = 'locmem' not in CACHE_BACKEND.lower()
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=''),
+        'TIMEOUT': 300,
+        'KEY_PREFIX': DEPLOY_VERSI,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=2000, cast=int),
+        },
+    }
+}
+
+# Cache peran user (Admin/Panitia), detik. Perubahan grup langsung berlaku di
+# proses yang mengubahnya; dengan LocMem worker lain baru ikut setelah TTL ini
+# habis, jadi default-nya pendek (cabut akses admin telat maks. 15 detik).
+# Dengan cache bersama versi peran ikut dibagi, TTL boleh panjang.
+PERAN_CACHE_TIMEOUT = config(
+    'PERAN_CACHE_TIMEOUT', default=300 if CACHE_BERSAMA else 15, cast=int
+)
+
+# QR kartu pendaftaran
+QR_CACHE_TIMEOUT = config('QR_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+QR_DISK_CACHE = config('QR_DISK_CACHE', default=True, cast=bool)  # simpan juga di MEDIA_ROOT/qr
+
+# Cetak kartu massal ke PDF: jumlah proses pembuat QR (1 = tanpa pool) dan
+# jumlah pendaftar yang diproses per potongan
+KARTU_PDF_WORKERS = config('KARTU_PDF_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+KARTU_PDF_CHUNK = config('KARTU_PDF_CHUNK', default=200, cast=int)
+# paling banyak kartu yang dibuat langsung di request web kalau TUGAS_AKTIF
+# mati (2000 kartu ~20 detik); lebih dari itu harus lewat runworker/cetak_kartu
+KARTU_PDF_MAKS_SINKRON = config('KARTU_PDF_MAKS_SINKRON', default=300, cast=int)
+
+# Halaman statis frontend (index, formulir, pages, ...), detik. 0 = mati
+HALAMAN_CACHE_TIMEOUT = config('HALAMAN_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Statistik dashboard (detik)
+STATISTIK_CACHE_TIMEOUT = config('STATISTIK_CACHE_TIMEOUT', default=30, cast=int)
+
+# Jumlah baris per halaman di list pendaftaran admin
+PENDAFTARAN_PAGE_SIZE = config('PENDAFTARAN_PAGE_SIZE', default=25, cast=int)
+PENDAFTARAN_PAGE_SIZES = [10, 25, 50, 100, 200]
+
+# Ubah status massal: ukuran potongan IN (...) (batas variabel sqlite 999)
+STATUS_MASSAL_CHUNK = config('STATUS_MASSAL_CHUNK', default=900, cast=int)
+
+# Ekspor CSV/XLSX: jumlah baris yang diambil per fetch dari DB
+EKSPOR_CHUNK_SIZE = config('EKSPOR_CHUNK_SIZE', default=2000, cast=int)
+
+# Impor CSV/XLSX: jumlah baris per batch validasi + bulk_create
+IMPOR_BATCH_SIZE = config('IMPOR_BATCH_SIZE', default=500, cast=int)
+
+# Instrumentasi per view (metrik Prometheus di /admin/metrik/), default mati
+METRIK_AKTIF = config('METRIK_AKTIF', default=False, cast=bool)
+# Simpan profil cProfile ke MEDIA_ROOT/profil untuk request >= sekian ms (0 = mati),
+# hanya sebagian request yang diprofil karena cProfile cukup berat
+METRIK_PROFIL_MS = config('METRIK_PROFIL_MS', default=0, cast=int)
+METRIK_PROFIL_SAMPLE = config('METRIK_PROFIL_SAMPLE', default=0.1, cast=float)
+
+# Cek NIK: tiap berapa detik NIK baru dari worker lain ikut diambil
+NIK_REFRESH_DETIK = config('NIK_REFRESH_DETIK', default=5, cast=int)
+
+# Submit ulang form pendaftaran dengan kunci yang sama (detik, cache saja,
+# kuncinya sendiri tersimpan permanen di baris pendaftaran)
+IDEMPOTENSI_TTL = config('IDEMPOTENSI_TTL', default=60 * 60, cast=int)
+
+# Log aktivitas (audit) ditulis di luar request:
+# 'thread' = bulk_create tiap AUDIT_FLUSH_DETIK dari thread background,
+# 'request' = setelah response terkirim, 'langsung' = saat itu juga
+AUDIT_FLUSH = config('AUDIT_FLUSH', default='thread')
+AUDIT_FLUSH_DETIK = config('AUDIT_FLUSH_DETIK', default=2, cast=float)
+AUDIT_BUFFER_MAX = config('AUDIT_BUFFER_MAX', default=500, cast=int)
+# log "Pendaftaran Online" per pendaftar dari form publik (default mati:
+# tanggal_pendaftaran sudah mencatatnya, log admin/impor/status tetap ada)
+AUDIT_PENDAFTARAN_ONLINE = config('AUDIT_PENDAFTARAN_ONLINE', default=False, cast=bool)
+
+# Admisi POST form pendaftaran saat jalur dibuka (default mati):
+# paling banyak ADMISI_MAKS diproses bersamaan di server ini (buat lebih kecil
+# dari jumlah worker gunicorn biar panel admin selalu kebagian worker), sisanya
+# ke ruang tunggu yang kirim ulang form tiap ADMISI_JEDA detik. Per IP dibatasi
+# token bucket. ADMISI_PERCAYA_PROXY=True kalau di belakang nginx/proxy.
+ADMISI_AKTIF = config('ADMISI_AKTIF', default=False, cast=bool)
+ADMISI_MAKS = config('ADMISI_MAKS', default=2, cast=int)
+ADMISI_JEDA = config('ADMISI_JEDA', default=5, cast=int)
+ADMISI_TIKET_TTL = config('ADMISI_TIKET_TTL', default=60 * 30, cast=int)
+ADMISI_IP_PER_MENIT = config('ADMISI_IP_PER_MENIT', default=20, cast=float)
+ADMISI_IP_BURST = config('ADMISI_IP_BURST', default=10, cast=int)
+ADMISI_PERCAYA_PROXY = config('ADMISI_PERCAYA_PROXY', default=False, cast=bool)
+ADMISI_FOLDER = os.path.join(DATABASE_ROOT, 'admisi')
+
+# Cek NIK live (/cek-nik/) selalu dibatasi per IP, admisi aktif atau tidak:
+# tanpa batas endpoint ini bisa dipakai menebak NIK yang sudah terdaftar
+CEK_NIK_PER_MENIT = config('CEK_NIK_PER_MENIT', default=30, cast=float)
+CEK_NIK_BURST = config('CEK_NIK_BURST', default=10, cast=int)
+
+# Antrean tugas di database, dijalankan `manage.py runworker` (default mati:
+# QR dan PDF kartu dibuat langsung di request). TUGAS_POOL 'thread' atau
+# 'proses' (PDF kartu besar), tugas gagal diulang sampai TUGAS_MAKS_PERCOBAAN
+# kali dengan jeda TUGAS_BACKOFF_DETIK yang berlipat. Tugas yang kuncinya lewat
+# TUGAS_LEASE_DETIK (worker mati) diambil worker lain.
+TUGAS_AKTIF = config('TUGAS_AKTIF', default=False, cast=bool)
+TUGAS_WORKER = config('TUGAS_WORKER', default=2, cast=int)
+TUGAS_POOL = config('TUGAS_POOL', default='thread')
+TUGAS_MAKS_PERCOBAAN = config('TUGAS_MAKS_PERCOBAAN', default=3, cast=int)
+TUGAS_BACKOFF_DETIK = config('TUGAS_BACKOFF_DETIK', default=10, cast=int)
+TUGAS_LEASE_DETIK = config('TUGAS_LEASE_DETIK', default=600, cast=int)
+TUGAS_POLL_DETIK = config('TUGAS_POLL_DETIK', default=1, cast=float)
+# file hasil tugas (PDF kartu): di luar MEDIA_ROOT, jadi tidak ikut dilayani
+# /media/, diunduh lewat URL unduh tugas (khusus admin)
+TUGAS_FOLDER = os.path.join(DATABASE_ROOT, 'tugas')
+# QR kartu dibuat runworker sesaat setelah pendaftaran tersimpan (butuh
+# TUGAS_AKTIF). Default mati: satu baris Tugas tambahan per pendaftar
+QR_PRA_RENDER = config('QR_PRA_RENDER', default=False, cast=bool)
+
+# Notifikasi WhatsApp saat status diterima/ditolak (default mati). Dikirim
+# `manage.py kirim_notifikasi` (atau runworker kalau TUGAS_AKTIF) lewat
+# NOTIF_TRANSPORT: 'http' (gateway, NOTIF_HTTP_URL + token), 'file' (uji
+# coba, ditulis ke NOTIF_FILE) atau path kelas transport sendiri.
+# NOTIF_PER_MENIT = batas laju total gateway (0 = tanpa batas).
+NOTIF_AKTIF = config('NOTIF_AKTIF', default=False, cast=bool)
+NOTIF_TRANSPORT = config('NOTIF_TRANSPORT', default='file')
+NOTIF_HTTP_URL = config('NOTIF_HTTP_URL', default='')
+NOTIF_HTTP_TOKEN = config('NOTIF_HTTP_TOKEN', default='')
+NOTIF_HTTP_TIMEOUT = config('NOTIF_HTTP_TIMEOUT', default=10, cast=float)
+NOTIF_FILE = config('NOTIF_FILE', default=os.path.join(DATABASE_ROOT, 'notifikasi.jsonl'))
+NOTIF_PER_MENIT = config('NOTIF_PER_MENIT', default=120, cast=int)
+NOTIF_PARALEL = config('NOTIF_PARALEL', default=4, cast=int)
+NOTIF_BATCH = config('NOTIF_BATCH', default=50, cast=int)
+NOTIF_MAKS_PERCOBAAN = config('NOTIF_MAKS_PERCOBAAN', default=3, cast=int)
+NOTIF_BACKOFF_DETIK = config('NOTIF_BACKOFF_DETIK', default=30, cast=int)
+# baris 'kirim' yang lewat NOTIF_LEASE_DETIK (pengirim mati) diambil ulang
+NOTIF_LEASE_DETIK = config('NOTIF_LEASE_DETIK', default=300, cast=int)
+
 # ALLOW CORS ORIGIN
 CORS_ALLOW_ALL_ORIGINS = True  # CORS to bypass js access
 
 # Staticfiles storage whitenoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Aset hasil `manage.py build_aset` (bundle css/js + file yang benar-benar
+# dirujuk template). Kalau ASET_BUILD nyala, collectstatic cuma mengambil
+# folder ini, bukan seluruh plugin AdminLTE di frontend/static. Default mati
+# (dev pakai sumber mentah walau ada sisa build lama); prod menyalakannya
+ASET_SUMBER_DIRS = STATICFILES_DIRS
+ASET_SUMBER_APPS = ['frontend']
+ASET_BUILD_DIR = os.path.join(BASE_DIR, 'aset_build')
+ASET_BUILD_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'frontend.aset.AppDirectoriesFinderBuild',
+]
+ASET_BUILD = config('ASET_BUILD', default=False, cast=bool)
+if ASET_BUILD:
+    STATICFILES_DIRS = [ASET_BUILD_DIR]
+    STATICFILES_FINDERS = ASET_BUILD_FINDERS
+
 # Import Databases
-db_from_env = dj_database_url.config(conn_max_age=600)
-DATABASES['default'].update(db_from_env)
\ No newline at end of file
+if config('DATABASE_URL', default=''):
+    DATABASES['default'] = database.postgres(
+        config('DATABASE_URL'),
+        conn_max_age=config('CONN_MAX_AGE', default=600, cast=int),
+    )
+
+# standby PostgreSQL sebagai replika baca (REPLIKA_VIEW)
+if config('REPLIKA_DATABASE_URL', default=''):
+    DATABASES['replika'] = database.postgres(
+        config('REPLIKA_DATABASE_URL'),
+        conn_max_age=config('CONN_MAX_AGE', default=600, cast=int),
+    )
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Konfigurasi database per environment.
+
+sqlite   : satu server kecil. PRAGMA (WAL, busy_timeout, dll) dipasang tiap
+           koneksi dibuka, lihat backend/koneksi.py + SQLITE_PRAGMA;
+           transaksi tulis pakai BEGIN IMMEDIATE (backend/sqlite).
+postgres : koneksi persisten (CONN_MAX_AGE) yang dicek dulu sebelum dipakai
+           ulang (DB_HEALTH_CHECK), atau lewat pgbouncer sebagai pool.
+"""
+
+import dj_database_url
+
+
+def sqlite(path, timeout=20):
+    return {
+        # sqlite bawaan Django, atomic() memakai BEGIN IMMEDIATE (backend/sqlite)
+        'ENGINE': 'backend.sqlite',
+        'NAME': path,
+        # detik menunggu lock sebelum "database is locked"
+        'OPTIONS': {'timeout': timeout},
+    }
+
+
+def postgres(url, conn_max_age=600, pgbouncer=False):
+    db = dj_database_url.parse(url, conn_max_age=conn_max_age)
+    if 'postgresql' in db['ENGINE'] or 'postgis' in db['ENGINE']:
+        # opsi libpq, engine lain (mis. DATABASE_URL sqlite://) menolaknya
+        db.setdefault('OPTIONS', {})['connect_timeout'] = 5
+
+    if pgbouncer:
+        # pool mode transaction: server-side cursor (iterator()) tidak bisa
+        # dipakai lintas transaksi
+        db['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return db
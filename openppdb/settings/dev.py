@@ -3,6 +3,12 @@ from .base import *
 DEBUG = True
 ALLOWED_HOSTS = []
 
+# template dibaca ulang tiap request biar enak waktu ngedit
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 # ======================
 # AUTH / LOGIN
 # ======================
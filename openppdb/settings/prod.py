@@ -1,4 +1,42 @@
+from django.core.exceptions import ImproperlyConfigured
+from decouple import config
+
 from .base import *
+from . import database
 
 DEBUG = False
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+
+# ======================
+# ASET
+# ======================
+# static dari hasil build_aset (jalankan sebelum collectstatic)
+ASET_BUILD = config('ASET_BUILD', default=True, cast=bool)
+if ASET_BUILD:
+    STATICFILES_DIRS = [ASET_BUILD_DIR]
+    STATICFILES_FINDERS = ASET_BUILD_FINDERS
+
+
+# ======================
+# DATABASE
+# ======================
+# 'sqlite'  : db.sqlite3 + WAL (cukup untuk satu server, beberapa worker)
+# 'postgres': DATABASE_URL, koneksi persisten + health check,
+#             PGBOUNCER=True kalau lewat pgbouncer (pool mode transaction)
+DATABASE_MODE = config('DATABASE_MODE', default='postgres' if config('DATABASE_URL', default='') else 'sqlite')
+
+if DATABASE_MODE == 'postgres':
+    PGBOUNCER = config('PGBOUNCER', default=False, cast=bool)
+    DATABASES['default'] = database.postgres(
+        config('DATABASE_URL'),
+        # lewat pgbouncer koneksi ke bouncer boleh tetap persisten
+        conn_max_age=config('CONN_MAX_AGE', default=600, cast=int),
+        pgbouncer=PGBOUNCER,
+    )
+elif DATABASE_MODE == 'sqlite':
+    DATABASES['default'] = database.sqlite(
+        config('SQLITE_PATH', default=os.path.join(BASE_DIR, 'db.sqlite3')),
+    )
+else:
+    raise ImproperlyConfigured(f"DATABASE_MODE tidak dikenal: {DATABASE_MODE}")
@@ -0,0 +1,31 @@
+from .dev import *
+from . import database
+
+
+# ======================
+# DATABASE UJI (manage.py test)
+# ======================
+# file, bukan in-memory: test konkurensi membuka koneksi per thread, dan
+# sqlite in-memory (shared cache) mengunci per tabel tanpa busy_timeout
+DATABASES['default']['TEST'] = {
+    'NAME': os.path.join(DATABASE_ROOT, 'test_db.sqlite3'),
+}
+
+# replika selalu ada di test (ReplikaTest jalan tanpa env tambahan), tapi
+# rutenya mati; ReplikaTest menyalakan REPLIKA_AKTIF sendiri
+if 'replika' not in DATABASES:
+    DATABASES['replika'] = database.sqlite(os.path.join(DATABASE_ROOT, 'replika.sqlite3'))
+DATABASES['replika']['TEST'] = {
+    'NAME': os.path.join(DATABASE_ROOT, 'test_replika.sqlite3'),
+}
+REPLIKA_AKTIF = False
+
+# hash password cepat, user dibuat di banyak test
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# log audit ditulis saat itu juga: tidak ada thread flush yang masih menulis
+# setelah tabel test dikosongkan
+AUDIT_FLUSH = 'langsung'
+
+# test tidak menjalankan collectstatic: url static tanpa manifest/hash
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
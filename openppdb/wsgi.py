@@ -17,3 +17,15 @@ os.environ.setdefault(
 )
 
 application = get_wsgi_application()
+
+# hash NIK terdaftar diisi di awal (gunicorn --preload: sekali sebelum fork)
+from django.db import DatabaseError, connections  # noqa: E402
+from backend.nik import daftar_nik  # noqa: E402
+
+try:
+    daftar_nik.hangatkan()
+except DatabaseError:
+    pass  # belum migrate, nanti diisi saat cek pertama
+finally:
+    # koneksi jangan ikut ter-fork ke worker
+    connections.close_all()